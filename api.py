@@ -1,23 +1,77 @@
-from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel
-from typing import Any, Dict
+import json
+
+from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse, PlainTextResponse, JSONResponse
+from pydantic import BaseModel, Field, HttpUrl
+from typing import Any, Dict, List, Optional
 from loguru import logger
-from main import run_pipeline
+from main import run_pipeline_async, run_batch_async, stream_pipeline, warm_up
+from jobs import job_service, JobRejected
+from pipeline_config.pipeline_config import BATCH_CONCURRENCY, BATCH_MAX_CONCURRENCY, DEFAULT_FORMATS
+from content_rendering import OutputFormat
+from registry import registry
+from utils.result_cache import result_cache
+from utils.result_store import result_store
+from utils.exemplar_index import exemplar_index
+from utils.prompt_registry import prompt_registry
+from utils.metrics import metrics
+
+from contextlib import asynccontextmanager
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    try:
+        warm_up()
+    except Exception as e:
+        logger.warning(f"Registry warm-up failed, clients will be built on first use: {e}")
+    try:
+        await job_service.start()
+    except Exception as e:
+        logger.error(f"Job workers failed to start, /jobs will answer 503: {e}")
+    yield
+    await job_service.stop()
+    await run_in_threadpool(result_store.close)
+    await run_in_threadpool(exemplar_index.close)
+    await registry.aclose()
+
 
-from datetime import datetime
-from utils.file_system import save_result_html
+app = FastAPI(title="InteractiveAI SEO Generator", lifespan=lifespan)
 
 
-app = FastAPI(title="InteractiveAI SEO Generator")
+def _budget(max_tokens: Optional[int], max_cost: Optional[float]) -> Optional[dict]:
+    """Per-request budget, or None to use the configured defaults"""
+    if max_tokens is None and max_cost is None:
+        return None
+    return {"max_tokens": max_tokens, "max_cost": max_cost}
 
 
 class GenerateRequest(BaseModel):
     input_json: Dict[str, Any]
+    bypass_cache: bool = False
+    max_tokens: Optional[int] = Field(None, ge=1)
+    max_cost: Optional[float] = Field(None, gt=0, description="USD")
+    formats: List[OutputFormat] = Field(
+        default_factory=lambda: list(DEFAULT_FORMATS), 
+        description="Renderings of the final result to return; only 'html' fills the `html` field",
+    )
+
+    def budget(self) -> Optional[dict]:
+        return _budget(self.max_tokens, self.max_cost)
+
+
+class JobRequest(GenerateRequest):
+    webhook_url: Optional[HttpUrl] = None
 
 
 class GenerateResponse(BaseModel):
-    html: str
+    result_id: Optional[str] = None
+    html: Optional[str] = None
+    rendered: Dict[str, Any] = {}
     validation: Dict[str, Any]
+    usage: Dict[str, Any] = {}
+    cached: bool = False
 
 
 @app.get("/health")
@@ -25,30 +79,208 @@ def health():
     return {"status": "ok"}
 
 
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics_endpoint():
+    """Prometheus text exposition format"""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+
+@app.get("/stats/pool")
+def pool_stats():
+    return registry.stats()
+
+
+@app.get("/stats/cache")
+def cache_stats():
+    return result_cache.stats()
+
+
+@app.get("/stats/prompts")
+def prompt_stats():
+    return prompt_registry.stats()
+
+
+@app.get("/stats/jobs")
+def job_stats():
+    return job_service.stats()
+
+
+@app.get("/stats/results")
+def result_store_stats():
+    return result_store.stats()
+
+
+@app.get("/stats/exemplars")
+def exemplar_stats():
+    return exemplar_index.stats()
+
+
 @app.post("/generate", response_model=GenerateResponse)
-def generate(req: GenerateRequest):
+async def generate(req: GenerateRequest):
     try:
         logger.info("Received /generate request")
-        result = run_pipeline(req.input_json)
+        result = await run_pipeline_async(
+            req.input_json, bypass_cache=req.bypass_cache, budget=req.budget(), formats=req.formats
+        )
 
         html = result.get("formatted_data")
         validation = result.get("validation", {})
 
-        if not html:
-            raise HTTPException(status_code=500, detail="No HTML generated")
+        if not result.get("struct_data"):
+            raise HTTPException(status_code=500, detail="No content generated")
 
-        if result.get("formatted_data"):
-            ts = datetime.now().strftime("%Y%m%d_%H%M%S")
-            path = f"results/{ts}_output.html"
-            save_result_html(result.get("formatted_data"), path=path)
-            logger.success(f"Result saved to '{path}'")
-        else:
-            logger.error("No output generated")
+        result_id = None
+        if html:
+            # Written behind the request; GET /results/{id} serves it even before the flush
+            entry = result_store.save(html, req.input_json, validation)
+            result_id = entry["id"]
+            logger.success(f"Result {result_id} queued for '{entry['path']}'")
         
-        return GenerateResponse(html=html, validation=validation)
+        return GenerateResponse(
+            result_id=result_id,
+            html=html, 
+            rendered=result.get("rendered", {}),
+            validation=validation, 
+            usage=result.get("usage", {}),
+            cached=result.get("cached", False),
+        )
     except HTTPException:
         raise
     except Exception as e:
         logger.exception("Error in /generate")
         raise HTTPException(status_code=500, detail=str(e))
-        
\ No newline at end of file
+        
+
+def _parse_batch_body(body: bytes) -> List[Dict[str, Any]]:
+    """Accept a JSON list, an {"items": [...]} object or a JSONL body of input_json objects"""
+    text = body.decode("utf-8").strip()
+    if not text:
+        raise ValueError("Empty request body")
+
+    try:
+        payload = json.loads(text)
+    except json.JSONDecodeError:
+        payload = [json.loads(line) for line in text.splitlines() if line.strip()]
+
+    if isinstance(payload, dict):
+        payload = payload["items"] if "items" in payload else [payload]
+
+    if not isinstance(payload, list):
+        raise ValueError("Batch body must be a list or JSONL of input_json objects")
+
+    items = []
+    for i, item in enumerate(payload):
+        if not isinstance(item, dict):
+            raise ValueError(f"Item {i} is not a JSON object")
+        # Items may also be wrapped the same way as a /generate request body
+        items.append(item["input_json"] if isinstance(item.get("input_json"), dict) else item)
+    return items
+
+
+@app.post("/generate/batch")
+async def generate_batch(
+    request: Request,
+    concurrency: int = Query(BATCH_CONCURRENCY, ge=1, le=BATCH_MAX_CONCURRENCY),
+    bypass_cache: bool = False,
+    max_tokens: Optional[int] = Query(None, ge=1),
+    max_cost: Optional[float] = Query(None, gt=0),
+    formats: List[OutputFormat] = Query(list(DEFAULT_FORMATS)),
+):
+    try:
+        items = _parse_batch_body(await request.body())
+    except (ValueError, KeyError, UnicodeDecodeError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid batch body: {e}")
+
+    logger.info(f"Received /generate/batch request with {len(items)} items")
+
+    async def stream():
+        async for index, result, error in run_batch_async(
+            items, concurrency=concurrency, bypass_cache=bypass_cache, 
+            budget=_budget(max_tokens, max_cost), formats=formats,
+        ):
+            if error is not None:
+                line = {"index": index, "error": error}
+            else:
+                line = {
+                    "index": index,
+                    "html": result.get("formatted_data"),
+                    "rendered": result.get("rendered", {}),
+                    "validation": result.get("validation", {}),
+                    "retry_count": result.get("retry_count", 0),
+                    "usage": result.get("usage", {}),
+                    "cached": result.get("cached", False),
+                }
+            yield json.dumps(line, ensure_ascii=False) + "\n"
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+
+@app.post("/generate/stream")
+async def generate_stream(req: GenerateRequest, request: Request):
+    """Server-sent events: node progress, partial fields, drafts and interim validation"""
+    logger.info("Received /generate/stream request")
+
+    async def events():
+        stream = stream_pipeline(
+            req.input_json, bypass_cache=req.bypass_cache, budget=req.budget(), formats=req.formats
+        )
+        try:
+            async for event, data in stream:
+                if await request.is_disconnected():
+                    logger.info("Stream client disconnected, cancelling pipeline")
+                    break
+                yield f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+        except Exception as e:
+            logger.exception("Error in /generate/stream")
+            yield f"event: error\ndata: {json.dumps({'detail': str(e)})}\n\n"
+        finally:
+            await stream.aclose()
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def _job_rejected(e: JobRejected) -> HTTPException:
+    return HTTPException(status_code=e.status_code, detail=e.detail, headers={"Retry-After": str(e.retry_after)})
+
+
+@app.post("/jobs", status_code=202)
+async def submit_job(req: JobRequest):
+    """Queue a generation and return its id at once; poll GET /jobs/{id} or wait for the webhook"""
+    options = {"bypass_cache": req.bypass_cache, "budget": req.budget(), "formats": req.formats}
+    try:
+        job, created = await job_service.submit(
+            req.input_json, options, str(req.webhook_url) if req.webhook_url else None
+        )
+    except JobRejected as e:
+        logger.warning(f"Job rejected: {e.detail}")
+        raise _job_rejected(e)
+
+    return JSONResponse(
+        status_code=202 if created else 200,
+        content={**job, "deduplicated": not created},
+        headers={"Location": f"/jobs/{job['id']}"},
+    )
+
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    try:
+        job = await job_service.get(job_id)
+    except JobRejected as e:
+        raise _job_rejected(e)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@app.get("/results/{result_id}")
+async def get_result(result_id: str):
+    """A stored /generate result by id, looked up in the result index"""
+    result = await run_in_threadpool(result_store.get, result_id)
+    if result is None:
+        raise HTTPException(status_code=404, detail="Result not found")
+    return result
@@ -0,0 +1,75 @@
+"""Benchmark of consistency audits: LLM calls, tokens and wall time per backend.
+
+Checks the same canned candidates (see fake_models.canned_description) over the example
+inputs with each `content_audit` backend against the fake models, and reports what the
+audit costs: batched backends pay the instruction prompt once per batch instead of once
+per listing. Run from the repository root:
+    python -m benchmarks.bench_audit [--records 200] [--batch-size 4 8 16]
+"""
+import time
+import tempfile
+import argparse
+
+from loguru import logger
+
+from benchmarks.bench_rescore import build_archive
+from benchmarks.fake_models import FakeModelConfig, fake_factory
+from content_audit import SingleBackend, InlineBatchBackend, LocalBatchBackend
+from registry import registry
+from utils.rate_limiter import rate_limiter
+from utils.usage import track_usage, summarize_usage
+from validation_config.valid_config import CONSISTENCY_BATCH_SIZE
+
+
+def run(backend, pairs) -> dict:
+    with track_usage() as tracker:
+        started = time.perf_counter()
+        checks = backend.check(pairs)
+        elapsed = time.perf_counter() - started
+    usage = summarize_usage(tracker.usage)
+    return {
+        "elapsed": elapsed,
+        "calls": usage["calls"],
+        "input_tokens": usage["input_tokens"],
+        "output_tokens": usage["output_tokens"],
+        "cost": usage["cost_usd"],
+        "inconsistent": sum(not check.is_consistent for check in checks),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--inputs", default="example/input_case*.json")
+    parser.add_argument("--records", type=int, default=200)
+    parser.add_argument("--batch-size", type=int, nargs="+", default=[CONSISTENCY_BATCH_SIZE])
+    parser.add_argument("--valid-latency", type=float, default=0.05, help="seconds per fake consistency call")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    logger.remove()
+
+    rate_limiter.configure({})
+    registry.set_chat_model_factory(fake_factory(FakeModelConfig(valid_latency=args.valid_latency, seed=args.seed)))
+    results, input_jsons = build_archive(args.inputs, args.records, args.seed)
+    pairs = [(result.model_dump(), input_json) for result, input_json in zip(results, input_jsons)]
+
+    backends = [SingleBackend()]
+    workdir = tempfile.mkdtemp(prefix="audit_")
+    for size in args.batch_size:
+        backends += [InlineBatchBackend(batch_size=size), LocalBatchBackend(batch_size=size, workdir=workdir)]
+
+    print(f"Audit of {len(pairs)} listings")
+    print(f"{'backend':<10} {'batch':>5} {'calls':>6} {'in tok':>9} {'out tok':>8} {'cost $':>8} {'time s':>7}")
+    baseline = None
+    for backend in backends:
+        stats = run(backend, pairs)
+        baseline = baseline or stats
+        size = "-" if isinstance(backend, SingleBackend) else backend.batch_size
+        print(
+            f"{backend.name:<10} {size:>5} {stats['calls']:>6} {stats['input_tokens']:>9} {stats['output_tokens']:>8} "
+            f"{stats['cost']:>8.4f} {stats['elapsed']:>7.2f}"
+            f"  ({stats['input_tokens'] / max(baseline['input_tokens'], 1):.0%} of single's input tokens)"
+        )
+
+
+if __name__ == "__main__":
+    main()
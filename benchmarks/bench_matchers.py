@@ -0,0 +1,99 @@
+"""Microbenchmark of the precompiled language matchers against the original per-pattern loops.
+
+Run from the repository root:
+    python -m benchmarks.bench_matchers [--calls 20000]
+"""
+import re
+import random
+import argparse
+import timeit
+
+from validation_config.valid_lang_phrases import LLM_PHRASES, CTA_PATTERNS, PROPERTY_TYPES
+from validation_config.lang_matchers import count_llm_phrases, has_cta, has_property_type
+
+FILLER = (
+    "bright apartment close to shops and transport with generous rooms and a quiet street "
+    "offering daily convenience for families and professionals alike in a central district "
+).split()
+
+
+# Original QualityValidator code paths, kept verbatim for comparison
+def _loop_llm(text, language):
+    return sum(1 for phrase in LLM_PHRASES[language] if phrase in text.lower())
+
+
+def _loop_cta(text, language):
+    return any(re.search(pattern, text.lower()) for pattern in CTA_PATTERNS[language])
+
+
+def _loop_property(text, language):
+    title_text = text.lower()
+    return any(re.search(rf'\b{ptype}\b', title_text) for ptype in PROPERTY_TYPES[language])
+
+
+# Matcher code paths as called from QualityValidator (text lowered once by the caller)
+def _compiled_llm(text, language):
+    return count_llm_phrases(text.lower(), language)
+
+
+def _compiled_cta(text, language):
+    return has_cta(text.lower(), language)
+
+
+def _compiled_property(text, language):
+    return has_property_type(text.lower(), language)
+
+
+def _sample_text(rng: random.Random, vocabulary: list[str], words: int) -> str:
+    tokens = [rng.choice(FILLER) for _ in range(words)]
+    for _ in range(rng.randint(0, 4)):
+        tokens.insert(rng.randrange(len(tokens) + 1), rng.choice(vocabulary))
+    # Mixed case so that lowering is part of the measured work
+    return " ".join(t.capitalize() if rng.random() < 0.2 else t for t in tokens)
+
+
+def check_equivalence(samples: int = 2000, seed: int = 0) -> int:
+    rng = random.Random(seed)
+    checked = 0
+    for language in LLM_PHRASES:
+        for _ in range(samples):
+            text = _sample_text(rng, LLM_PHRASES[language], 120)
+            assert _compiled_llm(text, language) == _loop_llm(text, language), (language, text)
+            checked += 1
+    for language in CTA_PATTERNS:
+        for _ in range(samples):
+            text = _sample_text(rng, CTA_PATTERNS[language] + FILLER, 8)
+            assert _compiled_cta(text, language) == _loop_cta(text, language), (language, text)
+            checked += 1
+    for language in PROPERTY_TYPES:
+        for _ in range(samples):
+            text = _sample_text(rng, PROPERTY_TYPES[language] + [p + "s" for p in PROPERTY_TYPES[language]], 6)
+            assert _compiled_property(text, language) == _loop_property(text, language), (language, text)
+            checked += 1
+    return checked
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=20000)
+    args = parser.parse_args()
+
+    print(f"Equivalence: {check_equivalence()} random samples match the original loops\n")
+
+    rng = random.Random(1)
+    print(f"{'check':<15}{'lang':<6}{'loop us/call':>14}{'compiled us/call':>18}{'speedup':>10}")
+    cases = [
+        ("llm_phrases", LLM_PHRASES, 160, _loop_llm, _compiled_llm),
+        ("cta", CTA_PATTERNS, 8, _loop_cta, _compiled_cta),
+        ("property_type", PROPERTY_TYPES, 8, _loop_property, _compiled_property),
+    ]
+    for name, table, words, loop_fn, compiled_fn in cases:
+        for language, vocabulary in table.items():
+            text = _sample_text(rng, vocabulary, words)
+            loop_us = timeit.timeit(lambda: loop_fn(text, language), number=args.calls) / args.calls * 1e6
+            compiled_us = timeit.timeit(lambda: compiled_fn(text, language), number=args.calls) / args.calls * 1e6
+            print(f"{name:<15}{language:<6}{loop_us:>14.2f}{compiled_us:>18.2f}{loop_us / compiled_us:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
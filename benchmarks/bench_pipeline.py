@@ -0,0 +1,212 @@
+"""Offline benchmark of the pipeline's own overhead, with no network involved.
+
+The OpenAI models are replaced by the deterministic fakes in `benchmarks/fake_models.py`,
+so with zero fake latency every millisecond measured here is ours: graph execution,
+prompt handling, validation, rendering, caching and logging.
+
+Run from the repository root:
+    python -m benchmarks.bench_pipeline --concurrency 1 8 32 --requests 64
+    python -m benchmarks.bench_pipeline --gen-latency 0.5 --valid-latency 0.3 --defect-rate 0.3 --mechanical-rate 0.3
+    python -m benchmarks.bench_pipeline --exemplars --defect-rate 0.3 --exemplar-effect 0.5
+
+The exemplar index is redirected to a temporary file, so benchmark outputs never become exemplars
+of the real pipeline. With `--exemplars`, the sequential pass is repeated with the exemplar index
+seeded from the first pass's accepted outputs, to compare first-attempt pass rate and prompt tokens.
+"""
+import os
+import sys
+import glob
+import json
+import time
+import asyncio
+import argparse
+import tempfile
+import statistics
+import tracemalloc
+
+from collections import defaultdict
+from uuid import UUID
+from loguru import logger
+from langchain_core.callbacks import BaseCallbackHandler
+
+from registry import registry
+from utils.rate_limiter import rate_limiter
+from utils.exemplar_index import exemplar_index
+from benchmarks.fake_models import FakeModelConfig, fake_factory
+
+NODES = ("output_processing", "validate", "repair", "retry")
+
+
+class NodeTimer(BaseCallbackHandler):
+    """Wall time per graph node, taken from LangChain chain callbacks"""
+
+    run_inline = True
+
+    def __init__(self):
+        self._starts: dict[UUID, tuple[str, float]] = {}
+        self.durations: dict[str, list[float]] = defaultdict(list)
+
+    def on_chain_start(self, serialized, inputs, *, run_id, parent_run_id=None, metadata=None, **kwargs):
+        node = (metadata or {}).get("langgraph_node")
+        # Only the outermost run of a node: its inner RunnableLambda reports the same name
+        if node in NODES and kwargs.get("name") == node and parent_run_id not in self._starts:
+            self._starts[run_id] = (node, time.perf_counter())
+
+    def on_chain_end(self, outputs, *, run_id, **kwargs):
+        started = self._starts.pop(run_id, None)
+        if started:
+            node, t0 = started
+            self.durations[node].append(time.perf_counter() - t0)
+
+    def on_chain_error(self, error, *, run_id, **kwargs):
+        self._starts.pop(run_id, None)
+
+
+def _percentile(values: list[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def load_inputs(pattern: str) -> list[dict]:
+    inputs = []
+    for path in sorted(glob.glob(pattern)):
+        with open(path, "r", encoding="utf-8") as f:
+            inputs.append(json.load(f))
+    if not inputs:
+        raise SystemExit(f"No inputs match '{pattern}'")
+    return inputs
+
+
+def bench_sequential(inputs: list[dict], repeat: int) -> dict:
+    from main import run_pipeline
+
+    timer = NodeTimer()
+    latencies, retries, tokens, costs, first_attempt, passed, results = [], [], [], [], 0, 0, []
+    for _ in range(repeat):
+        for input_json in inputs:
+            t0 = time.perf_counter()
+            result = run_pipeline(input_json, bypass_cache=True, config={"callbacks": [timer]})
+            latencies.append(time.perf_counter() - t0)
+            results.append((input_json, result))
+            retries.append(result["retry_count"])
+            tokens.append(result["usage"]["total_tokens"])
+            costs.append(result["usage"]["cost_usd"])
+            first_attempt += int(result["retry_count"] == 0 and bool(result["validation"].get("passed")))
+            passed += int(bool(result["validation"].get("passed")))
+
+    return {
+        "requests": len(latencies),
+        "latencies": latencies,
+        "nodes": timer.durations,
+        "mean_retries": statistics.mean(retries),
+        "mean_tokens": statistics.mean(tokens),
+        "mean_cost": statistics.mean(costs),
+        "first_attempt_pass_rate": first_attempt / len(latencies),
+        "pass_rate": passed / len(latencies),
+        "results": results,
+    }
+
+
+def bench_memory(inputs: list[dict]) -> list[float]:
+    from main import run_pipeline
+
+    peaks = []
+    for input_json in inputs:
+        tracemalloc.start()
+        run_pipeline(input_json, bypass_cache=True)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        peaks.append(peak / 1024)
+    return peaks
+
+
+async def bench_throughput(inputs: list[dict], concurrency: int, requests: int) -> float:
+    from main import run_batch_async
+
+    items = [inputs[i % len(inputs)] for i in range(requests)]
+    t0 = time.perf_counter()
+    async for _ in run_batch_async(items, concurrency=concurrency, bypass_cache=True):
+        pass
+    return requests / (time.perf_counter() - t0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--inputs", default="example/input_case*.json")
+    parser.add_argument("--repeat", type=int, default=3, help="sequential passes over the inputs")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--requests", type=int, default=64, help="requests per concurrency level")
+    parser.add_argument("--gen-latency", type=float, default=0.0)
+    parser.add_argument("--valid-latency", type=float, default=0.0)
+    parser.add_argument("--defect-rate", type=float, default=0.0)
+    parser.add_argument("--inconsistency-rate", type=float, default=0.0)
+    parser.add_argument("--mechanical-rate", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="share of fake calls answered with a 429")
+    parser.add_argument("--rate-limits", action="store_true", help="apply MODEL_RATE_LIMITS (off: measure our own overhead only)")
+    parser.add_argument("--exemplars", action="store_true", help="repeat the sequential pass with exemplars in the prompt")
+    parser.add_argument("--exemplar-effect", type=float, default=0.0, help="share of fake defects avoided when exemplars are shown")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--verbose", action="store_true", help="keep pipeline logs on stderr")
+    args = parser.parse_args()
+
+    import main as pipeline  # noqa: F401  (configures the file log sink like the real app)
+    if not args.verbose:
+        logger.remove(0)
+        logger.add(sys.stderr, level="ERROR")
+
+    registry.set_chat_model_factory(fake_factory(FakeModelConfig(
+        gen_latency=args.gen_latency,
+        valid_latency=args.valid_latency,
+        defect_rate=args.defect_rate,
+        inconsistency_rate=args.inconsistency_rate,
+        mechanical_rate=args.mechanical_rate,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        exemplar_effect=args.exemplar_effect,
+        seed=args.seed,
+    )))
+    exemplar_index.clear(path=os.path.join(tempfile.mkdtemp(prefix="bench_exemplars_"), "index.npz"))
+    exemplar_index.enabled = False
+    if not args.rate_limits:
+        rate_limiter.configure({})
+    inputs = load_inputs(args.inputs)
+
+    seq = bench_sequential(inputs, args.repeat)
+    print(f"Sequential: {seq['requests']} requests over {len(inputs)} inputs")
+    print(f"  latency ms: mean={statistics.mean(seq['latencies']) * 1e3:.2f} "
+          f"p50={_percentile(seq['latencies'], 0.5) * 1e3:.2f} p95={_percentile(seq['latencies'], 0.95) * 1e3:.2f}")
+    print(f"  mean retries={seq['mean_retries']:.2f}  first-attempt pass rate={seq['first_attempt_pass_rate']:.1%}  final pass rate={seq['pass_rate']:.1%}")
+    print(f"  mean tokens/request={seq['mean_tokens']:.0f}  mean cost/request=${seq['mean_cost']:.5f} (estimated)")
+
+    if args.exemplars:
+        exemplar_index.enabled = True
+        for input_json, result in seq["results"]:
+            exemplar_index.add(input_json, result["struct_data"], result["validation"])
+        with_exemplars = bench_sequential(inputs, args.repeat)
+        exemplar_index.enabled = False
+        print(f"\nExemplars ({exemplar_index.stats()['exemplars']} in the index):")
+        print(f"  {'':<18}{'first-attempt pass':>20}{'mean retries':>14}{'tokens/request':>16}{'latency ms':>12}")
+        for name, run in (("without exemplars", seq), ("with exemplars", with_exemplars)):
+            print(f"  {name:<18}{run['first_attempt_pass_rate']:>20.1%}{run['mean_retries']:>14.2f}"
+                  f"{run['mean_tokens']:>16.0f}{statistics.mean(run['latencies']) * 1e3:>12.2f}")
+
+    print("\nPer-node latency (ms):")
+    print(f"  {'node':<20}{'calls':>8}{'mean':>10}{'p50':>10}{'p95':>10}")
+    for node in NODES:
+        values = seq["nodes"].get(node, [])
+        if values:
+            print(f"  {node:<20}{len(values):>8}{statistics.mean(values) * 1e3:>10.3f}"
+                  f"{_percentile(values, 0.5) * 1e3:>10.3f}{_percentile(values, 0.95) * 1e3:>10.3f}")
+
+    peaks = bench_memory(inputs)
+    print(f"\nMemory per request (tracemalloc peak): mean={statistics.mean(peaks):.1f} KiB max={max(peaks):.1f} KiB")
+
+    print("\nThroughput (async, run_batch_async):")
+    for concurrency in args.concurrency:
+        rate = asyncio.run(bench_throughput(inputs, concurrency, args.requests))
+        print(f"  concurrency={concurrency:<4} {rate:>10.1f} listings/s")
+
+
+if __name__ == "__main__":
+    main()
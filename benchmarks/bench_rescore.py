@@ -0,0 +1,80 @@
+"""Benchmark of archive re-scoring: per-object validation against QualityValidator.validate_batch.
+
+Builds an archive of canned candidates (see fake_models.canned_description) over the
+example inputs, with a share of defective and mechanically broken ones, and checks that
+both paths agree before timing them. Run from the repository root:
+    python -m benchmarks.bench_rescore [--records 20000] [--workers 4]
+"""
+import glob
+import json
+import time
+import random
+import argparse
+
+from loguru import logger
+
+from benchmarks.fake_models import canned_description
+from content_validation import QualityValidator
+from validation_config.valid_config import RESCORE_CHUNK_SIZE
+
+
+def build_archive(pattern: str, records: int, seed: int) -> tuple[list, list[dict]]:
+    rng = random.Random(seed)
+    inputs = [json.load(open(path, encoding="utf-8")) for path in sorted(glob.glob(pattern))]
+    results, input_jsons = [], []
+    for _ in range(records):
+        listing = rng.choice(inputs)
+        results.append(canned_description(listing, defective=rng.random() < 0.2, mechanical=rng.random() < 0.2))
+        input_jsons.append(listing)
+    return results, input_jsons
+
+
+def per_object(results, input_jsons) -> list[dict]:
+    """What re-scoring costs through the pipeline's layer checks, one object at a time"""
+    out = []
+    for result, input_json in zip(results, input_jsons):
+        language = input_json.get("language", "en")
+        out.append({
+            "structural": QualityValidator.check_structural_constraints(result),
+            "linguistic": QualityValidator.check_linguistic_quality(result, language),
+            "seo": QualityValidator.check_seo_effectiveness(result, input_json, language),
+        })
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--inputs", default="example/input_case*.json")
+    parser.add_argument("--records", type=int, default=20000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4])
+    parser.add_argument("--chunk-size", type=int, default=RESCORE_CHUNK_SIZE)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    logger.remove()
+
+    results, input_jsons = build_archive(args.inputs, args.records, args.seed)
+    rows = [result.model_dump() for result in results]
+    print(f"Archive: {len(rows)} candidates over {len(set(map(json.dumps, input_jsons)))} inputs")
+
+    started = time.perf_counter()
+    expected = per_object(results, input_jsons)
+    elapsed = time.perf_counter() - started
+    print(f"  per-object checks:         {elapsed:7.2f}s  {len(rows) / elapsed:9.0f} records/s")
+
+    for workers in args.workers:
+        started = time.perf_counter()
+        validations = QualityValidator.validate_batch(rows, input_jsons, workers=workers, chunk_size=args.chunk_size)
+        elapsed = time.perf_counter() - started
+        print(f"  validate_batch workers={workers:<3} {elapsed:7.2f}s  {len(rows) / elapsed:9.0f} records/s")
+
+    mismatches = sum(
+        1 for layers, validation in zip(expected, validations)
+        if any(validation["category_scores"][k] != layer[0] for k, layer in layers.items())
+        or validation["issues"] != [i for layer in layers.values() for i in layer[1]]
+        or validation["warnings"] != [w for layer in layers.values() for w in layer[2]]
+    )
+    print(f"  mismatches against per-object checks: {mismatches}")
+
+
+if __name__ == "__main__":
+    main()
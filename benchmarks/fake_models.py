@@ -0,0 +1,239 @@
+"""Deterministic stand-ins for the OpenAI chat models, for offline benchmarks.
+
+`FakeChatModel` plugs into `registry.set_chat_model_factory` and returns canned
+`SEODescription` / `ConsistencyCheck` objects built from the listing in the prompt,
+with configurable latency and failure patterns. No network is involved.
+Token usage is estimated at ~4 characters per token, so cost accounting can be exercised too.
+"""
+import json
+import time
+import random
+import asyncio
+import threading
+
+import httpx
+
+from dataclasses import dataclass
+from typing import Optional
+
+from langchain_core.messages import AIMessage
+from openai import RateLimitError
+
+from models import SEODescription, ConsistencyCheck, ConsistencyCheckBatch, IndexedConsistencyCheck
+
+FILLER_SENTENCES = [
+    "Local shops, cafes and services are within a short walk.",
+    "Public transport links make commuting across the city straightforward.",
+    "The neighbourhood balances residential calm with urban convenience.",
+    "Schools, markets and green spaces can be reached without a car.",
+    "Daily errands are simple thanks to nearby supermarkets and pharmacies.",
+    "Weekend plans are easy with restaurants and cultural venues close by.",
+    "Families and professionals alike appreciate this practical setting.",
+    "Viewings can be arranged at short notice through our agency.",
+]
+
+FEATURE_SENTENCES = {
+    "bedrooms": "There are {v} bedrooms.",
+    "bathrooms": "It has {v} bathrooms.",
+    "area_sqm": "The home measures {v} square metres.",
+    "balcony": "A private balcony adds outdoor space.",
+    "parking": "A parking space is included.",
+    "elevator": "Lift access serves the building.",
+    "floor": "It sits on floor {v}.",
+    "year_built": "The building dates from {v}.",
+}
+
+
+@dataclass
+class FakeModelConfig:
+    gen_latency: float = 0.0  # seconds per generation call
+    valid_latency: float = 0.0  # seconds per consistency call
+    defect_rate: float = 0.0  # share of generations with repetitive text (forces an LLM retry)
+    mechanical_rate: float = 0.0  # share of generations with an over-long title (fixed by the local repair pass)
+    inconsistency_rate: float = 0.0  # share of consistency checks reporting a fabricated feature
+    error_rate: float = 0.0  # share of calls raising, as a provider error would
+    rate_limit_rate: float = 0.0  # share of calls answered with a 429 (retried by the rate limiter)
+    retry_after_ms: int = 50  # Retry-After sent with simulated 429s
+    exemplar_effect: float = 0.0  # share of defects avoided when the prompt carries reference examples (assumed, not measured)
+    seed: int = 0
+
+
+class FakeModelError(RuntimeError):
+    pass
+
+
+def _content(message) -> str:
+    return message[1] if isinstance(message, tuple) else getattr(message, "content", "")
+
+
+def _listing_from_messages(messages) -> dict:
+    for message in messages:
+        content = _content(message)
+        try:
+            data = json.loads(content)
+        except (TypeError, ValueError):
+            continue
+        if isinstance(data, dict):
+            return data
+    return {}
+
+
+def _fit(sentences: list[str], low: int, high: int) -> str:
+    text = ""
+    for sentence in sentences + FILLER_SENTENCES:
+        candidate = f"{text}\n{sentence}" if text else sentence
+        if len(candidate) > high:
+            break
+        text = candidate
+        if len(text) >= low:
+            break
+    return text
+
+
+def canned_description(listing: dict, defective: bool = False, mechanical: bool = False) -> SEODescription:
+    location = listing.get("location") or {}
+    features = listing.get("features") or {}
+    city = location.get("city", "the city")
+    neighborhood = location.get("neighborhood") or city
+    listing_type = "for rent" if listing.get("listing_type") == "rent" else "for sale"
+    base_title = listing.get("title") or f"Property {listing_type} in {city}"
+
+    present = {k: v for k, v in features.items() if v not in (None, False)}
+    facts = [f"{k.replace('_', ' ')} {v}" if v is not True else k for k, v in present.items()]
+    title = f"{base_title[:40]} in {neighborhood}"[:58]
+    if mechanical:
+        title = f"{title} - an exceptional opportunity in a sought-after location"
+
+    full_description = _fit(
+        [f"This property {listing_type} is located in {neighborhood}, {city}."]
+        + [FEATURE_SENTENCES[k].format(v=v) for k, v in present.items() if k in FEATURE_SENTENCES],
+        low=600,
+        high=680,
+    )
+    if defective:
+        full_description = _fit([f"This property {listing_type} is located in {neighborhood}, {city}."] * 12, low=600, high=680)
+
+    return SEODescription(
+        title=title,
+        meta_description=(f"{base_title} {listing_type} in {neighborhood}, {city}. " + ", ".join(facts)[:80])[:150],
+        headline=f"{base_title} {listing_type} in {neighborhood}, {city}",
+        full_description=full_description,
+        key_features=(facts or ["Central location", "Good transport links", "Local services nearby"])[:5],
+        summary=f"{neighborhood} is a well connected part of {city} with shops, cafes and everyday services close at hand.",
+        action="Contact us today to schedule a visit.",
+    )
+
+
+def _estimate_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+class FakeStructuredModel:
+    def __init__(self, schema: type, owner: "FakeChatModel", include_raw: bool = False):
+        self.schema = schema
+        self.owner = owner
+        self.include_raw = include_raw
+
+    def _wrap(self, messages, parsed):
+        if not self.include_raw:
+            return parsed
+        prompt = "".join(str(_content(message)) for message in messages)
+        output = parsed.model_dump_json()
+        raw = AIMessage(content=output, usage_metadata={
+            "input_tokens": _estimate_tokens(prompt),
+            "output_tokens": _estimate_tokens(output),
+            "total_tokens": _estimate_tokens(prompt) + _estimate_tokens(output),
+        })
+        return {"raw": raw, "parsed": parsed, "parsing_error": None}
+
+    def _respond(self, messages):
+        owner = self.owner
+        if owner.draw(owner.config.error_rate):
+            raise FakeModelError("Simulated provider error")
+        if owner.draw(owner.config.rate_limit_rate):
+            response = httpx.Response(
+                429, 
+                headers={"retry-after-ms": str(owner.config.retry_after_ms)},
+                request=httpx.Request("POST", "https://api.openai.com/v1/chat/completions"),
+            )
+            raise RateLimitError("Simulated rate limit", response=response, body=None)
+
+        if self.schema is ConsistencyCheckBatch:
+            # One report per "### LISTING n" block of the batched prompt
+            count = _content(messages[0]).count("### LISTING ")
+            return ConsistencyCheckBatch(checks=[
+                IndexedConsistencyCheck(index=i, **self._consistency().model_dump()) for i in range(1, count + 1)
+            ])
+
+        listing = _listing_from_messages(messages)
+        if self.schema is ConsistencyCheck:
+            return self._consistency()
+
+        # With reference examples in the prompt, `exemplar_effect` of the defects are avoided
+        examples = any("### EXAMPLE" in str(_content(message)) for message in messages)
+        keep = 1.0 - owner.config.exemplar_effect if examples else 1.0
+        description = canned_description(
+            listing, 
+            defective=owner.draw(owner.config.defect_rate * keep),
+            mechanical=owner.draw(owner.config.mechanical_rate * keep),
+        )
+        if self.schema is SEODescription:
+            return description
+        # Partial schema of a repair retry
+        return self.schema(**description.model_dump(include=set(self.schema.model_fields)))
+
+    def _consistency(self) -> ConsistencyCheck:
+        if self.owner.draw(self.owner.config.inconsistency_rate):
+            return ConsistencyCheck(
+                is_consistent=False,
+                fabricated_features=["mentions a swimming pool that is not in the JSON"],
+                summary="Fabricated feature",
+            )
+        return ConsistencyCheck(is_consistent=True, summary="All consistent")
+
+    def _latency(self) -> float:
+        if self.schema in (ConsistencyCheck, ConsistencyCheckBatch):
+            return self.owner.config.valid_latency
+        # Generation time scales with the number of fields written
+        return self.owner.config.gen_latency * len(self.schema.model_fields) / len(SEODescription.model_fields)
+
+    def invoke(self, messages, config=None, **kwargs):
+        time.sleep(self._latency())
+        return self._wrap(messages, self._respond(self._messages(messages)))
+
+    async def ainvoke(self, messages, config=None, **kwargs):
+        await asyncio.sleep(self._latency())
+        return self._wrap(messages, self._respond(self._messages(messages)))
+
+    def _messages(self, messages):
+        if self.schema is ConsistencyCheck:
+            # The consistency prompt embeds the listing JSON in a fenced block
+            prompt = messages[0][1]
+            start, end = prompt.find("```json"), prompt.find("```", prompt.find("```json") + 7)
+            return [("user", prompt[start + 7:end])] if start >= 0 else messages
+        return messages
+
+
+class FakeChatModel:
+    """Drop-in for ChatOpenAI as far as the pipeline is concerned"""
+
+    def __init__(self, model: str, temperature: float, config: Optional[FakeModelConfig] = None):
+        self.model = model
+        self.temperature = temperature
+        self.config = config or FakeModelConfig()
+        self._rng = random.Random(self.config.seed)
+        self._lock = threading.Lock()
+
+    def draw(self, rate: float) -> bool:
+        if rate <= 0:
+            return False
+        with self._lock:
+            return self._rng.random() < rate
+
+    def with_structured_output(self, schema: type, include_raw: bool = False, **kwargs):
+        return FakeStructuredModel(schema, self, include_raw=include_raw)
+
+
+def fake_factory(config: FakeModelConfig):
+    """Factory for `registry.set_chat_model_factory`"""
+    return lambda model, temperature: FakeChatModel(model, temperature, config)
@@ -0,0 +1,282 @@
+"""Bulk runner: generate content for a whole inventory of listings.
+
+Reads a JSONL file (one listing per line) or a directory of JSON files, runs the
+listings concurrently and writes sharded JSONL (or one HTML file per listing).
+Every finished listing is appended to a checkpoint file, so an interrupted run
+(crash or Ctrl-C) resumes without regenerating what is already done.
+
+    python bulk.py inventory.jsonl --output results/bulk --concurrency 32
+    python bulk.py listings_dir/ --format html --shard-size 500
+    python bulk.py inventory.jsonl --render json jsonld   # no HTML is rendered at all
+"""
+import os
+import re
+import sys
+import json
+import time
+import asyncio
+import argparse
+
+from typing import Iterable, Iterator, Optional
+from loguru import logger
+
+from main import run_batch_async
+from content_rendering import FORMATS
+from pipeline_config.pipeline_config import (
+    BATCH_CONCURRENCY,
+    BULK_SHARD_SIZE,
+    BULK_PROGRESS_EVERY,
+)
+
+CHECKPOINT_FILE = "checkpoint.jsonl"
+
+
+def iter_inputs(path: str) -> Iterator[tuple[str, Optional[dict], Optional[str]]]:
+    """Yields `(key, input_json, error)`. Keys are stable across runs and drive the checkpoint.
+
+    A listing's own `id` / `listing_id` is used when present, otherwise its position:
+    `<file>:<line>` for JSONL, the file name for a directory.
+    """
+    if os.path.isdir(path):
+        for name in sorted(os.listdir(path)):
+            if not name.endswith(".json"):
+                continue
+            try:
+                with open(os.path.join(path, name), "r", encoding="utf-8") as f:
+                    item = json.load(f)
+            except (OSError, ValueError) as e:
+                yield name, None, f"Unreadable input: {e}"
+                continue
+            yield _keyed(name, item)
+        return
+
+    base = os.path.basename(path)
+    with open(path, "r", encoding="utf-8") as f:
+        for line_no, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                item = json.loads(line)
+            except ValueError as e:
+                yield f"{base}:{line_no}", None, f"Invalid JSON: {e}"
+                continue
+            yield _keyed(f"{base}:{line_no}", item)
+
+
+def _keyed(default_key: str, item) -> tuple[str, Optional[dict], Optional[str]]:
+    if not isinstance(item, dict):
+        return default_key, None, "Input is not a JSON object"
+    # Accept the /generate request shape as well
+    input_json = item["input_json"] if isinstance(item.get("input_json"), dict) else item
+    key = item.get("id") or input_json.get("id") or input_json.get("listing_id") or default_key
+    return str(key), input_json, None
+
+
+class Checkpoint:
+    """Append-only record of finished keys; the last entry for a key wins"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.done: set[str] = set()
+        self.failed: set[str] = set()
+        torn = False
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    torn = not line.endswith("\n")
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue  # torn last line of a crashed run
+                    (self.done if entry["status"] == "done" else self.failed).add(entry["key"])
+            self.failed -= self.done
+        self._file = open(path, "a", encoding="utf-8")
+        if torn:
+            # Otherwise the first new entry would be glued to the torn line and lost
+            self._file.write("\n")
+
+    def record(self, key: str, status: str, **extra):
+        self._file.write(json.dumps({"key": key, "status": status, **extra}, ensure_ascii=False) + "\n")
+        self._file.flush()
+        (self.done if status == "done" else self.failed).add(key)
+
+    def close(self):
+        self._file.close()
+
+
+class ShardWriter:
+    """Writes results as JSONL shards of `shard_size` records, or as HTML files in shard directories"""
+
+    def __init__(self, output_dir: str, fmt: str, shard_size: int):
+        self.output_dir = output_dir
+        self.fmt = fmt
+        self.shard_size = shard_size
+        self._count = 0
+        self._file = None
+        # A resumed run starts a new shard instead of appending to one that may end in a torn record
+        existing = [int(m.group(1)) for name in os.listdir(output_dir) if (m := re.match(r"shard-(\d+)", name))]
+        self._shard = max(existing) + 1 if existing else 0
+
+    def _shard_name(self) -> str:
+        return f"shard-{self._shard:05d}"
+
+    def _rotate(self):
+        if self._count and self._count % self.shard_size == 0:
+            self._shard += 1
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def write(self, record: dict) -> str:
+        """Writes one record and returns where it went"""
+        self._rotate()
+        self._count += 1
+
+        if self.fmt == "html":
+            shard_dir = os.path.join(self.output_dir, self._shard_name())
+            os.makedirs(shard_dir, exist_ok=True)
+            path = os.path.join(shard_dir, re.sub(r"[^\w.-]", "_", record["key"]) + ".html")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(record.get("html") or "")
+            return path
+
+        if self._file is None:
+            self._file = open(os.path.join(self.output_dir, f"{self._shard_name()}.jsonl"), "a", encoding="utf-8")
+        self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._file.flush()
+        return self._file.name
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+
+
+def _record(key: str, result: dict) -> dict:
+    return {
+        "key": key,
+        "html": result.get("formatted_data"),
+        "rendered": {fmt: doc for fmt, doc in result.get("rendered", {}).items() if fmt != "html"},
+        "structured_data": result.get("struct_data"),
+        "validation": result.get("validation", {}),
+        "retry_count": result.get("retry_count", 0),
+        "local_repairs": result.get("local_repairs", []),
+        "usage": result.get("usage", {}),
+        "cached": result.get("cached", False),
+    }
+
+
+async def run_bulk(
+    input_path: str,
+    output_dir: str,
+    fmt: str = "jsonl",
+    shard_size: int = BULK_SHARD_SIZE,
+    concurrency: int = BATCH_CONCURRENCY,
+    bypass_cache: bool = False,
+    budget: Optional[dict] = None,
+    retry_failed: bool = False,
+    limit: Optional[int] = None,
+    formats: Iterable[str] = ("html",),
+) -> dict:
+    formats = tuple(formats)
+    if fmt == "html" and "html" not in formats:
+        formats = ("html", *formats)
+    os.makedirs(output_dir, exist_ok=True)
+    checkpoint = Checkpoint(os.path.join(output_dir, CHECKPOINT_FILE))
+    writer = ShardWriter(output_dir, fmt, shard_size)
+    stats = {"done": 0, "failed": 0, "skipped": 0, "cost_usd": 0.0}
+    keys: dict[int, str] = {}
+
+    def pending():
+        scheduled = 0
+        for key, input_json, error in iter_inputs(input_path):
+            if key in checkpoint.done or (key in checkpoint.failed and not retry_failed):
+                stats["skipped"] += 1
+                continue
+            if limit is not None and scheduled >= limit:
+                return
+            if error is not None:
+                logger.error(f"{key}: {error}")
+                checkpoint.record(key, "failed", error=error)
+                stats["failed"] += 1
+                continue
+            keys[scheduled] = key
+            scheduled += 1
+            yield input_json
+
+    started = time.perf_counter()
+    try:
+        async for index, result, error in run_batch_async(
+            pending(), concurrency=concurrency, bypass_cache=bypass_cache, budget=budget, formats=formats
+        ):
+            key = keys.pop(index)
+            if error is not None:
+                checkpoint.record(key, "failed", error=error)
+                stats["failed"] += 1
+            else:
+                record = _record(key, result)
+                location = writer.write(record)
+                # Checkpoint after the output is written: a crash in between repeats the item, never loses it
+                checkpoint.record(key, "done", output=location, passed=record["validation"].get("passed"))
+                stats["done"] += 1
+                stats["cost_usd"] += record["usage"].get("cost_usd", 0.0)
+
+            finished = stats["done"] + stats["failed"]
+            if finished % BULK_PROGRESS_EVERY == 0:
+                rate = finished / (time.perf_counter() - started)
+                print(f"[bulk] {finished} finished ({stats['failed']} failed), {rate:.1f} listings/s, ${stats['cost_usd']:.2f}", file=sys.stderr)
+    finally:
+        writer.close()
+        checkpoint.close()
+
+    stats["elapsed"] = time.perf_counter() - started
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("input", help="JSONL file or directory of JSON files")
+    parser.add_argument("--output", default="results/bulk", help="output directory (holds shards and the checkpoint)")
+    parser.add_argument("--format", choices=["jsonl", "html"], default="jsonl")
+    parser.add_argument("--render", nargs="+", choices=FORMATS, default=["html"], help="renderings stored per listing (--format html always includes html)")
+    parser.add_argument("--shard-size", type=int, default=BULK_SHARD_SIZE, help="records per JSONL shard / files per HTML directory")
+    parser.add_argument("--concurrency", type=int, default=BATCH_CONCURRENCY)
+    parser.add_argument("--bypass-cache", action="store_true")
+    parser.add_argument("--max-tokens", type=int, help="token budget per listing")
+    parser.add_argument("--max-cost", type=float, help="USD budget per listing")
+    parser.add_argument("--retry-failed", action="store_true", help="run listings that failed in a previous run again")
+    parser.add_argument("--limit", type=int, help="process at most this many pending listings")
+    parser.add_argument("--log-level", default="WARNING", help="console log level (the log file keeps INFO)")
+    args = parser.parse_args()
+
+    logger.remove(0)
+    logger.add(sys.stderr, level=args.log_level)
+
+    budget = None
+    if args.max_tokens is not None or args.max_cost is not None:
+        budget = {"max_tokens": args.max_tokens, "max_cost": args.max_cost}
+
+    try:
+        stats = asyncio.run(run_bulk(
+            args.input,
+            args.output,
+            fmt=args.format,
+            shard_size=args.shard_size,
+            concurrency=args.concurrency,
+            bypass_cache=args.bypass_cache,
+            budget=budget,
+            retry_failed=args.retry_failed,
+            limit=args.limit,
+            formats=args.render,
+        ))
+    except KeyboardInterrupt:
+        print("[bulk] interrupted; run the same command again to resume", file=sys.stderr)
+        sys.exit(130)
+
+    print(
+        f"[bulk] done={stats['done']} failed={stats['failed']} skipped={stats['skipped']} "
+        f"in {stats['elapsed']:.1f}s, estimated cost ${stats['cost_usd']:.2f}"
+    )
+
+
+if __name__ == "__main__":
+    main()
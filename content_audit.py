@@ -0,0 +1,314 @@
+"""Batched LLM consistency checks for audits of already generated listings.
+
+The per-listing check sends the full instruction prompt once per listing. For audits,
+a backend packs several (input_json, content) pairs into one `ConsistencyCheckBatch`
+request, so the instructions are paid once per batch and there are fewer round trips:
+
+- `single`: one request per listing, as in the pipeline
+- `inline`: batched structured-output requests, answered right away
+- `openai-batch`: the same requests as an OpenAI Batch API file (cheaper, completes within a day)
+- `local`: the Batch API file flow answered by the registry's chat model (tests, fake models)
+
+Listings missing from a batched answer are re-checked one by one.
+"""
+import os
+import json
+import time
+import uuid
+import contextvars
+
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Union
+from loguru import logger
+from langchain_core.messages import AIMessage
+
+from models import SEODescription, ConsistencyCheck, ConsistencyCheckBatch
+from registry import registry
+from content_validation import LLMConsistencyValidator
+from utils.metrics import metrics
+from utils.prompt_registry import prompt_registry
+from utils.rate_limiter import rate_limiter
+from utils.usage import batch_model, parse_structured_response, record_usage
+from validation_config.valid_config import (
+    VALID_MODEL,
+    VALID_TEMPERATURE,
+    CONSISTENCY_BACKEND,
+    CONSISTENCY_BATCH_SIZE,
+    CONSISTENCY_BATCH_CONCURRENCY,
+    CONSISTENCY_BATCH_DIR,
+    CONSISTENCY_BATCH_POLL_INTERVAL,
+    CONSISTENCY_BATCH_WINDOW,
+)
+
+AUDIT_CHECKS = metrics.counter(
+    "seo_consistency_audit_checks_total", "Listings checked by audit consistency backends", ["backend", "outcome"])
+
+Pair = tuple[dict, dict]  # (content fields, input_json)
+
+
+def batch_prompt(pairs: list[Pair]) -> str:
+    items = "\n\n".join(
+        f"### LISTING {i}\n"
+        f"SOURCE JSON DATA:\n```json\n{json.dumps(input_json, indent=2, ensure_ascii=False)}\n```\n"
+        f"GENERATED TEXT:\n```\n{LLMConsistencyValidator.full_content(SEODescription(**content))}\n```"
+        for i, (content, input_json) in enumerate(pairs, 1)
+    )
+    return prompt_registry.get("valid_batch").format(count=len(pairs), items=items)
+
+
+def _by_index(batch: ConsistencyCheckBatch, size: int) -> dict[int, ConsistencyCheck]:
+    """Reports keyed by 0-based position; out-of-range and duplicate indices are dropped"""
+    checks = {}
+    for check in batch.checks:
+        if 1 <= check.index <= size and check.index - 1 not in checks:
+            checks[check.index - 1] = ConsistencyCheck(**check.model_dump(exclude={"index"}))
+    return checks
+
+
+class ConsistencyBackend(ABC):
+    """Checks many (content, input_json) pairs; returns one ConsistencyCheck per pair, in order"""
+
+    name = "base"
+
+    def __init__(self, model: str = VALID_MODEL, temperature: float = VALID_TEMPERATURE, batch_size: int = CONSISTENCY_BATCH_SIZE):
+        self.model = model
+        self.temperature = temperature
+        self.batch_size = batch_size
+
+    def _groups(self, pairs: list[Pair]) -> list[list[Pair]]:
+        return [pairs[i:i + self.batch_size] for i in range(0, len(pairs), self.batch_size)]
+
+    def _single(self, pair: Pair) -> ConsistencyCheck:
+        content, input_json = pair
+        validator = LLMConsistencyValidator(model=self.model, temperature=self.temperature)
+        return validator.validate(SEODescription(**content), input_json)
+
+    def _complete(self, pairs: list[Pair], checks: dict[int, ConsistencyCheck]) -> list[ConsistencyCheck]:
+        """Fill in pairs the batched answers did not cover with single checks"""
+        missing = [i for i in range(len(pairs)) if i not in checks]
+        if missing:
+            logger.warning(f"{self.name}: {len(missing)}/{len(pairs)} listings missing from batched answers, checking them one by one")
+        for i in missing:
+            checks[i] = self._single(pairs[i])
+        AUDIT_CHECKS.inc(len(pairs) - len(missing), backend=self.name, outcome="batched")
+        AUDIT_CHECKS.inc(len(missing), backend=self.name, outcome="fallback")
+        return [checks[i] for i in range(len(pairs))]
+
+    @abstractmethod
+    def check(self, pairs: list[Pair]) -> list[ConsistencyCheck]:
+        ...
+
+
+class SingleBackend(ConsistencyBackend):
+    """One request per listing, exactly as the pipeline does it"""
+
+    name = "single"
+
+    def check(self, pairs: list[Pair]) -> list[ConsistencyCheck]:
+        with ThreadPoolExecutor(max_workers=CONSISTENCY_BATCH_CONCURRENCY) as pool:
+            futures = [pool.submit(contextvars.copy_context().run, self._single, pair) for pair in pairs]
+            checks = [future.result() for future in futures]
+        AUDIT_CHECKS.inc(len(pairs), backend=self.name, outcome="single")
+        return checks
+
+
+class InlineBatchBackend(ConsistencyBackend):
+    """`batch_size` listings per structured-output request, `concurrency` requests in flight"""
+
+    name = "inline"
+
+    def __init__(self, concurrency: int = CONSISTENCY_BATCH_CONCURRENCY, **kwargs):
+        super().__init__(**kwargs)
+        self.concurrency = concurrency
+
+    def _check_group(self, group: list[Pair]) -> dict[int, ConsistencyCheck]:
+        structured_llm = registry.get_structured_llm(ConsistencyCheckBatch, self.model, self.temperature)
+        try:
+            response = rate_limiter.invoke(structured_llm, [("user", batch_prompt(group))], self.model, "consistency_batch")
+            return _by_index(parse_structured_response(response, self.model), len(group))
+        except Exception as e:
+            logger.error(f"Batched consistency request for {len(group)} listings failed: {e}")
+            return {}
+
+    def check(self, pairs: list[Pair]) -> list[ConsistencyCheck]:
+        groups = self._groups(pairs)
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            futures = [pool.submit(contextvars.copy_context().run, self._check_group, group) for group in groups]
+            answers = [future.result() for future in futures]
+
+        checks = {}
+        for g, answer in enumerate(answers):
+            checks.update({g * self.batch_size + i: check for i, check in answer.items()})
+        return self._complete(pairs, checks)
+
+
+class BatchFileBackend(ConsistencyBackend):
+    """Writes the batched requests as an OpenAI Batch API input file and parses its output file.
+
+    Subclasses decide how the file is executed (`_execute`). Both files are kept in `workdir`.
+    Usage is recorded under `<model>:batch`, at the Batch API price.
+    """
+
+    def __init__(self, workdir: str = CONSISTENCY_BATCH_DIR, **kwargs):
+        super().__init__(**kwargs)
+        self.workdir = workdir
+
+    def _request(self, custom_id: str, group: list[Pair]) -> dict:
+        return {
+            "custom_id": custom_id,
+            "method": "POST",
+            "url": "/v1/chat/completions",
+            "body": {
+                "model": self.model,
+                "temperature": self.temperature,
+                "messages": [{"role": "user", "content": batch_prompt(group)}],
+                "response_format": {
+                    "type": "json_schema",
+                    "json_schema": {"name": "ConsistencyCheckBatch", "schema": ConsistencyCheckBatch.model_json_schema()},
+                },
+            },
+        }
+
+    @abstractmethod
+    def _execute(self, run_id: str, request_path: str) -> list[str]:
+        """Runs the request file; returns the lines of the output file"""
+
+    def _parse(self, line: str, groups: dict[str, list[Pair]]) -> tuple[Optional[str], dict[int, ConsistencyCheck]]:
+        try:
+            entry = json.loads(line)
+            custom_id = entry["custom_id"]
+            response = entry.get("response") or {}
+            if response.get("status_code") != 200:
+                logger.error(f"Batch request {custom_id} failed: {entry.get('error') or response.get('status_code')}")
+                return custom_id, {}
+            body = response["body"]
+            usage = body.get("usage") or {}
+            # Priced at the Batch API rate, not the synchronous one
+            record_usage(batch_model(self.model), AIMessage(content="", usage_metadata={
+                "input_tokens": usage.get("prompt_tokens", 0),
+                "output_tokens": usage.get("completion_tokens", 0),
+                "total_tokens": usage.get("total_tokens", 0),
+                "input_token_details": {"cache_read": (usage.get("prompt_tokens_details") or {}).get("cached_tokens", 0)},
+            }))
+            batch = ConsistencyCheckBatch.model_validate_json(body["choices"][0]["message"]["content"])
+            return custom_id, _by_index(batch, len(groups.get(custom_id, [])))
+        except (ValueError, KeyError, IndexError, TypeError) as e:
+            logger.error(f"Unreadable batch output line: {e}")
+            return None, {}
+
+    def check(self, pairs: list[Pair]) -> list[ConsistencyCheck]:
+        run_id = f"{time.strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}"
+        os.makedirs(self.workdir, exist_ok=True)
+        request_path = os.path.join(self.workdir, f"{run_id}.requests.jsonl")
+
+        groups = {f"group-{g}": group for g, group in enumerate(self._groups(pairs))}
+        with open(request_path, "w", encoding="utf-8") as f:
+            for custom_id, group in groups.items():
+                f.write(json.dumps(self._request(custom_id, group), ensure_ascii=False) + "\n")
+        logger.info(f"{self.name}: {len(pairs)} listings in {len(groups)} requests written to '{request_path}'")
+
+        checks = {}
+        for line in self._execute(run_id, request_path):
+            if not line.strip():
+                continue
+            custom_id, answer = self._parse(line, groups)
+            if custom_id in groups:
+                offset = int(custom_id.split("-")[1]) * self.batch_size
+                checks.update({offset + i: check for i, check in answer.items()})
+        return self._complete(pairs, checks)
+
+
+class OpenAIBatchBackend(BatchFileBackend):
+    """Submits the request file to the OpenAI Batch API and waits for it to finish"""
+
+    name = "openai-batch"
+
+    def __init__(self, poll_interval: float = CONSISTENCY_BATCH_POLL_INTERVAL, completion_window: str = CONSISTENCY_BATCH_WINDOW, **kwargs):
+        super().__init__(**kwargs)
+        self.poll_interval = poll_interval
+        self.completion_window = completion_window
+
+    def _execute(self, run_id: str, request_path: str) -> list[str]:
+        from openai import OpenAI
+
+        client = OpenAI(http_client=registry.http_client)
+        with open(request_path, "rb") as f:
+            input_file = client.files.create(file=f, purpose="batch")
+        batch = client.batches.create(
+            input_file_id=input_file.id, endpoint="/v1/chat/completions", completion_window=self.completion_window
+        )
+        logger.info(f"Submitted OpenAI batch {batch.id} ({run_id})")
+
+        while batch.status not in ("completed", "failed", "expired", "cancelled"):
+            time.sleep(self.poll_interval)
+            batch = client.batches.retrieve(batch.id)
+            counts = batch.request_counts
+            logger.info(f"OpenAI batch {batch.id}: {batch.status} ({counts.completed if counts else 0} done)")
+
+        if batch.status != "completed":
+            logger.error(f"OpenAI batch {batch.id} ended as '{batch.status}'")
+        if not batch.output_file_id:
+            return []
+        output = client.files.content(batch.output_file_id).text
+        with open(os.path.join(self.workdir, f"{run_id}.output.jsonl"), "w", encoding="utf-8") as f:
+            f.write(output)
+        return output.splitlines()
+
+
+class LocalBatchBackend(BatchFileBackend):
+    """Stand-in for the Batch API: answers the request file with the registry's chat model.
+
+    Exercises the same request and output file formats, so with the fake models from
+    `benchmarks/fake_models.py` the whole file flow runs offline.
+    """
+
+    name = "local"
+
+    def _answer(self, request: dict) -> dict:
+        structured_llm = registry.get_structured_llm(ConsistencyCheckBatch, self.model, self.temperature)
+        messages = [(m["role"], m["content"]) for m in request["body"]["messages"]]
+        try:
+            response = structured_llm.invoke(messages)
+            if response.get("parsed") is None:
+                raise ValueError(str(response.get("parsing_error") or "Model returned no structured output"))
+        except Exception as e:
+            return {"custom_id": request["custom_id"], "response": None, "error": {"message": str(e)}}
+        usage = getattr(response["raw"], "usage_metadata", None) or {}
+        return {
+            "custom_id": request["custom_id"],
+            "response": {
+                "status_code": 200,
+                "body": {
+                    "choices": [{"message": {"role": "assistant", "content": response["parsed"].model_dump_json()}}],
+                    "usage": {
+                        "prompt_tokens": usage.get("input_tokens", 0),
+                        "completion_tokens": usage.get("output_tokens", 0),
+                        "total_tokens": usage.get("total_tokens", 0),
+                    },
+                },
+            },
+            "error": None,
+        }
+
+    def _execute(self, run_id: str, request_path: str) -> list[str]:
+        with open(request_path, "r", encoding="utf-8") as f:
+            lines = [json.dumps(self._answer(json.loads(line)), ensure_ascii=False) for line in f if line.strip()]
+        with open(os.path.join(self.workdir, f"{run_id}.output.jsonl"), "w", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+        return lines
+
+
+BACKENDS: dict[str, type[ConsistencyBackend]] = {
+    backend.name: backend for backend in (SingleBackend, InlineBatchBackend, OpenAIBatchBackend, LocalBatchBackend)
+}
+
+
+def get_backend(backend: Union[str, ConsistencyBackend, None] = None, **kwargs) -> ConsistencyBackend:
+    """Backend instance from a name (None = CONSISTENCY_BACKEND) or an instance passed through"""
+    if isinstance(backend, ConsistencyBackend):
+        return backend
+    name = backend or CONSISTENCY_BACKEND
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown consistency backend '{name}'; expected one of {', '.join(BACKENDS)}")
+    return BACKENDS[name](**kwargs)
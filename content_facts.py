@@ -0,0 +1,271 @@
+"""Rule-based fact check of generated content against the input JSON.
+
+Most consistency failures are mechanical. The text gives a room count, area, floor or build year
+that differs from `features`. It claims a balcony, parking or elevator that is false or unknown.
+Or it says "for rent" on a sale listing. These are found here from per-language keyword tables
+(validation_config/valid_lang_phrases.py), in the same categories as `ConsistencyCheck`.
+
+The rules only report what they are sure of:
+- an area counts only next to a whole-property word ("120 m² apartment", not "a 10 m² balcony"),
+  and is flagged only if none of those matches the JSON
+- negated feature mentions ("no elevator") are ignored
+- the floor is only checked for units above the ground floor (houses describe their own floors)
+
+Everything else (amenities, views, prices) is left to the LLM. With FACT_CHECK_MODE = "verdict" the
+certain findings (a wrong room count or area, a wrong listing type) fail the candidate without an LLM
+call; the fuzzy ones (feature words, floor, build year, numbers the JSON lacks) are handed to the LLM
+check as leads to verify. With "hint", every finding is a lead and the LLM has the last word. A clean
+rule check proves nothing, so the LLM call still runs when nothing certain was found.
+"""
+import re
+
+from typing import NamedTuple, Optional, Union
+from pydantic import BaseModel
+
+from models import SEODescription, ConsistencyCheck
+from utils.metrics import metrics
+from validation_config.valid_config import FACT_AREA_TOLERANCE, FACT_VERDICT_FIELDS
+from validation_config.valid_lang_phrases import (
+    NUMBER_WORDS,
+    ROOM_TERMS,
+    BEDROOM_TYPOLOGY,
+    AREA_UNITS,
+    AREA_CONTEXT,
+    PROPERTY_TYPES,
+    FLOOR_PATTERNS,
+    FLOOR_ORDINALS,
+    BUILT_PATTERNS,
+    FEATURE_TERMS,
+    NEGATION_WORDS,
+    LISTING_TYPE_TERMS,
+)
+
+FACT_CHECKS = metrics.counter("seo_fact_checks_total", "Rule-based fact checks before the LLM consistency call", ["outcome"])
+
+CONTENT_FIELDS = ("title", "meta_description", "headline", "full_description", "key_features", "summary", "action")
+NUMBER_FIELDS = ("bedrooms", "bathrooms", "area_sqm", "floor", "year_built")
+THOUSANDS = re.compile(r"\d{1,3}(?:[.,]\d{3})+")
+WORD = re.compile(r"[^\W\d_]+")
+RULE_SUMMARY_PREFIX = "Rule-based check: "
+
+
+def _alternation(patterns) -> str:
+    # Longest first, so "camere da letto" wins over "camere"
+    return "|".join(sorted(patterns, key=len, reverse=True))
+
+
+def _bounded(pattern: str) -> re.Pattern:
+    return re.compile(rf"(?<!\w)(?:{pattern})(?!\w)")
+
+
+def _to_number(text: str, words: dict[str, int]) -> Optional[float]:
+    if text in words:
+        return words[text]
+    if THOUSANDS.fullmatch(text):
+        return float(re.sub(r"[.,]", "", text))
+    try:
+        return float(text.replace(",", "."))
+    except ValueError:
+        return None
+
+
+class Facts(NamedTuple):
+    numbers: dict[str, list[float]]  # every value the text gives for each of NUMBER_FIELDS
+    features: set[str]  # boolean features claimed, leaving out negated mentions
+    listing_types: set[str]  # "sale" / "rent" phrases used
+
+
+class LanguageFacts:
+    """All fact patterns of one language, compiled into a single alternation.
+
+    One scan of the text finds every fact; `lastgroup` tells which rule matched and the
+    group right after it holds the value. Separate regexes would cost a full pass each.
+    """
+
+    def __init__(self, language: str):
+        self.language = language
+        self.negations = set(NEGATION_WORDS.get(language, []))
+        words = NUMBER_WORDS.get(language, {})
+        ordinals = FLOOR_ORDINALS.get(language, {})
+
+        # Typology codes (t0..t5) are not words for the property as a whole
+        context = _alternation(AREA_CONTEXT.get(language, []) + [t for t in PROPERTY_TYPES.get(language, []) if not re.fullmatch(r"t\d", t)])
+        # At most one connecting word between the area and the property word: "apartment of 120 m²", "120 m² of living space"
+        self.area_before = re.compile(rf"(?<!\w)(?:{context})(?: \w+)?$")
+        self.area_after = re.compile(rf"^(?:\w+ )?(?:{context})(?!\w)")
+
+        number = _alternation([r"\d+", *map(re.escape, words)])
+        rules = []  # (kind, name, pattern with at most one capture group, value lookup)
+        for field, terms in ROOM_TERMS.get(language, {}).items():
+            terms = _alternation(terms)
+            # Same line only: "bedrooms 3\nbathrooms 2" is not "3 bathrooms"
+            rules.append(("number", field, rf"({number})[ -]+(?:[^\W\d_]+ )?(?:{terms})", words))
+            rules.append(("number", field, rf"(?:{terms}) ?: ?(\d+)", {}))
+        if language in BEDROOM_TYPOLOGY:
+            rules.append(("number", "bedrooms", BEDROOM_TYPOLOGY[language], {}))
+        rules.append(("number", "area_sqm", rf"(\d{{1,3}}(?:[.,]\d{{3}})+|\d+(?:[.,]\d+)?) ?(?:{_alternation(AREA_UNITS)})", {}))
+        ordinal = _alternation(map(re.escape, ordinals))
+        rules += [("number", "floor", p.replace("{ordinal}", ordinal), ordinals) for p in FLOOR_PATTERNS.get(language, [])]
+        rules += [("number", "year_built", p, {}) for p in BUILT_PATTERNS.get(language, [])]
+        rules += [("feature", name, _alternation(terms), {}) for name, terms in FEATURE_TERMS.get(language, {}).items()]
+        rules += [("listing_type", kind, _alternation(terms), {}) for kind, terms in LISTING_TYPE_TERMS.get(language, {}).items()]
+
+        self.rules = {f"r{i}": rule[:2] + rule[3:] for i, rule in enumerate(rules)}
+        self.pattern = re.compile(
+            r"(?<!\w)(?:" + "|".join(f"(?P<r{i}>{rule[2]})" for i, rule in enumerate(rules)) + r")(?!\w)"
+        )
+
+    def _negated(self, text: str, start: int) -> bool:
+        return any(word in self.negations for word in WORD.findall(text[max(0, start - 40):start])[-3:])
+
+    def _whole_property(self, text: str, start: int, end: int) -> bool:
+        before = " ".join(WORD.findall(text[max(0, start - 60):start])[-4:])
+        after = " ".join(WORD.findall(text[end:end + 60])[:4])
+        return bool(self.area_before.search(before) or self.area_after.search(after))
+
+    def scan(self, text: str) -> Facts:
+        facts = Facts({field: [] for field in NUMBER_FIELDS}, set(), set())
+        for m in self.pattern.finditer(text):
+            kind, name, lookup = self.rules[m.lastgroup]
+            if kind == "number":
+                if name == "area_sqm" and not self._whole_property(text, m.start(), m.end()):
+                    continue
+                value = _to_number(m.group(self.pattern.groupindex[m.lastgroup] + 1), lookup)
+                if value is not None:
+                    facts.numbers[name].append(value)
+            elif kind == "feature":
+                if not self._negated(text, m.start()):
+                    facts.features.add(name)
+            else:
+                facts.listing_types.add(name)
+        return facts
+
+
+LANGUAGE_FACTS: dict[str, LanguageFacts] = {language: LanguageFacts(language) for language in ROOM_TERMS}
+
+
+def _text(result: Union[SEODescription, dict]) -> str:
+    fields = result.model_dump() if isinstance(result, BaseModel) else result
+    parts = []
+    for field in CONTENT_FIELDS:
+        value = fields.get(field)
+        parts += value if isinstance(value, list) else [value or ""]
+    return "\n".join(map(str, parts)).lower()
+
+
+def _json_strings(input_json: dict) -> str:
+    """Free text of the input (title, description, ...), which may state facts outside `features`"""
+    return "\n".join(str(v) for v in input_json.values() if isinstance(v, str)).lower()
+
+
+def _listing_kind(listing_type) -> Optional[str]:
+    listing_type = str(listing_type or "").lower()
+    if any(word in listing_type for word in ("rent", "let", "lease")):
+        return "rent"
+    if "sale" in listing_type or "sell" in listing_type:
+        return "sale"
+    return None
+
+
+def _matches(value: float, allowed: set[float], field: str) -> bool:
+    tolerance = FACT_AREA_TOLERANCE if field == "area_sqm" else 0
+    return any(abs(value - a) <= tolerance for a in allowed)
+
+
+def _fmt(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else str(value)
+
+
+class Finding(NamedTuple):
+    category: str  # field of ConsistencyCheck: fabricated_features / incorrect_numbers / wrong_listing_type
+    text: str
+    certain: bool  # decided by the rules alone in "verdict" mode; otherwise a hint for the LLM
+
+
+def _findings(result: Union[SEODescription, dict], input_json: dict) -> Optional[list[Finding]]:
+    """Every rule finding, or None if the language has no rules"""
+    language = LANGUAGE_FACTS.get(input_json.get("language", "en")) if input_json else None
+    if language is None:
+        FACT_CHECKS.inc(outcome="skipped")
+        return None
+
+    text = _text(result)
+    features = input_json.get("features") or {}
+    facts, json_facts = language.scan(text), language.scan(_json_strings(input_json))
+    fabricated, incorrect = [], []
+
+    for field, values in facts.numbers.items():
+        if not values:
+            continue
+        known = features.get(field)
+        if field == "floor" and not (isinstance(known, (int, float)) and known > 0):
+            continue
+        allowed = set(json_facts.numbers[field])
+        if isinstance(known, (int, float)) and not isinstance(known, bool):
+            allowed.add(float(known))
+        if not allowed:
+            fabricated.append(Finding("fabricated_features", f"text says {field}={_fmt(values[0])} but JSON has no {field}", False))
+            continue
+        wrong = [v for v in values if not _matches(v, allowed, field)]
+        if wrong and (field != "area_sqm" or len(wrong) == len(values)):
+            expected = _fmt(known) if known is not None else "/".join(map(_fmt, sorted(allowed)))
+            message = f"text says {field}={_fmt(wrong[0])} but JSON has {field}={expected}"
+            incorrect.append(Finding("incorrect_numbers", message, field in FACT_VERDICT_FIELDS))
+
+    for name in sorted(facts.features):
+        if features.get(name) is True or name in json_facts.features:
+            continue
+        state = "false" if features.get(name) is False else "missing"
+        # Feature words are fuzzy ("lift your spirits"): left to the LLM
+        fabricated.append(Finding("fabricated_features", f"mentions {name} but JSON has {name}={state}", False))
+
+    findings = fabricated + incorrect
+    kind = _listing_kind(input_json.get("listing_type"))
+    claims = facts.listing_types
+    if kind is not None and kind not in claims and claims - {kind}:
+        other = "sale" if kind == "rent" else "rental"
+        findings.append(Finding("wrong_listing_type", f"text describes a {other} but listing_type is {input_json.get('listing_type')}", True))
+
+    FACT_CHECKS.inc(outcome="violations" if findings else "clear")
+    return findings
+
+
+def _consistency_check(findings: list[Finding]) -> Optional[ConsistencyCheck]:
+    if not findings:
+        return None
+    return ConsistencyCheck(
+        is_consistent=False,
+        fabricated_features=[f.text for f in findings if f.category == "fabricated_features"],
+        incorrect_numbers=[f.text for f in findings if f.category == "incorrect_numbers"],
+        wrong_listing_type=any(f.category == "wrong_listing_type" for f in findings),
+        summary=RULE_SUMMARY_PREFIX + "; ".join(f.text for f in findings),
+    )
+
+
+def check_facts(result: Union[SEODescription, dict], input_json: dict) -> Optional[ConsistencyCheck]:
+    """A failing `ConsistencyCheck` with every rule finding, None if there are none or the rules cannot decide"""
+    return _consistency_check(_findings(result, input_json) or [])
+
+
+def split_facts(result: Union[SEODescription, dict], input_json: dict) -> tuple[Optional[ConsistencyCheck], list[str]]:
+    """The certain findings as a failing `ConsistencyCheck` (None if there are none) and the others as hints"""
+    findings = _findings(result, input_json) or []
+    return _consistency_check([f for f in findings if f.certain]), [f.text for f in findings if not f.certain]
+
+
+def facts_removed(before: Union[SEODescription, dict], after: Union[SEODescription, dict], language: str) -> bool:
+    """True if `after` lost a fact the rules find in `before`, or if the language has no rules to tell"""
+    rules = LANGUAGE_FACTS.get(language)
+    if rules is None:
+        return True
+    old, new = rules.scan(_text(before)), rules.scan(_text(after))
+    return (
+        any(set(values) - set(new.numbers[field]) for field, values in old.numbers.items())
+        or bool(old.features - new.features)
+        or bool(old.listing_types - new.listing_types)
+    )
+
+
+def fact_hints(result: Union[SEODescription, dict], input_json: dict) -> list[str]:
+    """Every rule finding as a plain statement for the LLM check to confirm or dismiss"""
+    return [f.text for f in _findings(result, input_json) or []]
@@ -1,12 +1,15 @@
 import os
 
-from models import SEODescription, ValidationResult, State
+from typing import Any, Optional
+from models import SEODescription, ValidationResult, State, partial_description_schema
 from loguru import logger
-from langchain_openai import ChatOpenAI
-from jinja2 import Template
+from langchain_core.runnables import RunnableConfig
+from registry import registry
+from utils.rate_limiter import rate_limiter
+from utils.usage import track_usage, parse_structured_response
+from utils.exemplar_index import exemplar_index
 
-from llm_config.output_template import HTML_TEMPLATE
-from utils.file_system import get_system_prompt
+from utils.prompt_registry import prompt_registry
 from llm_config.llm_config import (
     MODEL, 
     TEMPERATURE,
@@ -16,45 +19,85 @@ from llm_config.llm_config import (
 
 
 def get_structured_llm(model: str=MODEL, temp: float=TEMPERATURE):
-    llm = ChatOpenAI(model=model, temperature=temp)
-    return llm.with_structured_output(SEODescription)
+    return registry.get_structured_llm(SEODescription, model, temp)
 
 
-def output_processing(state: State):
+def _target(state: State) -> tuple[Any, Optional[list[str]], str]:
+    """Structured client for this attempt: the full schema, or a partial one in repair mode"""
+    repair_fields = state.get("repair_fields")
+    if repair_fields and state.get("structured_data"):
+        schema = partial_description_schema(tuple(repair_fields))
+        return registry.get_structured_llm(schema, MODEL, TEMPERATURE), repair_fields, "repair"
+    return get_structured_llm(), None, "generator"
+
+
+def _merge_repair(state: State, repair_fields: Optional[list[str]], result) -> SEODescription:
+    if not repair_fields:
+        return result
+    return SEODescription(**{**state["structured_data"], **result.model_dump(include=set(repair_fields))})
+
+
+def _build_messages(state: State, role: str = "generator") -> list:
+    system_prompt = prompt_registry.render("system", llm_tone=MODEL_TONE)
+    recent_messages = state["messages"][-MAX_HISTORY:] if state["messages"] else []
+    # Full generations see accepted outputs of similar listings; a repair only patches a few fields
+    exemplars = exemplar_index.prompt(state.get("input_json") or {}) if role == "generator" else None
+
+    logger.info(f"Sending {len(recent_messages)}/{len(state['messages'])} messages to LLM (MAX_HISTORY={MAX_HISTORY}, prompt={prompt_registry.content_hash('system')[:12]}, exemplars={exemplars is not None})")
+    return [
+        ("system", system_prompt),
+        *([("system", exemplars)] if exemplars else []),
+        *recent_messages
+    ]
+
+
+def candidate_update(result: SEODescription) -> dict:
+    # Candidates stay structured; only the final one is rendered (see content_rendering.py)
+    return {
+        "structured_data": result.model_dump(),
+        "generation_error": None,
+    }
+
+
+def _generation_failed(e: Exception, usage: dict) -> dict:
+    logger.error(f"Content generation failed: {e}")
+    return {
+        "structured_data": None,
+        "generation_error": str(e),
+        "usage": usage,
+    }
+
+
+def output_processing(state: State, config: Optional[RunnableConfig] = None):
     logger.info("Starting output processing...")
-    try:
-        structured_llm = get_structured_llm()
-        system_prompt = get_system_prompt().format(llm_tone=MODEL_TONE)
-        recent_messages = state["messages"][-MAX_HISTORY:] if state["messages"] else []
-        
-        logger.info(f"Sending {len(recent_messages)}/{len(state['messages'])} messages to LLM (MAX_HISTORY={MAX_HISTORY})")
-        result = structured_llm.invoke([
-            ("system", system_prompt),
-            *recent_messages
-        ])
-
-        logger.success("Content generation completed")
-        
-        template = Template(HTML_TEMPLATE)
-        formatted_html = template.render(
-            title=result.title,
-            headline=result.headline,
-            meta_description=result.meta_description,
-            full_description=result.full_description,
-            key_features=result.key_features,
-            summary=result.summary,
-            action=result.action,
-        )
-
-        return {
-            "structured_data": result.model_dump(),
-            "formatted_xml": formatted_html,
-            "generation_error": None
-        }
-    except Exception as e:
-        logger.error(f"Content generation failed: {e}")
-        return {
-            "structured_data": None,
-            "formatted_xml": None,
-            "generation_error": str(e)
-        }
+    with track_usage() as tracker:
+        try:
+            structured_llm, repair_fields, role = _target(state)
+            messages = _build_messages(state, role)
+            response = rate_limiter.invoke(structured_llm, messages, MODEL, role, config=config)
+            result = _merge_repair(state, repair_fields, parse_structured_response(response, MODEL))
+
+            logger.success("Content generation completed")
+            return {**candidate_update(result), "usage": tracker.usage}
+        except Exception as e:
+            return _generation_failed(e, tracker.usage)
+
+
+async def aoutput_processing(state: State, config: Optional[RunnableConfig] = None):
+    """Async counterpart of `output_processing`, awaits the LLM instead of blocking a worker thread.
+
+    `config` is passed on explicitly so token streaming (and tracing) reaches the LLM call
+    on Python < 3.11, where it does not propagate through contextvars.
+    """
+    logger.info("Starting output processing (async)...")
+    with track_usage() as tracker:
+        try:
+            structured_llm, repair_fields, role = _target(state)
+            messages = _build_messages(state, role)
+            response = await rate_limiter.ainvoke(structured_llm, messages, MODEL, role, config=config)
+            result = _merge_repair(state, repair_fields, parse_structured_response(response, MODEL))
+
+            logger.success("Content generation completed")
+            return {**candidate_update(result), "usage": tracker.usage}
+        except Exception as e:
+            return _generation_failed(e, tracker.usage)
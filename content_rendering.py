@@ -0,0 +1,110 @@
+import json
+
+from typing import Any, Iterable, Literal, Optional, get_args
+from jinja2 import Environment, DictLoader, StrictUndefined, select_autoescape
+from markupsafe import Markup
+
+from utils.metrics import metrics
+from llm_config.output_template import HTML_TEMPLATE, HTML_BODY_TEMPLATE, PAGE_TEMPLATE, MARKDOWN_TEMPLATE
+from pipeline_config.pipeline_config import DEFAULT_CURRENCY, DEFAULT_FORMATS
+
+OutputFormat = Literal["html", "page", "jsonld", "markdown", "json"]
+FORMATS: tuple[str, ...] = get_args(OutputFormat)
+
+RENDERS = metrics.counter("seo_renders_total", "Output documents rendered", ["format"])
+
+
+def _script_json(value: Any) -> Markup:
+    """JSON safe to embed in a <script> element: markup characters become \\u escapes instead of HTML entities"""
+    text = json.dumps(value, ensure_ascii=False)
+    return Markup(text.replace("<", "\\u003c").replace(">", "\\u003e").replace("&", "\\u0026"))
+
+
+# One environment per process: templates are compiled on first use and cached by name.
+# HTML templates are autoescaped (model output is untrusted text); Markdown is not.
+_env = Environment(
+    loader=DictLoader({
+        "fragment.html": HTML_TEMPLATE,
+        "body.html": HTML_BODY_TEMPLATE,
+        "page.html": PAGE_TEMPLATE,
+        "listing.md": MARKDOWN_TEMPLATE,
+    }),
+    autoescape=select_autoescape(enabled_extensions=("html",), default=False),
+    undefined=StrictUndefined,
+    auto_reload=False,
+)
+_env.filters["script_json"] = _script_json
+
+
+def _price(input_json: dict) -> Optional[float]:
+    price = input_json.get("price", (input_json.get("details") or {}).get("price"))
+    return price if isinstance(price, (int, float)) and not isinstance(price, bool) else None
+
+
+def jsonld(data: dict, input_json: Optional[dict] = None) -> dict:
+    """schema.org RealEstateListing for the generated content; offer and place come from the input listing"""
+    input_json = input_json or {}
+    doc = {
+        "@context": "https://schema.org",
+        "@type": "RealEstateListing",
+        "name": data["title"],
+        "headline": data["headline"],
+        "description": data["meta_description"],
+        "text": data["full_description"],
+    }
+    if input_json.get("language"):
+        doc["inLanguage"] = input_json["language"]
+
+    location = input_json.get("location") or {}
+    if location.get("city") or location.get("neighborhood"):
+        place = {"@type": "Place", "address": {"@type": "PostalAddress"}}
+        if location.get("city"):
+            place["address"]["addressLocality"] = location["city"]
+        if location.get("neighborhood"):
+            place["name"] = location["neighborhood"]
+        doc["contentLocation"] = place
+
+    price = _price(input_json)
+    if price is not None:
+        doc["offers"] = {
+            "@type": "Offer",
+            "price": price,
+            "priceCurrency": input_json.get("currency", DEFAULT_CURRENCY),
+            "businessFunction": "http://purl.org/goodrelations/v1#LeaseOut"
+                if input_json.get("listing_type") == "rent" else "http://purl.org/goodrelations/v1#Sell",
+        }
+    return doc
+
+
+def resolve_formats(formats: Optional[Iterable[str]] = None) -> tuple[str, ...]:
+    """Requested formats without duplicates (None = DEFAULT_FORMATS); unknown formats raise ValueError"""
+    formats = tuple(dict.fromkeys(DEFAULT_FORMATS if formats is None else formats))
+    unknown = [fmt for fmt in formats if fmt not in FORMATS]
+    if unknown:
+        raise ValueError(f"Unknown output format(s): {', '.join(unknown)}; expected one of {', '.join(FORMATS)}")
+    return formats
+
+
+def render(data: dict, formats: Iterable[str] = ("html",), input_json: Optional[dict] = None) -> dict[str, Any]:
+    """Render structured content into each requested format.
+
+    Text formats (`html` fragment, full `page`, `markdown`) come back as strings;
+    `jsonld` and `json` as JSON-ready dicts. Unknown formats raise ValueError.
+    """
+    input_json = input_json or {}
+    rendered: dict[str, Any] = {}
+    for fmt in resolve_formats(formats):
+        if fmt == "html":
+            rendered[fmt] = _env.get_template("fragment.html").render(**data)
+        elif fmt == "page":
+            rendered[fmt] = _env.get_template("page.html").render(
+                **data, language=input_json.get("language", "en"), jsonld=jsonld(data, input_json)
+            )
+        elif fmt == "markdown":
+            rendered[fmt] = _env.get_template("listing.md").render(**data)
+        elif fmt == "jsonld":
+            rendered[fmt] = jsonld(data, input_json)
+        else:
+            rendered[fmt] = dict(data)
+        RENDERS.inc(format=fmt)
+    return rendered
@@ -0,0 +1,192 @@
+import re
+
+from typing import Literal, Optional
+from loguru import logger
+
+from models import SEODescription, State
+from content_generation import candidate_update
+from content_facts import facts_removed
+from content_validation import (
+    HTML_TAG_PATTERN,
+    LLMConsistencyValidator,
+    QualityValidator,
+    LAYER_FIELDS,
+    ValidationScheduler,
+    _layer_keys,
+    _memo_entries,
+    _merge_validation,
+    should_retry,
+)
+from utils.metrics import metrics
+from utils.usage import track_usage
+from validation_config.valid_config import (
+    TITLE_MAX_LEN,
+    META_DESCRIPTION_MAX_LEN,
+    FULL_DESCRIPTION_MIN_LEN,
+    FULL_DESCRIPTION_MAX_LEN,
+    KEY_FEATURES_MAX,
+)
+
+LOCAL_REPAIRS = metrics.counter("seo_local_repairs_total", "Deterministic fixes applied instead of an LLM retry", ["fix"])
+
+TEXT_FIELDS = ("title", "meta_description", "headline", "full_description", "summary", "action")
+TRAILING = " ,;:-–—|/&"
+SENTENCE_END = re.compile(r"[.!?](?=\s|$)")
+FINDING_WORD = re.compile(r"\w+")
+# Words of the findings' own phrasing ("Incorrect number: text says 4 bedrooms but JSON has 3"), not of the content
+FINDING_PHRASING = {"fabricated", "feature", "features", "incorrect", "number", "missing", "important", "inconsistency",
+                    "text", "says", "mentions", "json", "has", "but", "the", "and", "not", "false", "true"}
+
+
+def _strip_tags(text: str) -> str:
+    text = HTML_TAG_PATTERN.sub(" ", text)
+    return re.sub(r"[ \t]{2,}", " ", text).strip()
+
+
+def _truncate_words(text: str, limit: int) -> str:
+    if len(text) <= limit:
+        return text
+    cut = text[:limit + 1]
+    space = cut.rfind(" ")
+    # A single very long word is cut hard rather than dropping most of the text
+    cut = cut[:space] if space > limit // 2 else text[:limit]
+    return cut.rstrip(TRAILING)
+
+
+def _truncate_sentences(text: str, low: int, high: int) -> Optional[str]:
+    """Longest prefix ending a sentence within [low, high], or None if there is none"""
+    ends = [m.end() for m in SENTENCE_END.finditer(text) if low <= m.end() <= high]
+    return text[:ends[-1]] if ends else None
+
+
+def repair_candidate(result: SEODescription) -> tuple[SEODescription, dict[str, list[str]]]:
+    """Fix mechanical violations. Returns the repaired candidate and `{field: [fixes]}` for what changed.
+
+    Every fix only removes text, so it cannot introduce facts that are not in the input JSON.
+    Repairing an already repaired candidate changes nothing.
+    """
+    data = result.model_dump()
+    fixes: dict[str, list[str]] = {}
+
+    for field in TEXT_FIELDS:
+        if HTML_TAG_PATTERN.search(data[field]):
+            data[field] = _strip_tags(data[field])
+            fixes.setdefault(field, []).append("strip_tags")
+
+    if len(data["title"]) > TITLE_MAX_LEN:
+        data["title"] = _truncate_words(data["title"], TITLE_MAX_LEN)
+        fixes.setdefault("title", []).append("truncate")
+
+    if len(data["meta_description"]) > META_DESCRIPTION_MAX_LEN:
+        data["meta_description"] = _truncate_words(data["meta_description"], META_DESCRIPTION_MAX_LEN)
+        fixes.setdefault("meta_description", []).append("truncate")
+
+    if len(data["full_description"]) > FULL_DESCRIPTION_MAX_LEN:
+        truncated = _truncate_sentences(data["full_description"], FULL_DESCRIPTION_MIN_LEN, FULL_DESCRIPTION_MAX_LEN)
+        if truncated:
+            data["full_description"] = truncated
+            fixes.setdefault("full_description", []).append("truncate")
+
+    if len(data["key_features"]) > KEY_FEATURES_MAX:
+        data["key_features"] = data["key_features"][:KEY_FEATURES_MAX]
+        fixes.setdefault("key_features", []).append("trim")
+
+    return (SEODescription(**data) if fixes else result), fixes
+
+
+def should_repair(state: State) -> Literal["repair", "retry", "end"]:
+    """Route after validation: try the local repair pass before spending an LLM retry"""
+    validation = state.get("validation") or {}
+    if not validation.get("passed", True) and state.get("structured_data"):
+        # Worth it only if the fixes cover every field behind an issue; otherwise the LLM retry comes anyway
+        failed = validation.get("failed_fields")
+        if failed:
+            _, fixes = repair_candidate(SEODescription(**state["structured_data"]))
+            if set(failed) <= set(fixes):
+                return "repair"
+    return should_retry(state)
+
+
+def _words(text: str) -> set[str]:
+    return set(FINDING_WORD.findall(text.lower()))
+
+
+def _overlaps_findings(findings: list[str], original: SEODescription, repaired: SEODescription) -> bool:
+    """True if a word of a finding is gone from the repaired text, so the finding may no longer hold"""
+    removed = _words(LLMConsistencyValidator.full_content(original)) - _words(LLMConsistencyValidator.full_content(repaired))
+    mentioned = {word for finding in findings for word in _words(finding.partition(": ")[2])} - FINDING_PHRASING
+    return bool(removed & mentioned)
+
+
+def _carried_consistency(original: SEODescription, repaired: SEODescription, layer, input_json: dict) -> dict:
+    """The consistency layer for the repaired candidate, if it can do without a new LLM call.
+
+    Fixes only remove text. The verdict still holds unless the removed text is what a finding
+    was about, or the rules find a fact lost with it (a missing feature may now go unmentioned).
+    """
+    rule_layer = QualityValidator.check_facts_vs_json(repaired, input_json)
+    if rule_layer is not None:
+        return {"json_consistency": rule_layer}
+    _, issues, warnings = layer
+    if _overlaps_findings(issues + warnings, original, repaired) or facts_removed(original, repaired, input_json.get("language", "en")):
+        logger.info("Local repair changed fact-bearing text, re-running the consistency check")
+        return {}
+    return {"json_consistency": layer}
+
+
+def _prepare(state: State) -> tuple[SEODescription, dict[str, list[str]], ValidationScheduler, dict[str, str]]:
+    original = SEODescription(**state["structured_data"])
+    repaired, fixes = repair_candidate(original)
+    summary = ", ".join(f"{field}={'+'.join(names)}" for field, names in fixes.items())
+    logger.info(f"Local repair: {summary}")
+    for names in fixes.values():
+        for fix in names:
+            LOCAL_REPAIRS.inc(fix=fix)
+
+    changed = set(fixes)
+    layers = state.get("validation_layers") or {}
+    reuse = {k: layer for k, layer in layers.items() if not changed.intersection(LAYER_FIELDS[k])}
+
+    input_json = state.get("input_json") or {}
+    consistency = layers.get("json_consistency")
+    if consistency is not None and "json_consistency" not in reuse:
+        reuse.update(_carried_consistency(original, repaired, consistency, input_json))
+    scheduler = ValidationScheduler(
+        repaired, input_json, input_json.get("language", "en"), state.get("retry_count", 0), reuse=reuse, state=state
+    )
+    return repaired, fixes, scheduler, _layer_keys(repaired, input_json)
+
+
+def _repaired(
+    repaired: SEODescription, 
+    fixes: dict[str, list[str]], 
+    layers: dict, 
+    keys: dict[str, str], 
+    usage: dict,
+) -> dict:
+    update = _merge_validation(layers)
+    logger.info(f"After local repair: passed={update['validation']['passed']}, score={update['validation']['score']:.2f}")
+    return {
+        **candidate_update(repaired),
+        **update,
+        "validation_layers": layers,
+        "validation_memo": _memo_entries(layers, keys),
+        "local_repairs": [f"{field}: {', '.join(names)}" for field, names in fixes.items()],
+        "usage": usage,
+    }
+
+
+def repair_output(state: State):
+    """Apply deterministic fixes and re-run only the validation layers they affect"""
+    with track_usage() as tracker:
+        repaired, fixes, scheduler, keys = _prepare(state)
+        layers = scheduler.run()
+    return _repaired(repaired, fixes, layers, keys, tracker.usage)
+
+
+async def arepair_output(state: State):
+    """Async counterpart of `repair_output`; awaits the consistency check if it still has to run"""
+    with track_usage() as tracker:
+        repaired, fixes, scheduler, keys = _prepare(state)
+        layers = await scheduler.arun()
+    return _repaired(repaired, fixes, layers, keys, tracker.usage)
@@ -0,0 +1,152 @@
+"""Retry policy: when another LLM round is worth paying for, and which candidate to return.
+
+Each failed attempt is closed by the retry node: its score and issue kinds go to `attempts`,
+and `best_candidate` keeps the highest-scoring one seen so far, fully validated ones first.
+The run then ends early when
+- every critical issue is one a regeneration cannot fix (provider or validator errors)
+- the score has not improved for RETRY_PLATEAU_ROUNDS attempts in a row
+- the same kind of issue has failed RETRY_REPEAT_LIMIT attempts in a row
+
+Whatever ends the run, the best candidate is returned, not necessarily the last one.
+"""
+import re
+
+from typing import NamedTuple, Optional
+from loguru import logger
+
+from models import State
+from utils.metrics import metrics
+from llm_config.llm_config import RETRY_PLATEAU_ROUNDS, RETRY_MIN_IMPROVEMENT, RETRY_REPEAT_LIMIT
+
+RETRY_STOPS = metrics.counter("seo_retry_stops_total", "Runs ended by the retry policy before RETRY_COUNT", ["reason"])
+BEST_CANDIDATES = metrics.counter("seo_best_candidate_total", "Returned candidate: the last attempt or an earlier, better one", ["source"])
+
+
+class IssueKind(NamedTuple):
+    name: str
+    fixable: bool  # can a regeneration with feedback be expected to fix it?
+
+
+# First match wins; issues matching nothing are their own kind (digits ignored) and count as fixable.
+# Provider errors reach the pipeline only after the rate limiter's own retries, so another round would fail the same way.
+ISSUE_KINDS = [
+    (re.compile(r"^Generation error: (Error code: \d{3}|Connection error|Request timed out)"), IssueKind("provider_error", False)),
+    (re.compile(r"^Validation error"), IssueKind("validator_error", False)),
+    (re.compile(r"^Generation error"), IssueKind("generation_error", True)),
+    (re.compile(r"^No structured data"), IssueKind("generation_error", True)),
+    (re.compile(r"^Title too long"), IssueKind("title_length", True)),
+    (re.compile(r"^Meta description too long"), IssueKind("meta_description_length", True)),
+    (re.compile(r"^Full description too (long|short)"), IssueKind("full_description_length", True)),
+    (re.compile(r"^No key features"), IssueKind("key_features", True)),
+    (re.compile(r"^Field '(\w+)' is empty"), IssueKind("empty_field", True)),
+    (re.compile(r"^\w+ contains HTML"), IssueKind("html_tags", True)),
+    (re.compile(r"^Very high repetition"), IssueKind("repetition", True)),
+    (re.compile(r"^Contains \d+ LLM-typical"), IssueKind("llm_phrases", True)),
+    (re.compile(r"^Possible keyword stuffing"), IssueKind("keyword_stuffing", True)),
+    (re.compile(r"^Fabricated feature"), IssueKind("fabricated_feature", True)),
+    (re.compile(r"^Incorrect number"), IssueKind("incorrect_number", True)),
+    (re.compile(r"^Wrong listing type"), IssueKind("wrong_listing_type", True)),
+    (re.compile(r"^Wrong language"), IssueKind("wrong_language", True)),
+]
+DIGITS = re.compile(r"\d+(?:[.,]\d+)?")
+
+
+def classify_issue(issue: str) -> IssueKind:
+    for pattern, kind in ISSUE_KINDS:
+        if pattern.match(issue):
+            return kind
+    return IssueKind(DIGITS.sub("#", issue), True)
+
+
+def fixable_issues(issues: list[str]) -> list[str]:
+    """Issues worth sending back to the model as feedback"""
+    return [issue for issue in issues if classify_issue(issue).fixable]
+
+
+def attempt_record(state: State) -> dict:
+    """Summary of the current attempt, appended to `attempts` when it is retried"""
+    validation = state.get("validation") or {}
+    return {
+        "attempt": state.get("retry_count", 0),
+        "score": validation.get("score", 0.0),
+        "issue_kinds": sorted({classify_issue(issue).name for issue in validation.get("issues", [])}),
+    }
+
+
+def _rank(candidate: Optional[dict]) -> tuple:
+    if not candidate or not candidate.get("structured_data"):
+        return (False, False, False, -1.0)
+    validation = candidate.get("validation") or {}
+    # A score over the layers that ran says nothing about a skipped consistency check:
+    # text whose facts were never checked ranks below any fully validated candidate
+    checked = None not in (validation.get("category_scores") or {}).values()
+    return (True, bool(validation.get("passed")), checked, validation.get("score", 0.0))
+
+
+def _current(state: State) -> dict:
+    return {
+        "attempt": state.get("retry_count", 0),
+        "structured_data": state.get("structured_data"),
+        "validation": state.get("validation"),
+    }
+
+
+def best_candidate(state: State) -> dict:
+    """The better of the stored best and the current candidate; ties go to the later one, which saw more feedback"""
+    best, current = state.get("best_candidate"), _current(state)
+    return best if _rank(best) > _rank(current) else current
+
+
+def select_result(state: State) -> dict:
+    """Final state with the best candidate's data and validation in place of the last attempt's"""
+    best = best_candidate(state)
+    if best["attempt"] == state.get("retry_count", 0):
+        BEST_CANDIDATES.inc(source="last")
+        return state
+
+    last = (state.get("validation") or {}).get("score", 0.0)
+    logger.info(f"Returning attempt {best['attempt']} (score={best['validation']['score']:.2f}) instead of the last one (score={last:.2f})")
+    BEST_CANDIDATES.inc(source="earlier")
+    return {**state, "structured_data": best["structured_data"], "validation": best["validation"]}
+
+
+def _stalled_rounds(scores: list[float]) -> int:
+    stalled, best = 0, None
+    for score in scores:
+        if best is None or score >= best + RETRY_MIN_IMPROVEMENT:
+            best, stalled = score, 0
+        else:
+            stalled += 1
+    return stalled
+
+
+def _repeated_kind(history: list[list[str]]) -> Optional[str]:
+    """An issue kind present in each of the last RETRY_REPEAT_LIMIT attempts"""
+    if len(history) < RETRY_REPEAT_LIMIT:
+        return None
+    repeated = set(history[-1]).intersection(*history[-RETRY_REPEAT_LIMIT:-1])
+    return min(repeated) if repeated else None
+
+
+def stop_reason(state: State, log: bool = True) -> Optional[str]:
+    """Why another retry is not worth it, or None to retry"""
+    current = attempt_record(state)
+    issues = (state.get("validation") or {}).get("issues", [])
+    if issues and not fixable_issues(issues):
+        if log:
+            logger.warning(f"No issue can be fixed by a retry: {issues}")
+        return "unfixable"
+
+    attempts = [*(state.get("attempts") or []), current]
+    stalled = _stalled_rounds([a["score"] for a in attempts])
+    if stalled >= RETRY_PLATEAU_ROUNDS:
+        if log:
+            logger.warning(f"Score has not improved for {stalled} attempts (best so far is kept)")
+        return "plateau"
+
+    kind = _repeated_kind([a["issue_kinds"] for a in attempts])
+    if kind:
+        if log:
+            logger.warning(f"'{kind}' issue failed {RETRY_REPEAT_LIMIT} attempts in a row")
+        return "repeated_issue"
+    return None
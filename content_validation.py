@@ -1,31 +1,56 @@
+import os
 import re
 import json
+import hashlib
+import asyncio
+import contextvars
+import numpy as np
+from concurrent.futures import Executor, ThreadPoolExecutor, ProcessPoolExecutor
 from pydantic import BaseModel, Field
 from loguru import logger
-from typing import Literal, Type, TypedDict, Annotated, Optional
+from typing import Literal, Type, TypedDict, Annotated, Optional, Sequence, Union
 from collections import Counter
+from itertools import chain
 from models import SEODescription, ValidationResult, State, ConsistencyCheck
-from langchain_openai import ChatOpenAI
-from utils.file_system import get_valid_prompt
-from validation_config.valid_lang_phrases import LLM_PHRASES, CTA_PATTERNS, PROPERTY_TYPES
+from content_facts import fact_hints, split_facts
+from content_retry import RETRY_STOPS, attempt_record, best_candidate, fixable_issues, stop_reason
+from registry import registry
+from utils.prompt_registry import prompt_registry
+from utils.metrics import CATEGORY_SCORES, VALIDATION_MEMO_HITS
+from utils.rate_limiter import rate_limiter
+from utils.result_cache import canonical_json
+from utils.usage import track_usage, parse_structured_response, budget_exhausted
+from validation_config.lang_matchers import count_llm_phrases, has_cta, has_property_type
 from validation_config.valid_config import (
     VALID_MODEL, 
     VALID_TEMPERATURE,
+    VALID_MAX_WORKERS,
+    TITLE_MAX_LEN,
+    META_DESCRIPTION_MAX_LEN,
+    FULL_DESCRIPTION_MIN_LEN,
+    FULL_DESCRIPTION_MAX_LEN,
+    KEY_FEATURES_MAX,
+    RESCORE_WORKERS,
+    RESCORE_CHUNK_SIZE,
+    FACT_CHECK_ENABLED,
+    FACT_CHECK_MODE,
+    FACT_HINTS_PROMPT,
     )
-from llm_config.llm_config import RETRY_COUNT
+from llm_config.llm_config import RETRY_COUNT, REPAIR_MODE, REPAIR_MAX_FIELDS
 
 
 class LLMConsistencyValidator:
     """LLM-based validator of consistency between content and JSON data"""
     
     def __init__(self, model: str = "gpt-4o-mini", temperature: float = 0):
-        self.llm = ChatOpenAI(model=model, temperature=temperature)
-        self.structured_llm = self.llm.with_structured_output(ConsistencyCheck)
+        self.model = model
+        self.llm = registry.get_chat_model(model, temperature)
+        self.structured_llm = registry.get_structured_llm(ConsistencyCheck, model, temperature)
     
-    def validate(self, result, input_json: dict) -> ConsistencyCheck:
-        """Validation of consistency through LLM"""
-
-        full_content = f"""
+    @staticmethod
+    def full_content(result) -> str:
+        """Generated fields as shown to the consistency model (single and batched prompts)"""
+        return f"""
         Title: {result.title}
         Meta Description: {result.meta_description}
         Headline: {result.headline}
@@ -34,22 +59,52 @@ class LLMConsistencyValidator:
         Summary: {result.summary}
         Action: {result.action}
         """
-        prompt = get_valid_prompt().format(
+
+    def _build_prompt(self, result, input_json: dict, hints: Sequence[str] = ()) -> str:
+        prompt = prompt_registry.get("valid").format(
             input_json=json.dumps(input_json, indent=2, ensure_ascii=False), 
-            full_content=full_content)
+            full_content=self.full_content(result))
+        if hints:
+            prompt += FACT_HINTS_PROMPT.format(hints="\n".join(f"- {hint}" for hint in hints))
+        return prompt
+
+    @staticmethod
+    def _unavailable(e: Exception) -> ConsistencyCheck:
+        logger.error(f"LLM consistency check failed: {e}")
+        # Fallback - consider it OK if LLM is unavailable
+        return ConsistencyCheck(
+            is_consistent=True,
+            summary="LLM validation unavailable - skipped"
+        )
+
+    def validate(self, result, input_json: dict, hints: Sequence[str] = ()) -> ConsistencyCheck:
+        """Validation of consistency through LLM; `hints` are rule findings for it to confirm or dismiss"""
+        prompt = self._build_prompt(result, input_json, hints)
 
         try:
-            result = self.structured_llm.invoke([("user", prompt)])
+            response = rate_limiter.invoke(self.structured_llm, [("user", prompt)], self.model, "consistency")
+            result = parse_structured_response(response, self.model)
             logger.info(f"LLM consistency check completed: consistent={result.is_consistent}")
             return result
 
         except Exception as e:
-            logger.error(f"LLM consistency check failed: {e}")
-            # Fallback - consider it OK if LLM is unavailable
-            return ConsistencyCheck(
-                is_consistent=True,
-                summary="LLM validation unavailable - skipped"
-            )
+            return self._unavailable(e)
+
+    async def avalidate(self, result, input_json: dict, hints: Sequence[str] = ()) -> ConsistencyCheck:
+        """Async validation of consistency through LLM"""
+        prompt = self._build_prompt(result, input_json, hints)
+
+        try:
+            response = await rate_limiter.ainvoke(self.structured_llm, [("user", prompt)], self.model, "consistency")
+            result = parse_structured_response(response, self.model)
+            logger.info(f"LLM consistency check completed: consistent={result.is_consistent}")
+            return result
+
+        except Exception as e:
+            return self._unavailable(e)
+
+
+HTML_TAG_PATTERN = re.compile(r'<[^>]+>')
 
 
 class QualityValidator:
@@ -62,11 +117,11 @@ class QualityValidator:
         
         # Check title length
         title_len = len(result.title)
-        if title_len > 60:
-            issues.append(f"Title too long: {title_len}/60 chars")
+        if title_len > TITLE_MAX_LEN:
+            issues.append(f"Title too long: {title_len}/{TITLE_MAX_LEN} chars")
             score -= 0.31
-        elif title_len > 55:
-            warnings.append(f"Title close to limit: {title_len}/60 chars")
+        elif title_len > TITLE_MAX_LEN - 5:
+            warnings.append(f"Title close to limit: {title_len}/{TITLE_MAX_LEN} chars")
             score -= 0.1
         elif title_len < 10:
             warnings.append(f"Title too short: {title_len} chars (min 10)")
@@ -74,11 +129,11 @@ class QualityValidator:
         
         # Check meta-description length
         desc_len = len(result.meta_description)
-        if desc_len > 155:
-            issues.append(f"Meta description too long: {desc_len}/155 chars")
+        if desc_len > META_DESCRIPTION_MAX_LEN:
+            issues.append(f"Meta description too long: {desc_len}/{META_DESCRIPTION_MAX_LEN} chars")
             score -= 0.31
-        elif desc_len > 150:
-            warnings.append(f"Meta description close to limit: {desc_len}/155 chars")
+        elif desc_len > META_DESCRIPTION_MAX_LEN - 5:
+            warnings.append(f"Meta description close to limit: {desc_len}/{META_DESCRIPTION_MAX_LEN} chars")
             score -= 0.1
         elif desc_len < 50:
             warnings.append(f"Meta description too short: {desc_len} chars (recommended min 50)")
@@ -86,11 +141,11 @@ class QualityValidator:
         
         # Check full_description
         full_desc_len = len(result.full_description)
-        if 700 < full_desc_len:
-            issues.append(f"Full description too long: {full_desc_len}/(500-700 characters). Make it SHORTER: write 600-650 characters")
+        if FULL_DESCRIPTION_MAX_LEN < full_desc_len:
+            issues.append(f"Full description too long: {full_desc_len}/({FULL_DESCRIPTION_MIN_LEN}-{FULL_DESCRIPTION_MAX_LEN} characters). Make it SHORTER: write 600-650 characters")
             score -= 0.31
-        elif full_desc_len < 500:
-            issues.append(f"Full description too short: {full_desc_len}/(500-700 characters). Make it LONGER: write 600-650 characters")
+        elif full_desc_len < FULL_DESCRIPTION_MIN_LEN:
+            issues.append(f"Full description too short: {full_desc_len}/({FULL_DESCRIPTION_MIN_LEN}-{FULL_DESCRIPTION_MAX_LEN} characters). Make it LONGER: write 600-650 characters")
             score -= 0.31
         elif full_desc_len < 520 or full_desc_len > 680:
             warnings.append(f"Full description length {full_desc_len} near boundary")
@@ -101,8 +156,8 @@ class QualityValidator:
         if features_count == 0:
             issues.append("No key features provided")
             score -= 0.31
-        elif not (3 <= features_count <= 5):
-            warnings.append(f"Key features amount {features_count} not in range 3-5")
+        elif not (3 <= features_count <= KEY_FEATURES_MAX):
+            warnings.append(f"Key features amount {features_count} not in range 3-{KEY_FEATURES_MAX}")
             score -= 0.2
         
         # Check for empty fields
@@ -113,10 +168,9 @@ class QualityValidator:
                 score -= 0.31
         
         # Check for HTML/XML tags
-        html_pattern = r'<[^>]+>'
         for field_name in ['title', 'meta_description', 'headline', 'full_description', 'summary', 'action']:
             field_value = str(getattr(result, field_name))
-            if re.search(html_pattern, field_value):
+            if HTML_TAG_PATTERN.search(field_value):
                 issues.append(f"{field_name} contains HTML/XML tags")
                 score -= 0.31
         
@@ -141,11 +195,9 @@ class QualityValidator:
             score -= 0.2
         
         # Check for LLM-typical phrases
-        llm_phrases = LLM_PHRASES.get(language, None)
+        llm_count = count_llm_phrases(full_text.lower(), language)
 
-        if llm_phrases:
-            llm_count = sum(1 for phrase in llm_phrases if phrase in full_text.lower())
-            
+        if llm_count is not None:
             logger.debug(f"LLM typical phrases check for '{language}': found {llm_count} phrases")
             
             if llm_count > 3:
@@ -223,15 +275,10 @@ class QualityValidator:
                 break
         
         # Check for presence of CTA
-        cta_patterns = CTA_PATTERNS.get(language, None)
+        cta_found = has_cta(result.action.lower(), language)
 
-        if cta_patterns:
-            has_cta = any(
-                re.search(pattern, result.action.lower()) 
-                for pattern in cta_patterns
-            )
-            
-            if not has_cta:
+        if cta_found is not None:
+            if not cta_found:
                 warnings.append(f"No clear call-to-action detected in '{language}' language")
                 score -= 0.2
             else:
@@ -241,15 +288,10 @@ class QualityValidator:
 
         # Check for property type in title
         title_text = (result.title or "").lower()
-        property_types = PROPERTY_TYPES.get(language, None)
+        property_type_found = has_property_type(title_text, language)
 
-        if property_types:
-            has_property_type = any(
-                re.search(rf'\b{ptype}\b', title_text) 
-                for ptype in property_types
-            )
-            
-            if not has_property_type:
+        if property_type_found is not None:
+            if not property_type_found:
                 warnings.append(f"Title missing property type keyword  for '{language}'")
                 score -= 0.1
             else:
@@ -281,158 +323,760 @@ class QualityValidator:
     @staticmethod
     def check_content_vs_json(result, input_json: dict) -> tuple[float, list[str], list[str]]:
         """Validation of consistency between content and JSON data through LLM"""
-        issues = []
-        warnings = []
-        score = 1.0
-        
         if not input_json:
-            warnings.append("No input JSON provided for validation")
-            return 0.8, [], warnings
+            return 0.8, [], ["No input JSON provided for validation"]
+
+        rule_layer, hints = QualityValidator.rule_check(result, input_json)
+        if rule_layer is not None:
+            return rule_layer
         
         logger.info("Starting LLM-based JSON consistency check...")
         
         try:
             validator = LLMConsistencyValidator(model=VALID_MODEL, temperature=VALID_TEMPERATURE)
-            check_result = validator.validate(result, input_json)
-
-            # Always evaluate lists regardless of is_consistent flag
-            has_fabrications = len(check_result.fabricated_features) > 0
-            has_wrong_numbers = len(check_result.incorrect_numbers) > 0
-            has_wrong_listing = check_result.wrong_listing_type
-            has_wrong_language = check_result.wrong_language
-
-            # CRITICAL ERRORS
-            if has_fabrications:
-                for f in check_result.fabricated_features:
-                    issues.append(f"Fabricated feature: {f}")
-                score -= 0.31 * min(len(check_result.fabricated_features), 4)
-
-            if has_wrong_numbers:
-                for n in check_result.incorrect_numbers:
-                    issues.append(f"Incorrect number: {n}")
-                score -= 0.31 * min(len(check_result.incorrect_numbers), 4)
-
-            if has_wrong_listing:
-                issues.append("Wrong listing type (sale vs rent mismatch)")
-                score -= 0.31
-
-            if has_wrong_language:
-                issues.append("Wrong language according to JSON")
-                score -= 0.31
+            check_result = validator.validate(result, input_json, hints)
+            return QualityValidator._score_consistency(check_result)
 
-            # WARNINGS
-            if check_result.missing_important_features:
-                for m in check_result.missing_important_features:
-                    warnings.append(f"Missing important feature: {m}")
-                score -= 0.1 * len(check_result.missing_important_features)
+        except Exception as e:
+            logger.error(f"JSON consistency validation failed: {e}")
+            return 0.8, [], ["JSON consistency check unavailable"]
 
-            if check_result.other_inconsistencies:
-                for inc in check_result.other_inconsistencies:
-                    warnings.append(f"Inconsistency: {inc}")
-                score -= 0.1 * len(check_result.other_inconsistencies)
+    @staticmethod
+    async def acheck_content_vs_json(result, input_json: dict) -> tuple[float, list[str], list[str]]:
+        """Async validation of consistency between content and JSON data through LLM"""
+        if not input_json:
+            return 0.8, [], ["No input JSON provided for validation"]
 
-            # If there were fabricated or incorrect items, force consistency to false
-            if has_fabrications or has_wrong_numbers or has_wrong_listing or has_wrong_language:
-                logger.warning(f"JSON consistency issues found: {check_result.summary}")
-            else:
-                logger.info("JSON consistency check passed cleanly")
+        rule_layer, hints = QualityValidator.rule_check(result, input_json)
+        if rule_layer is not None:
+            return rule_layer
+        
+        logger.info("Starting LLM-based JSON consistency check (async)...")
+        
+        try:
+            validator = LLMConsistencyValidator(model=VALID_MODEL, temperature=VALID_TEMPERATURE)
+            check_result = await validator.avalidate(result, input_json, hints)
+            return QualityValidator._score_consistency(check_result)
 
         except Exception as e:
             logger.error(f"JSON consistency validation failed: {e}")
-            warnings.append("JSON consistency check unavailable")
-            score = 0.8
+            return 0.8, [], ["JSON consistency check unavailable"]
+
+    @staticmethod
+    def rule_check(result, input_json: dict) -> tuple[Optional[tuple[float, list[str], list[str]]], list[str]]:
+        """Rule-based fact check: the consistency layer if the rules decide, else the hints for the LLM check"""
+        if not FACT_CHECK_ENABLED:
+            return None, []
+        if FACT_CHECK_MODE != "verdict":
+            return None, fact_hints(result, input_json)
+        check_result, hints = split_facts(result, input_json)
+        if check_result is None:
+            return None, hints
+        logger.info("Rule-based fact check found violations, skipping LLM consistency check")
+        return QualityValidator._score_consistency(check_result), []
+
+    @staticmethod
+    def check_facts_vs_json(result, input_json: dict) -> Optional[tuple[float, list[str], list[str]]]:
+        """Consistency layer from the rule-based fact check ("verdict" mode), or None if the LLM has to decide"""
+        return QualityValidator.rule_check(result, input_json)[0]
+
+    @staticmethod
+    def _score_consistency(check_result: ConsistencyCheck) -> tuple[float, list[str], list[str]]:
+        issues = []
+        warnings = []
+        score = 1.0
+
+        # Always evaluate lists regardless of is_consistent flag
+        has_fabrications = len(check_result.fabricated_features) > 0
+        has_wrong_numbers = len(check_result.incorrect_numbers) > 0
+        has_wrong_listing = check_result.wrong_listing_type
+        has_wrong_language = check_result.wrong_language
+
+        # CRITICAL ERRORS
+        if has_fabrications:
+            for f in check_result.fabricated_features:
+                issues.append(f"Fabricated feature: {f}")
+            score -= 0.31 * min(len(check_result.fabricated_features), 4)
+
+        if has_wrong_numbers:
+            for n in check_result.incorrect_numbers:
+                issues.append(f"Incorrect number: {n}")
+            score -= 0.31 * min(len(check_result.incorrect_numbers), 4)
+
+        if has_wrong_listing:
+            issues.append("Wrong listing type (sale vs rent mismatch)")
+            score -= 0.31
+
+        if has_wrong_language:
+            issues.append("Wrong language according to JSON")
+            score -= 0.31
+
+        # WARNINGS
+        if check_result.missing_important_features:
+            for m in check_result.missing_important_features:
+                warnings.append(f"Missing important feature: {m}")
+            score -= 0.1 * len(check_result.missing_important_features)
+
+        if check_result.other_inconsistencies:
+            for inc in check_result.other_inconsistencies:
+                warnings.append(f"Inconsistency: {inc}")
+            score -= 0.1 * len(check_result.other_inconsistencies)
+
+        # If there were fabricated or incorrect items, force consistency to false
+        if has_fabrications or has_wrong_numbers or has_wrong_listing or has_wrong_language:
+            logger.warning(f"JSON consistency issues found: {check_result.summary}")
+        else:
+            logger.info("JSON consistency check passed cleanly")
 
         return max(0.0, score), issues, warnings
 
+    @staticmethod
+    def validate_batch(
+        results: Sequence[Union[SEODescription, dict]], 
+        input_jsons: Optional[Sequence[dict]] = None, 
+        consistency: bool = False,
+        workers: Optional[int] = RESCORE_WORKERS,
+        chunk_size: int = RESCORE_CHUNK_SIZE,
+        executor: Optional[Executor] = None,
+        consistency_backend=None,
+    ) -> list[ValidationResult]:
+        """Score many candidates at once, with the same scores, issues and warnings as `validate_output`.
 
-def validate_output(state: State):
-    logger.info("Starting validation...")
+        Lengths, counts, caps and n-gram statistics are computed column-wise with NumPy over
+        chunks of `chunk_size`, spread over a process pool (`executor`, or one of `workers`
+        processes). The LLM consistency layer only runs with `consistency=True`; without it
+        the result covers the local layers only. `consistency_backend` (a name or instance from
+        `content_audit`, default CONSISTENCY_BACKEND) decides how those checks are batched.
+        """
+        rows = [r.model_dump() if isinstance(r, BaseModel) else r for r in results]
+        inputs = list(input_jsons) if input_jsons is not None else [{} for _ in rows]
+        if len(inputs) != len(rows):
+            raise ValueError(f"Got {len(rows)} results but {len(inputs)} input JSONs")
+
+        chunks = [(rows[i:i + chunk_size], inputs[i:i + chunk_size]) for i in range(0, len(rows), chunk_size)]
+        if executor is not None:
+            chunk_layers = list(executor.map(_batch_layers, chunks))
+        elif len(chunks) > 1 and (workers or os.cpu_count() or 1) > 1:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                chunk_layers = list(pool.map(_batch_layers, chunks))
+        else:
+            chunk_layers = [_batch_layers(chunk) for chunk in chunks]
+        layers = [layer for chunk in chunk_layers for layer in chunk]
+
+        if consistency:
+            from content_audit import get_backend
 
+            backend = get_backend(consistency_backend)
+            checked = []
+            for i, input_json in enumerate(inputs):
+                if not input_json:
+                    layers[i]["json_consistency"] = (0.8, [], ["No input JSON provided for validation"])
+                    continue
+                # In "verdict" mode, candidates the rules already fail never reach the LLM
+                layers[i]["json_consistency"] = QualityValidator.check_facts_vs_json(rows[i], input_json)
+                if layers[i]["json_consistency"] is None:
+                    checked.append(i)
+            logger.info(f"Checking consistency of {len(checked)} listings with the '{backend.name}' backend...")
+            try:
+                checks = backend.check([(rows[i], inputs[i]) for i in checked])
+                for i, check in zip(checked, checks):
+                    layers[i]["json_consistency"] = QualityValidator._score_consistency(check)
+            except Exception as e:
+                logger.error(f"Batched JSON consistency validation failed: {e}")
+                for i in checked:
+                    layers[i]["json_consistency"] = (0.8, [], ["JSON consistency check unavailable"])
+
+        return [_combine_layers(layer) for layer in layers]
+
+
+# The consistency check is network-bound: it runs here while local checks use the calling thread
+_consistency_executor = ThreadPoolExecutor(max_workers=VALID_MAX_WORKERS, thread_name_prefix="consistency")
+
+
+def _failed_validation(issue: str) -> dict:
+    validation: ValidationResult = {
+        "passed": False,
+        "score": 0.0,
+        "issues": [issue],
+        "warnings": [],
+        "category_scores": {},
+        "failed_fields": None,
+    }
+    return {"validation": validation, "validation_layers": None}
+
+
+def _precheck_state(state: State) -> Optional[dict]:
     if state.get("generation_error"):
         logger.error(f"Cannot validate: generation error - {state['generation_error']}")
-        validation: ValidationResult = {
-            "passed": False,
-            "score": 0.0,
-            "issues": [f"Generation error: {state['generation_error']}"],
-            "warnings": [],
-            "category_scores": {}
-        }
-        return {"validation": validation}
+        return _failed_validation(f"Generation error: {state['generation_error']}")
     
     if not state.get("structured_data"):
         logger.error("Cannot validate: no structured data")
-        validation: ValidationResult = {
-            "passed": False,
-            "score": 0.0,
-            "issues": ["No structured data to validate"],
-            "warnings": [],
-            "category_scores": {}
-        }
-        return {"validation": validation}
+        return _failed_validation("No structured data to validate")
+
+    return None
+
+
+LayerResult = tuple[float, list[str], list[str]]
+
+# Fields each layer reads. A layer is re-run on a retry only when one of them changed.
+# The consistency prompt shows every field (`LLMConsistencyValidator.full_content`), and a call
+# to action can state facts too ("book a viewing of this 2-bedroom rental").
+LAYER_FIELDS = {
+    "structural": tuple(SEODescription.model_fields),
+    "linguistic": ("title", "full_description", "summary"),
+    "seo": ("title", "full_description", "summary", "key_features", "action"),
+    "json_consistency": ("title", "meta_description", "headline", "full_description", "key_features", "summary", "action"),
+}
+
 
-    try:
-        result = SEODescription(**state["structured_data"])
-        input_json = state.get("input_json") or {}
+def _layer_keys(result: SEODescription, input_json: dict) -> dict[str, str]:
+    """Memo key per layer: hash of the input JSON and the content of the fields the layer reads"""
+    input_hash = hashlib.sha256(canonical_json(input_json).encode("utf-8")).hexdigest()
+    data = result.model_dump()
+    keys = {}
+    for layer, fields in LAYER_FIELDS.items():
+        digest = hashlib.sha256(input_hash.encode("utf-8"))
+        digest.update(canonical_json({field: data[field] for field in fields}).encode("utf-8"))
+        keys[layer] = f"{layer}:{digest.hexdigest()[:24]}"
+    return keys
 
-        language = input_json.get('language', 'en')
-        logger.debug(f"Content language: {language}")
 
-        validator = QualityValidator()
+def _memo_entries(layers: dict[str, Optional[LayerResult]], keys: dict[str, str]) -> dict[str, LayerResult]:
+    return {keys[k]: layer for k, layer in layers.items() if layer is not None}
 
-        struct_score, struct_issues, struct_warnings = validator.check_structural_constraints(result)
+
+class ValidationScheduler:
+    """Runs validation layers cheapest-first and only pays for the LLM consistency
+    layer while the candidate can still pass.
+
+    If the deterministic layers already report a critical issue and `should_retry` is bound
+    to return "retry" (retries and budget left, no early stop by the retry policy), the
+    consistency layer is skipped and reported as `None` in `category_scores`. Given the
+    `state`, the same predicates as `should_retry` decide; without it only RETRY_COUNT does.
+
+    Layers passed in `reuse` are taken as they are instead of being re-run.
+    """
+
+    def __init__(
+        self, 
+        result: SEODescription, 
+        input_json: dict, 
+        language: str, 
+        retry_count: int = 0,
+        reuse: Optional[dict[str, Optional[LayerResult]]] = None,
+        state: Optional[State] = None,
+    ):
+        self.result = result
+        self.input_json = input_json
+        self.language = language
+        self.retry_count = retry_count
+        self.reuse = {k: layer for k, layer in (reuse or {}).items() if layer is not None}
+        self.state = state
+
+    def _retry_certain(self, layers: dict[str, Optional[LayerResult]]) -> bool:
+        # The last attempt is returned as-is, so it must be fully validated
+        if not any(layer[1] for layer in layers.values() if layer is not None):
+            return False
+        if self.state is None:
+            return self.retry_count < RETRY_COUNT
+        # The validation `should_retry` would see if consistency were skipped now
+        validation = _combine_layers({**layers, "json_consistency": None})
+        return retry_end_reason({**self.state, "validation": validation}, log=False) is None
+
+    def _structural(self) -> LayerResult:
+        if "structural" in self.reuse:
+            return self.reuse["structural"]
+        struct_score, struct_issues, struct_warnings = QualityValidator.check_structural_constraints(self.result)
         logger.info(f"Structural validation: score={struct_score:.2f}, issues={len(struct_issues)}")
+        return struct_score, struct_issues, struct_warnings
 
-        ling_score, ling_issues, ling_warnings = validator.check_linguistic_quality(result, language)
-        logger.info(f"Linguistic validation: score={ling_score:.2f}, issues={len(ling_issues)}")
-        
-        seo_score, seo_issues, seo_warnings = validator.check_seo_effectiveness(result, input_json, language)
-        logger.info(f"SEO validation: score={seo_score:.2f}, issues={len(seo_issues)}")
-        
-        json_score, json_issues, json_warnings = validator.check_content_vs_json(result, input_json)
-        logger.info(f"JSON consistency validation: score={json_score:.2f}, issues={len(json_issues)}")
+    def _linguistic_and_seo(self) -> dict[str, LayerResult]:
+        layers = {}
+        if "linguistic" in self.reuse:
+            layers["linguistic"] = self.reuse["linguistic"]
+        else:
+            ling_score, ling_issues, ling_warnings = QualityValidator.check_linguistic_quality(self.result, self.language)
+            logger.info(f"Linguistic validation: score={ling_score:.2f}, issues={len(ling_issues)}")
+            layers["linguistic"] = (ling_score, ling_issues, ling_warnings)
 
-        all_issues = struct_issues + ling_issues + seo_issues + json_issues
-        all_warnings = struct_warnings + ling_warnings + seo_warnings + json_warnings
-        
+        if "seo" in self.reuse:
+            layers["seo"] = self.reuse["seo"]
+        else:
+            seo_score, seo_issues, seo_warnings = QualityValidator.check_seo_effectiveness(self.result, self.input_json, self.language)
+            logger.info(f"SEO validation: score={seo_score:.2f}, issues={len(seo_issues)}")
+            layers["seo"] = (seo_score, seo_issues, seo_warnings)
+
+        return layers
+
+    def _skip_consistency(self, layers: dict[str, Optional[LayerResult]]) -> dict[str, Optional[LayerResult]]:
+        if "json_consistency" in self.reuse:
+            logger.info("Reusing previous LLM consistency result")
+            layers["json_consistency"] = self.reuse["json_consistency"]
+        else:
+            logger.info("Retry already certain from local checks, skipping LLM consistency check")
+            layers["json_consistency"] = None
+        return layers
+
+    @staticmethod
+    def _log_consistency(layer: LayerResult):
+        logger.info(f"JSON consistency validation: score={layer[0]:.2f}, issues={len(layer[1])}")
+
+    def run(self) -> dict[str, Optional[LayerResult]]:
+        layers = {"structural": self._structural()}
+        if "json_consistency" in self.reuse:
+            layers.update(self._linguistic_and_seo())
+            return self._skip_consistency(layers)
+
+        consistency_future = None
+        if not self._retry_certain(layers):
+            # Remaining local checks run while the LLM consistency call is in flight
+            consistency_future = _consistency_executor.submit(
+                contextvars.copy_context().run, QualityValidator.check_content_vs_json, self.result, self.input_json
+            )
+        layers.update(self._linguistic_and_seo())
+
+        # Re-checked with all local layers: they can make a retry certain, or (through the retry policy) make this attempt the last
+        if self._retry_certain(layers):
+            if consistency_future is None or consistency_future.cancel():
+                return self._skip_consistency(layers)
+            # A call already running cannot be interrupted and is paid for: its verdict is kept
+            # (feedback, memo, local repair) rather than bought again later
+            logger.info("Retry now certain, but the LLM consistency call is already running; keeping its verdict")
+
+        if consistency_future is None:
+            layers["json_consistency"] = QualityValidator.check_content_vs_json(self.result, self.input_json)
+        else:
+            layers["json_consistency"] = consistency_future.result()
+        self._log_consistency(layers["json_consistency"])
+        return layers
+
+    async def arun(self) -> dict[str, Optional[LayerResult]]:
+        layers = {"structural": self._structural()}
+        if "json_consistency" in self.reuse:
+            layers.update(self._linguistic_and_seo())
+            return self._skip_consistency(layers)
+
+        consistency_task = None
+        if not self._retry_certain(layers):
+            # Remaining local checks run in a worker thread while the LLM consistency call is awaited
+            consistency_task = asyncio.create_task(QualityValidator.acheck_content_vs_json(self.result, self.input_json))
+        layers.update(await asyncio.to_thread(self._linguistic_and_seo))
+
+        if self._retry_certain(layers):
+            if consistency_task is not None:
+                consistency_task.cancel()
+            return self._skip_consistency(layers)
+
+        if consistency_task is None:
+            consistency_task = QualityValidator.acheck_content_vs_json(self.result, self.input_json)
+        layers["json_consistency"] = await consistency_task
+        self._log_consistency(layers["json_consistency"])
+        return layers
+
+
+TEXT_FIELDS = ("title", "full_description", "summary")
+
+# Issue text -> SEODescription fields it is about; None takes the field name from the first group.
+# Issues matching nothing here (e.g. fabricated facts) are not attributable and need a full regeneration.
+ISSUE_FIELDS = [
+    (re.compile(r"^Title too long"), ("title",)),
+    (re.compile(r"^Meta description too long"), ("meta_description",)),
+    (re.compile(r"^Full description too (long|short)"), ("full_description",)),
+    (re.compile(r"^No key features provided"), ("key_features",)),
+    (re.compile(r"^Field '(\w+)' is empty or null"), None),
+    (re.compile(r"^(\w+) contains HTML/XML tags"), None),
+    (re.compile(r"^Very high repetition detected"), TEXT_FIELDS),
+    (re.compile(r"^Contains \d+ LLM-typical phrases"), TEXT_FIELDS),
+    (re.compile(r"^Possible keyword stuffing"), ("full_description", "summary", "key_features")),
+]
+
+
+def _failed_fields(issues: list[str]) -> Optional[list[str]]:
+    """Fields responsible for the issues (in schema order), or None if any issue can't be pinned to fields"""
+    fields = set()
+    for issue in issues:
+        for pattern, issue_fields in ISSUE_FIELDS:
+            match = pattern.match(issue)
+            if match:
+                fields.update(issue_fields or (match.group(1),))
+                break
+        else:
+            return None
+    return [name for name in SEODescription.model_fields if name in fields]
+
+
+def _combine_layers(layers: dict[str, Optional[LayerResult]]) -> ValidationResult:
+    evaluated = {k: layer for k, layer in layers.items() if layer is not None}
+
+    all_issues = [issue for _, issues, _ in evaluated.values() for issue in issues]
+    all_warnings = [warning for _, _, warnings in evaluated.values() for warning in warnings]
+
+    # Skipped layers stay in category_scores as None
+    scores = {k: (layer[0] if layer is not None else None) for k, layer in layers.items()}
+    
+    weights = {
+        "structural": 0.25,
+        "linguistic": 0.25,
+        "seo": 0.25,
+        "json_consistency": 0.25
+    }
+
+    # Weights are renormalised over the evaluated layers; equal to the plain weighted sum when nothing was skipped
+    total_weight = sum(weights[k] for k in evaluated)
+    overall_score = sum(evaluated[k][0] * weights[k] for k in evaluated) / total_weight if total_weight else 0.0
+    passed = overall_score >= 0.7 and len(all_issues) == 0 and len(evaluated) == len(layers)
+    
+    return {
+        "passed": passed,
+        "score": overall_score,
+        "issues": all_issues,
+        "warnings": all_warnings,
+        "category_scores": scores,
+        "failed_fields": _failed_fields(all_issues),
+    }
+
+
+def _merge_validation(layers: dict[str, Optional[LayerResult]]) -> dict:
+    validation = _combine_layers(layers)
+    for k, layer in layers.items():
+        if layer is not None:
+            CATEGORY_SCORES.observe(layer[0], category=k)
+
+    logger.info(f"Overall validation: passed={validation['passed']}, score={validation['score']:.2f}")
+    return {"validation": validation}
+
+
+# Column-wise versions of the local layers, used by `QualityValidator.validate_batch`.
+# Each must produce exactly what the per-object checks above produce, in the same order.
+
+BatchLayer = tuple[np.ndarray, list[list[str]], list[list[str]]]
+CONTENT_FIELDS = ("title", "meta_description", "headline", "full_description", "summary", "action")
+
+
+def _str_column(rows: list[dict], field: str) -> np.ndarray:
+    return np.array([row.get(field) or "" for row in rows], dtype=str)
+
+
+def _flag(mask: np.ndarray, target: list[list[str]], message):
+    for i in np.flatnonzero(mask):
+        target[i].append(message(i))
+
+
+def _batch_tokens(texts: list[str]) -> tuple[np.ndarray, np.ndarray, np.ndarray, list[str]]:
+    """Whitespace-tokenizes all texts in one go.
+
+    Returns the token ids (indices into the returned vocabulary), the text each token belongs to,
+    and the token count per text. Per-word properties are then computed once per vocabulary entry.
+    """
+    split = [text.split() for text in texts]
+    lengths = np.fromiter(map(len, split), dtype=np.int64, count=len(texts))
+    words = list(chain.from_iterable(split))
+    vocab = list(dict.fromkeys(words))
+    index = {word: i for i, word in enumerate(vocab)}
+    ids = np.fromiter(map(index.__getitem__, words), dtype=np.int64, count=len(words))
+    doc = np.repeat(np.arange(len(texts)), lengths)
+    return ids, doc, lengths, vocab
+
+
+def _batch_structural(rows: list[dict]) -> BatchLayer:
+    n = len(rows)
+    score = np.ones(n)
+    issues: list[list[str]] = [[] for _ in range(n)]
+    warnings: list[list[str]] = [[] for _ in range(n)]
+    columns = {field: _str_column(rows, field) for field in CONTENT_FIELDS}
+
+    title_len = np.char.str_len(columns["title"])
+    too_long = title_len > TITLE_MAX_LEN
+    close = ~too_long & (title_len > TITLE_MAX_LEN - 5)
+    short = ~too_long & ~close & (title_len < 10)
+    _flag(too_long, issues, lambda i: f"Title too long: {title_len[i]}/{TITLE_MAX_LEN} chars")
+    _flag(close, warnings, lambda i: f"Title close to limit: {title_len[i]}/{TITLE_MAX_LEN} chars")
+    _flag(short, warnings, lambda i: f"Title too short: {title_len[i]} chars (min 10)")
+    score[too_long] -= 0.31
+    score[close | short] -= 0.1
+
+    desc_len = np.char.str_len(columns["meta_description"])
+    too_long = desc_len > META_DESCRIPTION_MAX_LEN
+    close = ~too_long & (desc_len > META_DESCRIPTION_MAX_LEN - 5)
+    short = ~too_long & ~close & (desc_len < 50)
+    _flag(too_long, issues, lambda i: f"Meta description too long: {desc_len[i]}/{META_DESCRIPTION_MAX_LEN} chars")
+    _flag(close, warnings, lambda i: f"Meta description close to limit: {desc_len[i]}/{META_DESCRIPTION_MAX_LEN} chars")
+    _flag(short, warnings, lambda i: f"Meta description too short: {desc_len[i]} chars (recommended min 50)")
+    score[too_long] -= 0.31
+    score[close | short] -= 0.1
+
+    full_len = np.char.str_len(columns["full_description"])
+    too_long = full_len > FULL_DESCRIPTION_MAX_LEN
+    too_short = ~too_long & (full_len < FULL_DESCRIPTION_MIN_LEN)
+    near = ~too_long & ~too_short & ((full_len < 520) | (full_len > 680))
+    _flag(too_long, issues, lambda i: f"Full description too long: {full_len[i]}/({FULL_DESCRIPTION_MIN_LEN}-{FULL_DESCRIPTION_MAX_LEN} characters). Make it SHORTER: write 600-650 characters")
+    _flag(too_short, issues, lambda i: f"Full description too short: {full_len[i]}/({FULL_DESCRIPTION_MIN_LEN}-{FULL_DESCRIPTION_MAX_LEN} characters). Make it LONGER: write 600-650 characters")
+    _flag(near, warnings, lambda i: f"Full description length {full_len[i]} near boundary")
+    score[too_long | too_short] -= 0.31
+    score[near] -= 0.1
+
+    features = np.fromiter((len(row.get("key_features") or []) for row in rows), dtype=np.int64, count=n)
+    none = features == 0
+    out_of_range = ~none & ((features < 3) | (features > KEY_FEATURES_MAX))
+    _flag(none, issues, lambda i: "No key features provided")
+    _flag(out_of_range, warnings, lambda i: f"Key features amount {features[i]} not in range 3-{KEY_FEATURES_MAX}")
+    score[none] -= 0.31
+    score[out_of_range] -= 0.2
+
+    for field in CONTENT_FIELDS:
+        column = columns[field]
+        empty = (np.char.str_len(np.char.strip(column)) == 0) | (np.char.lower(column) == "null")
+        _flag(empty, issues, lambda i: f"Field '{field}' is empty or null")
+        score[empty] -= 0.31
+
+    for field in CONTENT_FIELDS:
+        tagged = np.fromiter((HTML_TAG_PATTERN.search(value) is not None for value in columns[field]), dtype=bool, count=n)
+        _flag(tagged, issues, lambda i: f"{field} contains HTML/XML tags")
+        score[tagged] -= 0.31
+
+    return np.maximum(0.0, score), issues, warnings
+
+
+def _batch_repetitions(ids: np.ndarray, doc: np.ndarray, lengths: np.ndarray, ngram_size: int = 3) -> np.ndarray:
+    """`QualityValidator._check_repetitions` for every text, from one pass over all n-grams of lowercased token ids"""
+    n = len(lengths)
+    scores = np.ones(n)
+    counts = np.maximum(lengths - ngram_size + 1, 0)
+    if not counts.any():
+        return scores
+
+    # n-gram ids: combine word ids one position at a time, re-ranking so ids stay small
+    starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+    positions = np.arange(max(len(ids) - ngram_size + 1, 0))
+    positions = positions[positions - starts[doc[positions]] < counts[doc[positions]]]
+    gram = ids[positions]
+    for k in range(1, ngram_size):
+        _, gram = np.unique(gram * (ids.max() + 1) + ids[positions + k], return_inverse=True)
+
+    # (text, n-gram) pairs: distinct n-grams per text and the count of the most frequent one
+    pairs, freq = np.unique(doc[positions] * (gram.max() + 1) + gram, return_counts=True)
+    pair_doc = pairs // (gram.max() + 1)
+    unique = np.bincount(pair_doc, minlength=n)
+    top = np.zeros(n, dtype=np.int64)
+    np.maximum.at(top, pair_doc, freq)
+
+    has = counts > 0
+    ratio = unique[has] / counts[has]
+    scores[has] = ratio * (1 - np.minimum(top[has] / 3, 1.0) * 0.5)
+    return scores
+
+
+def _batch_linguistic(rows: list[dict], languages: list[str]) -> BatchLayer:
+    n = len(rows)
+    score = np.ones(n)
+    issues: list[list[str]] = [[] for _ in range(n)]
+    warnings: list[list[str]] = [[] for _ in range(n)]
+    texts = [f"{row.get('title') or ''} {row.get('full_description') or ''} {row.get('summary') or ''}" for row in rows]
+
+    # One tokenization serves the repetition stats (lowercased) and the ALL CAPS count
+    ids, doc, lengths, vocab = _batch_tokens(texts)
+    lower: dict[str, int] = {}
+    lower_ids = np.array([lower.setdefault(word.lower(), len(lower)) for word in vocab], dtype=np.int64)
+    repetition = _batch_repetitions(lower_ids[ids] if len(ids) else ids, doc, lengths)
+    very_high = repetition < 0.5
+    high = ~very_high & (repetition < 0.7)
+    _flag(very_high, issues, lambda i: f"Very high repetition detected (score: {repetition[i]:.2f})")
+    _flag(high, warnings, lambda i: f"High repetition detected (score: {repetition[i]:.2f})")
+    score[very_high] -= 0.31
+    score[high] -= 0.2
+
+    # -1 marks languages without a phrase list (check skipped)
+    llm_counts = np.array([
+        c if (c := count_llm_phrases(text.lower(), language)) is not None else -1 
+        for text, language in zip(texts, languages)
+    ], dtype=np.int64)
+    many = llm_counts > 3
+    some = ~many & (llm_counts > 1)
+    _flag(many, issues, lambda i: f"Contains {llm_counts[i]} LLM-typical phrases")
+    _flag(some, warnings, lambda i: f"Contains {llm_counts[i]} LLM-typical phrases")
+    score[many] -= 0.31
+    score[some] -= 0.1
+
+    shouting = np.array([word.isupper() and len(word) > 3 for word in vocab], dtype=bool)
+    caps = np.bincount(doc, weights=shouting[ids] if len(ids) else None, minlength=n).astype(np.int64)
+    _flag(caps > 2, warnings, lambda i: f"Contains {caps[i]} words in ALL CAPS")
+    score[caps > 2] -= 0.1
+
+    short = np.fromiter((
+        sum(1 for s in re.split(r'[.!?]+', row.get("full_description") or "") if len(s.strip().split()) < 5 and len(s.strip()) > 0)
+        for row in rows
+    ), dtype=np.int64, count=n)
+    _flag(short > 2, warnings, lambda i: f"Contains {short[i]} very short sentences")
+    score[short > 2] -= 0.1
+
+    return np.maximum(0.0, score), issues, warnings
+
+
+def _batch_keyword_stuffing(texts: list[str]) -> list[Optional[str]]:
+    """Per text, the word `check_seo_effectiveness` reports as keyword stuffing (or None)"""
+    n = len(texts)
+    ids, doc, lengths, vocab = _batch_tokens(texts)
+    found: list[Optional[str]] = [None] * n
+    if not len(ids):
+        return found
+
+    word_len = np.fromiter(map(len, vocab), dtype=np.int64, count=len(vocab))
+    pairs, first, freq = np.unique(doc * len(vocab) + ids, return_index=True, return_counts=True)
+    pair_doc, pair_word = pairs // len(vocab), pairs % len(vocab)
+
+    # Counter.most_common order: by count, ties in order of first appearance; only the top 10 are checked
+    order = np.lexsort((first, -freq, pair_doc))
+    pair_doc, pair_word, freq = pair_doc[order], pair_word[order], freq[order]
+    group_start = np.searchsorted(pair_doc, pair_doc)
+    rank = np.arange(len(pair_doc)) - group_start
+    hit = (rank < 10) & (word_len[pair_word] > 3) & (freq / lengths[pair_doc] > 0.05)
+
+    hit_docs, first_hit = np.unique(pair_doc[hit], return_index=True)
+    for d, j in zip(hit_docs, np.flatnonzero(hit)[first_hit]):
+        found[d] = f"Possible keyword stuffing: '{vocab[pair_word[j]]}' appears {freq[j]} times ({freq[j]/lengths[d]*100:.1f}%)"
+    return found
+
+
+def _batch_seo(rows: list[dict], inputs: list[dict], languages: list[str]) -> BatchLayer:
+    n = len(rows)
+    score = np.ones(n)
+    issues: list[list[str]] = [[] for _ in range(n)]
+    warnings: list[list[str]] = [[] for _ in range(n)]
+
+    stuffing = _batch_keyword_stuffing([
+        " ".join([row.get("full_description") or "", row.get("summary") or "", " ".join(row.get("key_features") or [])]).lower()
+        for row in rows
+    ])
+    stuffed = np.array([s is not None for s in stuffing], dtype=bool)
+    _flag(stuffed, issues, lambda i: stuffing[i])
+    score[stuffed] -= 0.31
+
+    # Regex matchers and substring checks stay per row: they run in C already
+    cta = [has_cta((row.get("action") or "").lower(), language) for row, language in zip(rows, languages)]
+    no_cta = np.array([found is False for found in cta], dtype=bool)
+    _flag(no_cta, warnings, lambda i: f"No clear call-to-action detected in '{languages[i]}' language")
+    score[no_cta] -= 0.2
+
+    titles = [(row.get("title") or "").lower() for row in rows]
+    no_type = np.array([has_property_type(title, language) is False for title, language in zip(titles, languages)], dtype=bool)
+    _flag(no_type, warnings, lambda i: f"Title missing property type keyword  for '{languages[i]}'")
+    score[no_type] -= 0.1
+
+    locations = [input_json.get("location", {}) for input_json in inputs]
+    for key, label in (("city", "city"), ("neighborhood", "neighborhood")):
+        missing = np.array([bool(loc.get(key)) and loc[key].lower() not in title for loc, title in zip(locations, titles)], dtype=bool)
+        _flag(missing, warnings, lambda i: f"Title missing {label} keyword from input_json: '{locations[i][key]}'")
+        score[missing] -= 0.1
+
+    return np.maximum(0.0, score), issues, warnings
+
+
+def _batch_layers(chunk: tuple[list[dict], list[dict]]) -> list[dict[str, Optional[LayerResult]]]:
+    """Local layers for one chunk of rows; runs in a worker process"""
+    rows, inputs = chunk
+    languages = [input_json.get("language", "en") for input_json in inputs]
+    layers = {
+        "structural": _batch_structural(rows),
+        "linguistic": _batch_linguistic(rows, languages),
+        "seo": _batch_seo(rows, inputs, languages),
+    }
+    return [
+        {name: (float(scores[i]), issues[i], warnings[i]) for name, (scores, issues, warnings) in layers.items()}
+        for i in range(len(rows))
+    ]
+
+
+def _memoized_scheduler(state: State) -> tuple[ValidationScheduler, dict[str, str]]:
+    result = SEODescription(**state["structured_data"])
+    input_json = state.get("input_json") or {}
+
+    language = input_json.get('language', 'en')
+    logger.debug(f"Content language: {language}")
+
+    keys = _layer_keys(result, input_json)
+    memo = state.get("validation_memo") or {}
+    reuse = {layer: memo[key] for layer, key in keys.items() if key in memo}
+    if reuse:
+        logger.info(f"Reusing validation of unchanged fields: {', '.join(reuse)}")
+        for layer in reuse:
+            VALIDATION_MEMO_HITS.inc(layer=layer)
+
+    scheduler = ValidationScheduler(result, input_json, language, state.get("retry_count", 0), reuse=reuse, state=state)
+    return scheduler, keys
+
+
+def validate_output(state: State):
+    logger.info("Starting validation...")
+
+    failed = _precheck_state(state)
+    if failed:
+        return failed
+
+    with track_usage() as tracker:
+        try:
+            scheduler, keys = _memoized_scheduler(state)
+            layers = scheduler.run()
+            update = {
+                **_merge_validation(layers), 
+                "validation_layers": layers, 
+                "validation_memo": _memo_entries(layers, keys),
+            }
+
+        except Exception as e:
+            logger.error(f"Validation failed: {e}")
+            update = _failed_validation(f"Validation error: {str(e)}")
+
+    return {**update, "usage": tracker.usage}
+
+
+async def avalidate_output(state: State):
+    """Async counterpart of `validate_output`, awaits the LLM consistency check"""
+    logger.info("Starting validation (async)...")
+
+    failed = _precheck_state(state)
+    if failed:
+        return failed
+
+    with track_usage() as tracker:
+        try:
+            scheduler, keys = _memoized_scheduler(state)
+            layers = await scheduler.arun()
+            update = {
+                **_merge_validation(layers), 
+                "validation_layers": layers, 
+                "validation_memo": _memo_entries(layers, keys),
+            }
+
+        except Exception as e:
+            logger.error(f"Validation failed: {e}")
+            update = _failed_validation(f"Validation error: {str(e)}")
+
+    return {**update, "usage": tracker.usage}
+
+def retry_end_reason(state: State, log: bool = True) -> Optional[str]:
+    """Why a failed candidate must be the last one (retries, budget, retry policy), or None.
+
+    Shared by `should_retry` and `ValidationScheduler`, so an attempt that ends the run is always fully validated.
+    """
+    retry_count = state.get("retry_count", 0)
+    if retry_count >= RETRY_COUNT:
+        if log:
+            logger.warning(f"Max retries ({RETRY_COUNT}) reached, ending")
+        return "max_retries"
+
+    exhausted = budget_exhausted(state.get("usage"), state.get("budget"), rounds=retry_count + 1)
+    if exhausted:
+        if log:
+            logger.warning(f"Budget exhausted ({exhausted}), ending with the current candidate")
+        return "budget"
+
+    reason = stop_reason(state, log=log)
+    if reason and log:
+        logger.warning(f"Retry policy: ending early ({reason}) after attempt {retry_count + 1}/{RETRY_COUNT + 1}")
+        RETRY_STOPS.inc(reason=reason)
+    return reason
 
-        scores = {
-            "structural": struct_score,
-            "linguistic": ling_score,
-            "seo": seo_score,
-            "json_consistency": json_score
-        } 
-        
-        weights = {
-            "structural": 0.25,
-            "linguistic": 0.25,
-            "seo": 0.25,
-            "json_consistency": 0.25
-        }
-
-        overall_score = sum(scores[k] * weights[k] for k in scores)
-        passed = overall_score >= 0.7 and len(all_issues) == 0
-        
-        logger.info(f"Overall validation: passed={passed}, score={overall_score:.2f}")
-        validation: ValidationResult = {
-            "passed": passed,
-            "score": overall_score,
-            "issues": all_issues,
-            "warnings": all_warnings,
-            "category_scores": scores
-        }
-
-        return {"validation": validation}
-
-    except Exception as e:
-        logger.error(f"Validation failed: {e}")
-        validation: ValidationResult = {
-            "passed": False,
-            "score": 0.0,
-            "issues": [f"Validation error: {str(e)}"],
-            "warnings": [],
-            "category_scores": {}
-        }
-        return {"validation": validation}
 
 def should_retry(state: State) -> Literal["retry", "end"]:
 
@@ -444,8 +1088,7 @@ def should_retry(state: State) -> Literal["retry", "end"]:
         logger.success("Validation passed, ending")
         return "end"
     
-    if retry_count >= RETRY_COUNT:
-        logger.warning(f"Max retries ({RETRY_COUNT}) reached, ending")
+    if retry_end_reason(state):
         return "end"
     
     # If score is too low and there are retries
@@ -462,10 +1105,21 @@ def should_retry(state: State) -> Literal["retry", "end"]:
     return "end"
 
 
+def _repair_fields(state: State) -> Optional[list[str]]:
+    """Fields to regenerate on their own, or None for a full regeneration"""
+    fields = (state.get("validation") or {}).get("failed_fields")
+    if not REPAIR_MODE or not state.get("structured_data") or not fields:
+        return None
+    if len(fields) > REPAIR_MAX_FIELDS:
+        return None
+    return fields
+
+
 def retry_with_feedback(state: State):
 
     validation = state.get("validation", {})
-    issues = validation.get("issues", [])
+    # Provider / validator errors say nothing about the content, so they are left out of the feedback
+    issues = fixable_issues(validation.get("issues", []))
     warnings = validation.get("warnings", [])
     retry_count = state.get("retry_count", 0)
     
@@ -473,8 +1127,15 @@ def retry_with_feedback(state: State):
     
     original_message = state["messages"][0] if state["messages"] else ("user", "{}")
 
-    # Prepare feedback for LLM
-    feedback_parts = ["The previous attempt had quality issues. Please regenerate addressing the following:\n"]
+    repair_fields = _repair_fields(state)
+    if repair_fields:
+        logger.info(f"Repair mode: regenerating only {repair_fields}")
+        feedback_parts = [
+            f"The previous attempt had quality issues in some fields only. Rewrite ONLY these fields: {', '.join(repair_fields)}.",
+            "Keep them consistent with the JSON data and with the unchanged fields of the current listing below.\n",
+        ]
+    else:
+        feedback_parts = ["The previous attempt had quality issues. Please regenerate addressing the following:\n"]
     
     if issues:
         feedback_parts.append("CRITICAL ISSUES (must fix):")
@@ -485,12 +1146,24 @@ def retry_with_feedback(state: State):
         feedback_parts.append("\nWARNINGS (should improve):")
         for warning in warnings:
             feedback_parts.append(f"- {warning}")
+
+    skipped = [k for k, v in validation.get("category_scores", {}).items() if v is None]
+    if skipped:
+        feedback_parts.append(f"\nNOT CHECKED (skipped because of the critical issues above): {', '.join(skipped)}")
+        feedback_parts.append("- Keep every fact strictly consistent with the JSON data")
     
-    feedback_parts.append("\nPlease regenerate the complete property listing with these improvements.")
+    if repair_fields:
+        feedback_parts.append("\nCurrent listing:")
+        feedback_parts.append(json.dumps(state["structured_data"], indent=2, ensure_ascii=False))
+    else:
+        feedback_parts.append("\nPlease regenerate the complete property listing with these improvements.")
     
     feedback_message = "\n".join(feedback_parts)
     
     return {
         "messages": [original_message, ("user", feedback_message)],
-        "retry_count": retry_count + 1
+        "retry_count": retry_count + 1,
+        "repair_fields": repair_fields,
+        "attempts": [attempt_record(state)],
+        "best_candidate": best_candidate(state),
     }
@@ -0,0 +1,191 @@
+import math
+import asyncio
+
+from typing import Optional
+from loguru import logger
+
+from main import run_pipeline_async
+from registry import registry
+from utils.job_queue import JobQueue, QUEUED
+from utils.metrics import metrics
+from utils.result_cache import cache_key
+from pipeline_config.pipeline_config import (
+    JOB_DB_PATH,
+    JOB_WORKERS,
+    JOB_MAX_QUEUE_DEPTH,
+    JOB_RETRY_AFTER,
+    JOB_POLL_INTERVAL,
+    JOB_WEBHOOK_TIMEOUT,
+    JOB_WEBHOOK_ATTEMPTS,
+)
+
+
+class JobRejected(Exception):
+    """Job not accepted; `status_code` is 429 (queue full) or 503 (service not running)"""
+
+    def __init__(self, status_code: int, detail: str, retry_after: int):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+        self.retry_after = retry_after
+
+
+def job_view(job: dict, position: Optional[int] = None) -> dict:
+    """Public representation of a job, as returned by GET /jobs/{id} and posted to webhooks"""
+    result = job.get("result")
+    view = {
+        "id": job["id"],
+        "status": job["status"],
+        "created_at": job["created_at"],
+        "started_at": job["started_at"],
+        "finished_at": job["finished_at"],
+        "error": job["error"],
+        "result": {
+            "html": result.get("formatted_data"),
+            "rendered": result.get("rendered", {}),
+            "validation": result.get("validation", {}),
+            "retry_count": result.get("retry_count", 0),
+            "local_repairs": result.get("local_repairs", []),
+            "usage": result.get("usage", {}),
+            "cached": result.get("cached", False),
+        } if result else None,
+    }
+    if position is not None:
+        view["queue_position"] = position
+    return view
+
+
+class JobService:
+    """Runs queued pipeline jobs on a fixed pool of asyncio workers.
+
+    Jobs wait in the durable queue rather than all hitting OpenAI at once; past
+    `max_depth` queued jobs new submissions are refused with a Retry-After estimate.
+    """
+
+    def __init__(self, path: str = JOB_DB_PATH, workers: int = JOB_WORKERS, max_depth: int = JOB_MAX_QUEUE_DEPTH):
+        self.path = path
+        self.workers = workers
+        self.max_depth = max_depth
+        self.queue: Optional[JobQueue] = None
+        self._tasks: list[asyncio.Task] = []
+        self._webhooks: set[asyncio.Task] = set()
+        self._wakeup: Optional[asyncio.Event] = None
+
+    @property
+    def running(self) -> bool:
+        return self.queue is not None and bool(self._tasks)
+
+    async def start(self):
+        self.queue = await asyncio.to_thread(JobQueue, self.path)
+        self._wakeup = asyncio.Event()
+        self._tasks = [asyncio.create_task(self._worker(n)) for n in range(self.workers)]
+        logger.success(f"Job workers started: {self.workers}")
+
+    async def stop(self):
+        # Jobs cut off here stay `running` in the queue and are picked up again on the next start
+        tasks, self._tasks = self._tasks, []
+        for task in [*tasks, *self._webhooks]:
+            task.cancel()
+        await asyncio.gather(*tasks, *self._webhooks, return_exceptions=True)
+        if self.queue is not None:
+            self.queue.close()
+            self.queue = None
+
+    def _retry_after(self, jobs_ahead: int) -> int:
+        mean = self.queue.mean_duration() if self.queue is not None else None
+        if not mean:
+            return JOB_RETRY_AFTER
+        return max(JOB_RETRY_AFTER, math.ceil(mean * jobs_ahead / self.workers))
+
+    async def submit(self, input_json: dict, options: dict, webhook_url: Optional[str] = None) -> tuple[dict, bool]:
+        """Queue a job; returns `(job_view, created)`. Raises JobRejected when it can't be taken"""
+        if not self.running:
+            raise JobRejected(503, "Job workers are not running", JOB_RETRY_AFTER)
+
+        input_key = cache_key(input_json)
+        pending = await asyncio.to_thread(self.queue.find_pending, input_key, options, webhook_url)
+        if pending is not None:
+            logger.info(f"Identical job {pending} already pending, not queued again")
+            return await self.get(pending), False
+
+        depth = (await asyncio.to_thread(self.queue.counts))[QUEUED]
+        if depth >= self.max_depth:
+            raise JobRejected(429, f"Job queue is full ({depth} queued)", self._retry_after(depth - self.max_depth + 1))
+
+        job_id, created = await asyncio.to_thread(self.queue.submit, input_json, options, webhook_url, input_key)
+        if created:
+            self._wakeup.set()
+            logger.info(f"Job {job_id} queued (depth {depth + 1})")
+        return await self.get(job_id), created
+
+    async def get(self, job_id: str) -> Optional[dict]:
+        if self.queue is None:
+            raise JobRejected(503, "Job queue is not available", JOB_RETRY_AFTER)
+        job = await asyncio.to_thread(self.queue.get, job_id)
+        if job is None:
+            return None
+        position = await asyncio.to_thread(self.queue.position, job_id, job["created_at"]) if job["status"] == QUEUED else None
+        return job_view(job, position)
+
+    def stats(self) -> dict:
+        return {
+            "running": self.running,
+            "workers": self.workers,
+            "max_depth": self.max_depth,
+            "jobs": self.queue.counts() if self.queue is not None else {},
+            "mean_duration": self.queue.mean_duration() if self.queue is not None else None,
+        }
+
+    async def _worker(self, n: int):
+        while True:
+            job = await asyncio.to_thread(self.queue.claim)
+            if job is None:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), JOB_POLL_INTERVAL)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            await self._run(job, n)
+
+    async def _run(self, job: dict, n: int):
+        options = job["options"]
+        logger.info(f"Worker {n} running job {job['id']}")
+        try:
+            result = await run_pipeline_async(
+                job["input_json"], 
+                bypass_cache=options.get("bypass_cache", False), 
+                budget=options.get("budget"),
+                formats=options.get("formats"),
+            )
+            await asyncio.to_thread(self.queue.finish, job["id"], result)
+        except Exception as e:
+            logger.exception(f"Job {job['id']} failed")
+            await asyncio.to_thread(self.queue.finish, job["id"], None, str(e))
+
+        for url in await asyncio.to_thread(self.queue.webhooks, job["id"]):
+            task = asyncio.create_task(self._notify(job["id"], url))
+            self._webhooks.add(task)
+            task.add_done_callback(self._webhooks.discard)
+
+    async def _notify(self, job_id: str, url: str):
+        payload = job_view(await asyncio.to_thread(self.queue.get, job_id))
+        for attempt in range(1, JOB_WEBHOOK_ATTEMPTS + 1):
+            try:
+                response = await registry.http_async_client.post(url, json=payload, timeout=JOB_WEBHOOK_TIMEOUT)
+                response.raise_for_status()
+                logger.info(f"Webhook for job {job_id} delivered")
+                return
+            except Exception as e:
+                logger.warning(f"Webhook for job {job_id} failed (attempt {attempt}/{JOB_WEBHOOK_ATTEMPTS}): {e}")
+                if attempt < JOB_WEBHOOK_ATTEMPTS:
+                    await asyncio.sleep(2 ** (attempt - 1))
+        logger.error(f"Webhook for job {job_id} not delivered to '{url}'")
+
+
+job_service = JobService()
+
+metrics.callback(
+    "seo_jobs", "Jobs in the queue by status", "gauge", ["status"],
+    lambda: {(status,): count for status, count in job_service.queue.counts().items()} if job_service.queue is not None else {},
+)
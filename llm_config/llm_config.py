@@ -3,6 +3,18 @@ MODEL_TONE = "formal" # formal, friendly, luxury, investor-focused
 TEMPERATURE = 0
 MAX_HISTORY = 5
 RETRY_COUNT = 5
+# Retries stop early once they stop paying off (see content_retry.py)
+RETRY_PLATEAU_ROUNDS = 2  # attempts in a row that did not beat the best score by RETRY_MIN_IMPROVEMENT
+RETRY_MIN_IMPROVEMENT = 0.01
+RETRY_REPEAT_LIMIT = 3  # attempts in a row failing with the same kind of issue
+# Retries rewrite only the failing fields when every critical issue points at no more than REPAIR_MAX_FIELDS fields
+REPAIR_MODE = True
+REPAIR_MAX_FIELDS = 3
+# Accepted outputs of similar listings shown to the generator (see utils/exemplar_index.py)
+EXEMPLARS_ENABLED = True
+EXEMPLAR_COUNT = 2  # closest accepted listings injected into a generation prompt
+EXEMPLAR_MIN_SCORE = 0.85  # passing results at or above this validation score become exemplars
+EXEMPLAR_MAX_DISTANCE = 10.0  # feature-space distance beyond which a listing is too different to be shown (sale vs rent alone is ~5)
 
 TITLE = "Page title: short title for the page that appears in browser tab and search engine results - max 60 characters"
 META_DESCRIPTION = "Meta description: SEO snippet - max 155 characters"
@@ -11,3 +23,29 @@ FULL_DESCRIPTION = "Full property description: Rich, engaging paragraph with all
 KEY_FEATURES = "Key features list: 3-5 short features"
 SUMMARY = "Neighborhood Summary: One paragraph with lifestyle and area information"
 ACTION = "Call to action: Short closing line encouraging the user to act"
+
+# Shared HTTP connection pool for all OpenAI clients (see registry.py)
+HTTP_MAX_CONNECTIONS = 100
+HTTP_MAX_KEEPALIVE_CONNECTIONS = 20
+HTTP_KEEPALIVE_EXPIRY = 30.0
+
+# USD per 1M tokens, used for per-request cost accounting (see utils/usage.py)
+MODEL_PRICING = {
+    "gpt-5.1": {"input": 1.25, "cached_input": 0.125, "output": 10.0},
+    "gpt-4o": {"input": 2.50, "cached_input": 1.25, "output": 10.0},
+    "gpt-4o-mini": {"input": 0.15, "cached_input": 0.075, "output": 0.60},
+}
+BATCH_PRICE_FACTOR = 0.5  # OpenAI Batch API requests cost half the synchronous rate
+
+# Client-side rate limits per model, shared by every call in the process (see utils/rate_limiter.py).
+# Set them to the organisation's tier limits; models not listed here are not limited.
+MODEL_RATE_LIMITS = {
+    "gpt-5.1": {"rpm": 500, "tpm": 500_000},
+    "gpt-4o": {"rpm": 500, "tpm": 300_000},
+    "gpt-4o-mini": {"rpm": 500, "tpm": 200_000},
+}
+RATE_LIMIT_BURST_SECONDS = 5.0  # bucket capacity, in seconds' worth of the per-minute limit
+RATE_LIMIT_MAX_ATTEMPTS = 6  # attempts per call on 429 / transient errors
+RATE_LIMIT_BACKOFF_BASE = 1.0  # seconds, doubled per attempt, with jitter
+RATE_LIMIT_BACKOFF_MAX = 60.0
+EXPECTED_OUTPUT_TOKENS = {"generator": 900, "repair": 300, "consistency": 300, "consistency_batch": 2400}  # reserved before a call, settled after
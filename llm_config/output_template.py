@@ -2,7 +2,10 @@ HTML_TEMPLATE = """
 <title>{{ title }}</title>
 
 <meta name="description" content="{{ meta_description }}">
+{% include "body.html" %}
+"""
 
+HTML_BODY_TEMPLATE = """
 <h1>{{ headline }}</h1>
 
 <section id="description">
@@ -25,3 +28,30 @@ HTML_TEMPLATE = """
 
 <p class="call-to-action">{{ action }}</p>
 """
+
+PAGE_TEMPLATE = """<!DOCTYPE html>
+<html lang="{{ language }}">
+<head>
+<meta charset="utf-8">
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<title>{{ title }}</title>
+<meta name="description" content="{{ meta_description }}">
+<script type="application/ld+json">{{ jsonld | script_json }}</script>
+</head>
+<body>
+{% include "body.html" %}
+</body>
+</html>
+"""
+
+MARKDOWN_TEMPLATE = """# {{ headline }}
+
+{{ full_description }}
+
+{% for feature in key_features -%}
+- {{ feature }}
+{% endfor %}
+{{ summary }}
+
+**{{ action }}**
+"""
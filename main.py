@@ -1,29 +1,51 @@
 import os
 import json
+import asyncio
 
 from datetime import datetime
 from pydantic import BaseModel, Field
-from typing import Literal, Type, TypedDict, Annotated, Optional
+from typing import Literal, Type, TypedDict, Annotated, Optional, AsyncIterator, Iterable, Any
 from dotenv import load_dotenv
 from loguru import logger
 
 from langgraph.graph import StateGraph, MessagesState, START, END
 from langgraph.graph.message import add_messages
+from langchain_core.runnables import RunnableLambda, RunnableConfig
+from langchain_core.utils.json import parse_partial_json
 
-from models import State
-from utils.file_system import save_result_html
+from models import State, SEODescription, ConsistencyCheck
+from registry import registry
 from utils.analysis import visualize_graph_html, log_validation_report
 from content_generation import (
     get_structured_llm, 
     output_processing,
+    aoutput_processing,
 )
 from content_validation import (
     validate_output,
+    avalidate_output,
     should_retry,
     retry_with_feedback,
 )
+from content_repair import repair_output, arepair_output, should_repair
+from content_retry import select_result
 from IPython.display import Image, display
-from llm_config.llm_config import RETRY_COUNT
+from llm_config.llm_config import RETRY_COUNT, MODEL, TEMPERATURE
+from validation_config.valid_config import VALID_MODEL, VALID_TEMPERATURE
+from validation_config.valid_lang_phrases import LLM_PHRASES
+from pipeline_config.pipeline_config import (
+    BATCH_CONCURRENCY,
+    CACHE_ENABLED,
+    CACHE_ONLY_PASSED,
+    DEFAULT_MAX_TOKENS,
+    DEFAULT_MAX_COST,
+)
+from utils.result_cache import result_cache, cache_key
+from utils.result_store import result_store
+from utils.exemplar_index import exemplar_index
+from utils.metrics import timed_node, RETRY_COUNT_HIST, VALIDATION_RESULTS, PIPELINE_RUNS
+from utils.usage import summarize_usage
+from content_rendering import render, resolve_formats
 
 load_dotenv()
 logger.add(
@@ -38,15 +60,36 @@ logger.add(
 def create_graph():
     workflow = StateGraph(State)
     
-    workflow.add_node("output_processing", output_processing)
-    workflow.add_node("validate", validate_output)
-    workflow.add_node("retry", retry_with_feedback)
+    # Nodes carry both sync and async implementations, so the same graph serves `invoke` and `ainvoke`
+    workflow.add_node("output_processing", RunnableLambda(
+        timed_node("output_processing", output_processing), 
+        afunc=timed_node("output_processing", aoutput_processing),
+    ))
+    workflow.add_node("validate", RunnableLambda(
+        timed_node("validate", validate_output), 
+        afunc=timed_node("validate", avalidate_output),
+    ))
+    workflow.add_node("repair", RunnableLambda(
+        timed_node("repair", repair_output), 
+        afunc=timed_node("repair", arepair_output),
+    ))
+    workflow.add_node("retry", timed_node("retry", retry_with_feedback))
     
     workflow.add_edge(START, "output_processing")
     workflow.add_edge("output_processing", "validate")
 
+    # Mechanical violations are fixed locally first; an LLM retry only follows if that is not enough
     workflow.add_conditional_edges(
         "validate",
+        should_repair,
+        {
+            "repair": "repair",
+            "retry": "retry",
+            "end": END
+        }
+    )
+    workflow.add_conditional_edges(
+        "repair",
         should_retry,
         {
             "retry": "retry",
@@ -59,17 +102,56 @@ def create_graph():
     return workflow.compile()
 
 
-def run_pipeline(input_json: dict, save_output: bool = False):
+def get_app():
+    """Compiled pipeline graph, built once per process"""
+    return registry.get_graph("seo_pipeline", create_graph)
 
-    logger.info("Starting SEO content generation pipeline")
-    
-    app = create_graph()
-    result = app.invoke({
+
+def warm_up():
+    registry.warm_up(
+        graphs={"seo_pipeline": create_graph},
+        clients=[
+            (SEODescription, MODEL, TEMPERATURE),
+            (ConsistencyCheck, VALID_MODEL, VALID_TEMPERATURE),
+        ],
+    )
+    if exemplar_index.enabled:
+        exemplar_index.open()
+
+
+def _initial_state(input_json: dict, budget: Optional[dict] = None) -> dict:
+    if budget is None:
+        budget = {"max_tokens": DEFAULT_MAX_TOKENS, "max_cost": DEFAULT_MAX_COST}
+    return {
         "messages": [("user", json.dumps(input_json, indent=2))],
         "input_json": input_json,
-        "retry_count": 0
-    })
+        "retry_count": 0,
+        "usage": {},
+        "budget": budget,
+        "local_repairs": [],
+        "validation_memo": {},
+        "attempts": [],
+        "best_candidate": None,
+    }
+
+
+def _save_output(final: dict, input_json: dict) -> dict:
+    """Queue the HTML for the result store (written in the background) and add its `result_id`"""
+    formatted_data = final.get("formatted_data")
+    if formatted_data is None and final.get("struct_data"):
+        formatted_data = render(final["struct_data"], ("html",), input_json)["html"]
+    if not formatted_data:
+        logger.error("No output generated")
+        return final
+
+    entry = result_store.save(formatted_data, input_json, final.get("validation"))
+    logger.success(f"Result {entry['id']} queued for '{entry['path']}'")
+    return {**final, "result_id": entry["id"]}
+
 
+def _finalize_result(result: dict) -> dict:
+    # The last attempt is not always the best one (see content_retry.py)
+    result = select_result(result)
     validation = result.get("validation", {})
     logger.info(f"Final validation: passed={validation.get('passed')}, score={validation.get('score', 0):.2f}")
     
@@ -81,23 +163,285 @@ def run_pipeline(input_json: dict, save_output: bool = False):
     
     logger.info(f"Total retries: {result.get('retry_count', 0)}/{RETRY_COUNT}")
 
-    if save_output:
-        if result.get("formatted_data"):
-            ts = datetime.now().strftime("%Y%m%d_%H%M%S")
-            path = f"results/{ts}_output.html"
-            save_result_html(result.get("formatted_data"), path=path)
-            logger.success(f"Result saved to '{path}'")
-        else:
-            logger.error("No output generated")
-    
+    usage = summarize_usage(result.get("usage"))
+    logger.info(f"Usage: {usage['calls']} LLM calls, {usage['total_tokens']} tokens, ${usage['cost_usd']:.4f}")
+
+    language = (result.get("input_json") or {}).get("language", "en")
+    # The language comes from the request: anything unsupported shares one label value
+    if not isinstance(language, str) or language not in LLM_PHRASES:
+        language = "other"
+    RETRY_COUNT_HIST.observe(result.get("retry_count", 0))
+    VALIDATION_RESULTS.inc(language=language, result="pass" if validation.get("passed") else "fail")
+    PIPELINE_RUNS.inc(cached="false")
+
     return {
         "struct_data": result.get("structured_data"),
-        "formatted_data": result.get("formatted_xml"),
         "validation": validation,
-        "retry_count": result.get("retry_count", 0)
+        "retry_count": result.get("retry_count", 0),
+        "local_repairs": result.get("local_repairs", []),
+        "usage": usage,
+        "cached": False,
     }
 
 
+def _keep_exemplar(input_json: dict, final: dict):
+    # Blocking (index lock, first-use load): async callers run it in a worker thread
+    exemplar_index.add(input_json, final.get("struct_data"), final.get("validation"))
+
+
+def _render_result(final: dict, input_json: dict, formats: tuple[str, ...]) -> dict:
+    """Render the accepted candidate in the requested formats; `formatted_data` stays the HTML fragment"""
+    data = final.get("struct_data")
+    rendered = render(data, formats, input_json) if data else {}
+    return {**final, "formatted_data": rendered.get("html"), "rendered": rendered}
+
+
+def _lookup_key(input_json: dict, bypass_cache: bool) -> tuple[Optional[str], bool]:
+    """The cache key (None when caching is off) and whether to look it up"""
+    if not CACHE_ENABLED:
+        return None, False
+
+    key = cache_key(input_json)
+    if bypass_cache:
+        logger.info("Result cache bypassed for this request")
+        return key, False
+    return key, True
+
+
+def _cache_hit(key: str, cached: Optional[dict]) -> Optional[dict]:
+    if cached is None:
+        return None
+    logger.success(f"Result cache hit: {key[:12]}")
+    PIPELINE_RUNS.inc(cached="true")
+    # A hit costs nothing; the original spend stays in the cache entry only
+    return {**cached, "usage": summarize_usage({}), "cached": True}
+
+
+def _lookup_cache(input_json: dict, bypass_cache: bool) -> tuple[Optional[str], Optional[dict]]:
+    """Returns the cache key (None when caching is off) and the cached result, if any"""
+    key, lookup = _lookup_key(input_json, bypass_cache)
+    return key, _cache_hit(key, result_cache.get(key)) if lookup else None
+
+
+async def _alookup_cache(input_json: dict, bypass_cache: bool) -> tuple[Optional[str], Optional[dict]]:
+    """Async `_lookup_cache`: the disk tier is read in a worker thread"""
+    key, lookup = _lookup_key(input_json, bypass_cache)
+    return key, _cache_hit(key, await result_cache.aget(key)) if lookup else None
+
+
+def _cache_entry(key: Optional[str], final: dict) -> Optional[dict]:
+    if key is None or not final.get("struct_data"):
+        return None
+    if CACHE_ONLY_PASSED and not final["validation"].get("passed"):
+        return None
+    # Entries stay structured; every hit is rendered in the formats its own request asks for
+    return {k: v for k, v in final.items() if k not in ("formatted_data", "rendered")}
+
+
+def _store_cache(key: Optional[str], final: dict):
+    entry = _cache_entry(key, final)
+    if entry is not None:
+        result_cache.set(key, entry)
+
+
+async def _astore_cache(key: Optional[str], final: dict):
+    entry = _cache_entry(key, final)
+    if entry is not None:
+        await result_cache.aset(key, entry)
+
+
+def run_pipeline(
+    input_json: dict, 
+    save_output: bool = False, 
+    bypass_cache: bool = False,
+    config: Optional[RunnableConfig] = None,
+    budget: Optional[dict] = None,
+    formats: Optional[Iterable[str]] = None,
+):
+
+    logger.info("Starting SEO content generation pipeline")
+
+    formats = resolve_formats(formats)
+    key, final = _lookup_cache(input_json, bypass_cache)
+    if final is None:
+        app = get_app()
+        result = app.invoke(_initial_state(input_json, budget), config=config)
+        final = _finalize_result(result)
+        _keep_exemplar(input_json, final)
+        _store_cache(key, final)
+
+    final = _render_result(final, input_json, formats)
+    if save_output:
+        final = _save_output(final, input_json)
+    return final
+
+
+async def run_pipeline_async(
+    input_json: dict, 
+    save_output: bool = False, 
+    bypass_cache: bool = False,
+    config: Optional[RunnableConfig] = None,
+    budget: Optional[dict] = None,
+    formats: Optional[Iterable[str]] = None,
+):
+    """Async variant of `run_pipeline`: LLM calls are awaited, so one event loop serves many listings.
+
+    `budget` (`{"max_tokens": ..., "max_cost": ...}`, both optional) stops retries before
+    the request would exceed it; None falls back to the configured defaults.
+    `formats` picks the renderings returned under `rendered` (see content_rendering.FORMATS);
+    only the accepted candidate is rendered, and `formatted_data` is set only if "html" is among them.
+    """
+
+    logger.info("Starting SEO content generation pipeline (async)")
+
+    formats = resolve_formats(formats)
+    key, final = await _alookup_cache(input_json, bypass_cache)
+    if final is None:
+        app = get_app()
+        result = await app.ainvoke(_initial_state(input_json, budget), config=config)
+        final = _finalize_result(result)
+        await asyncio.to_thread(_keep_exemplar, input_json, final)
+        await _astore_cache(key, final)
+
+    final = _render_result(final, input_json, formats)
+    if save_output:
+        final = _save_output(final, input_json)
+    return final
+
+
+def _chunk_text(chunk) -> str:
+    """Text carried by a streamed LLM chunk: structured output arrives as JSON content or tool-call args"""
+    if getattr(chunk, "tool_call_chunks", None):
+        return "".join(tc.get("args") or "" for tc in chunk.tool_call_chunks)
+    content = chunk.content
+    if isinstance(content, list):
+        return "".join(block.get("text", "") for block in content if isinstance(block, dict))
+    return content or ""
+
+
+async def stream_pipeline(
+    input_json: dict, 
+    bypass_cache: bool = False,
+    budget: Optional[dict] = None,
+    formats: Optional[Iterable[str]] = None,
+) -> AsyncIterator[tuple[str, dict[str, Any]]]:
+    """Run the pipeline and yield `(event, data)` pairs as it progresses.
+
+    Events: `node_start` / `node_end` per graph node, `partial` with the structured
+    fields parsed so far while the model streams, `draft` with each generated (or locally repaired) candidate,
+    `validation` with interim scores, and a final `result` with the same payload
+    as `run_pipeline`. Closing the iterator cancels the remaining work.
+    Drafts carry an HTML preview; `formats` only applies to the final result.
+    """
+    logger.info("Starting SEO content generation pipeline (streaming)")
+
+    formats = resolve_formats(formats)
+    key, final = await _alookup_cache(input_json, bypass_cache)
+    if final is not None:
+        yield "result", _render_result(final, input_json, formats)
+        return
+
+    app = get_app()
+    state: dict = {}
+    attempt = 0
+    buffer = ""
+    last_partial = None
+
+    async for mode, payload in app.astream(_initial_state(input_json, budget), stream_mode=["tasks", "messages", "values"]):
+        if mode == "values":
+            state = payload
+
+        elif mode == "tasks":
+            node = payload["name"]
+            if "input" in payload:
+                if node == "output_processing":
+                    attempt += 1
+                    buffer, last_partial = "", None
+                yield "node_start", {"node": node, "attempt": attempt}
+                continue
+
+            yield "node_end", {"node": node, "attempt": attempt, "error": str(payload["error"]) if payload.get("error") else None}
+            update = payload.get("result") or {}
+            if node in ("output_processing", "repair"):
+                draft = update.get("structured_data")
+                yield "draft", {
+                    "attempt": attempt,
+                    "structured_data": draft,
+                    "html": render(draft, ("html",))["html"] if draft else None,
+                    "generation_error": update.get("generation_error"),
+                    "local_repairs": update.get("local_repairs", []),
+                }
+            if node in ("validate", "repair"):
+                yield "validation", {"attempt": attempt, **(update.get("validation") or {})}
+
+        elif mode == "messages":
+            chunk, metadata = payload
+            if metadata.get("langgraph_node") != "output_processing":
+                continue
+            buffer += _chunk_text(chunk)
+            partial = parse_partial_json(buffer) if buffer.strip() else None
+            if isinstance(partial, dict) and partial != last_partial:
+                last_partial = partial
+                yield "partial", {"attempt": attempt, "fields": partial}
+
+    final = _finalize_result(state)
+    await asyncio.to_thread(_keep_exemplar, input_json, final)
+    await _astore_cache(key, final)
+    yield "result", _render_result(final, input_json, formats)
+
+
+async def run_batch_async(
+    items: Iterable[dict], 
+    concurrency: int = BATCH_CONCURRENCY,
+    save_output: bool = False,
+    bypass_cache: bool = False,
+    budget: Optional[dict] = None,
+    formats: Optional[Iterable[str]] = None,
+) -> AsyncIterator[tuple[int, Optional[dict], Optional[str]]]:
+    """Run many listings through the pipeline with bounded concurrency.
+
+    Yields `(index, result, error)` as soon as each item finishes, so a slow listing
+    never holds back the ones behind it. Exactly one of `result` / `error` is set.
+    `budget` applies to each listing separately; `formats` as in `run_pipeline_async`.
+    """
+    formats = resolve_formats(formats)
+    # Workers share one iterator, so items are only read as capacity frees up (large generators stay lazy)
+    source = enumerate(items)
+    done: asyncio.Queue = asyncio.Queue()
+    logger.info(f"Starting batch with concurrency={concurrency}")
+
+    async def worker():
+        try:
+            for index, input_json in source:
+                try:
+                    result = await run_pipeline_async(
+                        input_json, save_output=save_output, bypass_cache=bypass_cache, budget=budget, formats=formats
+                    )
+                    await done.put((index, result, None))
+                except Exception as e:
+                    logger.exception(f"Batch item {index} failed")
+                    await done.put((index, None, str(e)))
+        except Exception:
+            logger.exception("Reading batch items failed")
+        finally:
+            done.put_nowait(None)
+
+    workers = [asyncio.create_task(worker()) for _ in range(concurrency)]
+    try:
+        running = len(workers)
+        while running:
+            item = await done.get()
+            if item is None:
+                running -= 1
+                continue
+            yield item
+    finally:
+        # Consumer went away early (e.g. client disconnected): stop the remaining work
+        for task in workers:
+            task.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+
+
 if __name__ == "__main__":
     with open("example/input_example.json", "r", encoding="utf-8") as f:
         input_json = json.load(f)
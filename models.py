@@ -1,7 +1,11 @@
-from pydantic import BaseModel, Field
+import operator
+
+from functools import lru_cache
+from pydantic import BaseModel, Field, create_model
 from typing import Literal, Type, TypedDict, Annotated, Optional
 from langgraph.graph.message import add_messages
 from utils.file_system import get_valid_prompt
+from utils.usage import merge_usage
 from llm_config.llm_config import (
     TITLE, 
     META_DESCRIPTION, 
@@ -20,6 +24,8 @@ from validation_config.valid_config import (
     VALID_WRONG_LANGUAGE,
     VALID_OTHER_INCONSISTENCIES,
     VALID_SUMMARY,
+    VALID_BATCH_INDEX,
+    VALID_BATCH_CHECKS,
     )
 
 
@@ -33,22 +39,43 @@ class SEODescription(BaseModel):
     action: str = Field(description=ACTION)
 
 
+def merge_memo(left: Optional[dict], right: Optional[dict]) -> dict:
+    return {**(left or {}), **(right or {})}
+
+
 class ValidationResult(TypedDict):
     passed: bool
     score: float
     issues: list[str]
     warnings: list[str]
-    category_scores: dict[str, float]
+    category_scores: dict[str, Optional[float]]  # None marks a layer skipped by the validation scheduler
+    failed_fields: Optional[list[str]]  # SEODescription fields behind the issues; None if not attributable
 
 
 class State(TypedDict):
     messages: Annotated[list, add_messages]
     input_json: Optional[dict]
     structured_data: Optional[dict]
-    formatted_xml: Optional[str]
     validation: Optional[ValidationResult]
     retry_count: int
     generation_error: Optional[str]
+    repair_fields: Optional[list[str]]  # set by the retry node: regenerate only these fields
+    validation_layers: Optional[dict]  # per-layer (score, issues, warnings) of the last validation; None = skipped layer
+    local_repairs: Annotated[list[str], operator.add]  # deterministic fixes applied by the repair node
+    validation_memo: Annotated[dict, merge_memo]  # layer key (layer + input + field content hash) -> layer result, per run
+    usage: Annotated[dict, merge_usage]  # {model: {calls, input_tokens, output_tokens, cached_tokens}}, summed across nodes
+    budget: Optional[dict]  # {"max_tokens": int | None, "max_cost": float | None}
+    attempts: Annotated[list[dict], operator.add]  # {attempt, score, issue_kinds} of each retried attempt (see content_retry.py)
+    best_candidate: Optional[dict]  # {attempt, structured_data, validation} with the best score among retried attempts
+
+
+@lru_cache(maxsize=None)
+def partial_description_schema(fields: tuple[str, ...]) -> type[BaseModel]:
+    """Structured-output schema with only `fields` of SEODescription (same types and descriptions)"""
+    return create_model(
+        "SEODescriptionPatch",
+        **{name: (SEODescription.model_fields[name].annotation, SEODescription.model_fields[name]) for name in fields},
+    )
 
 
 class ConsistencyCheck(BaseModel):
@@ -60,3 +87,12 @@ class ConsistencyCheck(BaseModel):
     wrong_language: bool = Field(default=False, description=VALID_WRONG_LANGUAGE)
     other_inconsistencies: list[str] = Field(default_factory=list, description=VALID_OTHER_INCONSISTENCIES)
     summary: str = Field(description=VALID_SUMMARY)
+
+
+class IndexedConsistencyCheck(ConsistencyCheck):
+    index: int = Field(description=VALID_BATCH_INDEX)
+
+
+class ConsistencyCheckBatch(BaseModel):
+    """Structured output of a batched consistency request (see content_audit.py)"""
+    checks: list[IndexedConsistencyCheck] = Field(description=VALID_BATCH_CHECKS)
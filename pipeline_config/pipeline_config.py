@@ -0,0 +1,46 @@
+BATCH_CONCURRENCY = 8  # default number of listings processed in parallel by /generate/batch
+BATCH_MAX_CONCURRENCY = 64
+
+# Content-addressed cache of pipeline results (see utils/result_cache.py)
+CACHE_ENABLED = True
+CACHE_MAX_SIZE = 1024  # entries kept in the in-memory LRU tier
+CACHE_TTL = 24 * 60 * 60  # seconds, applies to both tiers
+CACHE_DISK_PATH = None  # e.g. "cache/results.sqlite" to enable the on-disk tier
+CACHE_ONLY_PASSED = True  # failed results are not cached, so a resubmission gets a fresh attempt
+
+# Prompt files are re-read only when their mtime changes; mtime is checked at most this often (seconds)
+PROMPT_RELOAD_INTERVAL = 1.0
+
+# Per-request spend limits; None means unlimited. Requests can override both.
+DEFAULT_MAX_TOKENS = None
+DEFAULT_MAX_COST = None  # USD
+
+# Asynchronous jobs API (POST /jobs, see jobs.py)
+JOB_DB_PATH = "jobs/jobs.sqlite"  # durable queue; jobs left running by a crash are re-queued on startup
+JOB_WORKERS = 4  # pipelines run concurrently by the job worker pool
+JOB_MAX_QUEUE_DEPTH = 500  # queued jobs beyond this are refused with 429
+JOB_RETRY_AFTER = 30  # seconds, minimum Retry-After sent with 429 / 503
+JOB_POLL_INTERVAL = 1.0  # seconds an idle worker waits before checking the queue again
+JOB_WEBHOOK_TIMEOUT = 10.0  # seconds per webhook delivery attempt
+JOB_WEBHOOK_ATTEMPTS = 3
+
+# Bulk runner (bulk.py)
+BULK_SHARD_SIZE = 1000  # records per JSONL shard / HTML files per shard directory
+BULK_PROGRESS_EVERY = 100  # print progress after this many finished listings
+
+# Output rendering (content_rendering.py): only the final result is rendered, in the formats a request asks for
+DEFAULT_FORMATS = ("html",)  # any of "html", "page", "jsonld", "markdown", "json"
+DEFAULT_CURRENCY = "EUR"  # JSON-LD priceCurrency when the input listing has no "currency"
+
+# Result store (utils/result_store.py): generated HTML is written behind the request by a background thread
+RESULTS_DIR = "results"  # files go to results/<2 hex>/<2 hex>/<uuid>.html
+RESULT_INDEX_PATH = "results/index.sqlite"  # id -> input hash, language, score, timestamp, path
+RESULT_FLUSH_INTERVAL = 0.5  # seconds the writer waits to batch pending results
+RESULT_FLUSH_BATCH = 64  # results written per index transaction
+RESULT_RETRY_DELAY = 1.0  # seconds before failed writes are retried, doubled per consecutive failure
+RESULT_RETRY_MAX_DELAY = 60.0  # cap on that delay
+
+# Exemplar index (utils/exemplar_index.py): accepted outputs by language, property type, city and features
+EXEMPLAR_INDEX_PATH = "exemplars/index.npz"  # NumPy feature matrix + exemplar payloads, rewritten atomically
+EXEMPLAR_MAX_ENTRIES = 5000  # oldest exemplars are dropped beyond this
+EXEMPLAR_SAVE_INTERVAL = 30.0  # seconds between background saves of a changed index
@@ -0,0 +1,209 @@
+import asyncio
+import weakref
+import threading
+
+import httpx
+from collections import Counter
+from typing import Any, Callable, Optional
+from loguru import logger
+from langchain_openai import ChatOpenAI
+
+from llm_config.llm_config import (
+    HTTP_MAX_CONNECTIONS,
+    HTTP_MAX_KEEPALIVE_CONNECTIONS,
+    HTTP_KEEPALIVE_EXPIRY,
+)
+
+
+class LoopLocalAsyncClient(httpx.AsyncClient):
+    """AsyncClient whose requests go through one pooled client per running event loop.
+
+    httpx connections belong to the loop that opened them, while chat models keep the client
+    they were built with. Routing `send` per loop keeps one shared client valid across
+    `asyncio.run` calls (CLI batches, benchmarks); its own transport is never used.
+    """
+
+    def __init__(self, limits: httpx.Limits):
+        super().__init__(limits=limits)
+        self._pool_limits = limits
+        self._loop_clients: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+        self._loop_lock = threading.Lock()
+
+    def _client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        with self._loop_lock:
+            client = self._loop_clients.get(loop)
+            if client is None:
+                # Clients of closed loops can no longer be closed cleanly; just let them go
+                for closed in [other for other in self._loop_clients if other.is_closed()]:
+                    del self._loop_clients[closed]
+                client = httpx.AsyncClient(limits=self._pool_limits)
+                self._loop_clients[loop] = client
+            return client
+
+    def clients(self) -> list[httpx.AsyncClient]:
+        with self._loop_lock:
+            return [client for loop, client in self._loop_clients.items() if not loop.is_closed()]
+
+    async def send(self, request: httpx.Request, **kwargs) -> httpx.Response:
+        return await self._client().send(request, **kwargs)
+
+    async def aclose(self):
+        # Only the current loop's client can be closed from here
+        with self._loop_lock:
+            client = self._loop_clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.aclose()
+        await super().aclose()
+
+
+class ProcessRegistry:
+    """Process-level holder of compiled graphs and structured-output LLM clients.
+
+    Every client built here shares one keep-alive HTTP connection pool (sync and async),
+    so a generation or validation hop costs only the network round trip.
+    Structured clients are built with `include_raw=True`, so callers get the raw message
+    (and its token usage) next to the parsed object - see `utils.usage.parse_structured_response`.
+    The async pool is kept per running event loop (see LoopLocalAsyncClient).
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._graphs: dict[str, Any] = {}
+        self._chat_models: dict[tuple, ChatOpenAI] = {}
+        self._structured: dict[tuple, Any] = {}
+        self._http_client: Optional[httpx.Client] = None
+        self._http_async_client: Optional[LoopLocalAsyncClient] = None
+        self._chat_model_factory: Optional[Callable[[str, float], Any]] = None
+        self._counters = Counter()
+
+    @staticmethod
+    def _limits() -> httpx.Limits:
+        return httpx.Limits(
+            max_connections=HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+        )
+
+    @property
+    def http_client(self) -> httpx.Client:
+        with self._lock:
+            if self._http_client is None:
+                self._http_client = httpx.Client(limits=self._limits())
+            return self._http_client
+
+    @property
+    def http_async_client(self) -> LoopLocalAsyncClient:
+        with self._lock:
+            if self._http_async_client is None:
+                self._http_async_client = LoopLocalAsyncClient(self._limits())
+            return self._http_async_client
+
+    def set_chat_model_factory(self, factory: Optional[Callable[[str, float], Any]]):
+        """Replace how chat models are built, e.g. with a fake model for offline benchmarks.
+
+        `factory(model, temperature)` must return an object with `with_structured_output(schema, include_raw=...)`.
+        Passing None restores ChatOpenAI. Cached clients are dropped either way.
+        """
+        with self._lock:
+            self._chat_model_factory = factory
+            self._chat_models.clear()
+            self._structured.clear()
+
+    def get_chat_model(self, model: str, temperature: float) -> ChatOpenAI:
+        key = (model, temperature)
+        with self._lock:
+            llm = self._chat_models.get(key)
+            if llm is None and self._chat_model_factory is not None:
+                llm = self._chat_model_factory(model, temperature)
+                self._chat_models[key] = llm
+            elif llm is None:
+                llm = ChatOpenAI(
+                    model=model,
+                    temperature=temperature,
+                    http_client=self.http_client,
+                    http_async_client=self.http_async_client,
+                    # 429s and transient errors are retried by utils/rate_limiter.py, in step with the shared limiter
+                    max_retries=0,
+                )
+                self._chat_models[key] = llm
+                self._counters["chat_model_builds"] += 1
+            return llm
+
+    def get_structured_llm(self, schema: type, model: str, temperature: float):
+        key = (schema, model, temperature)
+        with self._lock:
+            structured_llm = self._structured.get(key)
+            if structured_llm is None:
+                structured_llm = self.get_chat_model(model, temperature).with_structured_output(schema, include_raw=True)
+                self._structured[key] = structured_llm
+                self._counters["structured_builds"] += 1
+                logger.info(f"Built structured LLM client: schema={schema.__name__}, model={model}, temperature={temperature}")
+            else:
+                self._counters["structured_hits"] += 1
+            return structured_llm
+
+    def get_graph(self, name: str, builder: Callable[[], Any]):
+        with self._lock:
+            graph = self._graphs.get(name)
+            if graph is None:
+                graph = builder()
+                self._graphs[name] = graph
+                self._counters["graph_compiles"] += 1
+                logger.info(f"Compiled graph '{name}'")
+            else:
+                self._counters["graph_hits"] += 1
+            return graph
+
+    def warm_up(self, graphs: dict[str, Callable[[], Any]], clients: list[tuple[type, str, float]]):
+        """Compile graphs and build clients ahead of the first request"""
+        for name, builder in graphs.items():
+            self.get_graph(name, builder)
+        for schema, model, temperature in clients:
+            self.get_structured_llm(schema, model, temperature)
+        logger.success(f"Registry warmed up: {len(self._graphs)} graphs, {len(self._structured)} structured clients")
+
+    @staticmethod
+    def _pool_snapshot(*clients) -> dict:
+        # httpx keeps the httpcore pool on its transport; both are stable but not part of the public API
+        pools = [getattr(getattr(client, "_transport", None), "_pool", None) for client in clients]
+        connections = [conn for pool in pools for conn in list(getattr(pool, "connections", []) or [])]
+        idle = sum(1 for conn in connections if conn.is_idle())
+        return {
+            "connections": len(connections),
+            "idle": idle,
+            "active": len(connections) - idle,
+        }
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "graphs": sorted(self._graphs),
+                "structured_clients": [
+                    {"schema": schema.__name__, "model": model, "temperature": temperature}
+                    for schema, model, temperature in self._structured
+                ],
+                "counters": dict(self._counters),
+                "pool": {
+                    "max_connections": HTTP_MAX_CONNECTIONS,
+                    "max_keepalive_connections": HTTP_MAX_KEEPALIVE_CONNECTIONS,
+                    "keepalive_expiry": HTTP_KEEPALIVE_EXPIRY,
+                    "sync": self._pool_snapshot(self._http_client) if self._http_client else None,
+                    "async": self._pool_snapshot(*self._http_async_client.clients()) if self._http_async_client else None,
+                },
+            }
+
+    async def aclose(self):
+        with self._lock:
+            http_client, self._http_client = self._http_client, None
+            http_async_client, self._http_async_client = self._http_async_client, None
+            self._chat_models.clear()
+            self._structured.clear()
+
+        if http_client is not None:
+            http_client.close()
+        if http_async_client is not None:
+            await http_async_client.aclose()
+
+
+registry = ProcessRegistry()
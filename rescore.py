@@ -0,0 +1,139 @@
+"""Re-score archived outputs with the current QualityValidator thresholds, without LLM calls.
+
+Reads JSONL records holding generated content: bulk.py shards (`key`, `structured_data`,
+`validation`) or one SEODescription object per line. Input listings (for language and
+location checks) come from the record's `input_json`, or from `--inputs` matched by key.
+Writes one line per record with the new verdict and prints how many verdicts changed.
+
+    python rescore.py results/bulk/shard-*.jsonl --inputs inventory.jsonl --output rescored.jsonl
+    python rescore.py archive.jsonl --consistency   # also re-run the LLM consistency layer
+    python rescore.py archive.jsonl --consistency --consistency-backend openai-batch
+"""
+import os
+import sys
+import json
+import time
+import argparse
+
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, Iterator, Optional
+from loguru import logger
+
+from content_audit import BACKENDS
+from content_validation import QualityValidator
+from validation_config.valid_config import RESCORE_WORKERS, RESCORE_CHUNK_SIZE, CONSISTENCY_BACKEND
+
+
+def iter_records(paths: Iterable[str]) -> Iterator[tuple[str, dict, dict, Optional[dict]]]:
+    """Yields `(key, content, input_json, previous_validation)` for every readable record"""
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as f:
+            for line_no, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    logger.warning(f"{path}:{line_no}: invalid JSON, skipped")
+                    continue
+                content = record.get("structured_data") if "structured_data" in record else record
+                if not isinstance(content, dict):
+                    continue  # failed generation, nothing to score
+                key = str(record.get("key") or record.get("id") or f"{path}:{line_no}")
+                yield key, content, record.get("input_json") or {}, record.get("validation")
+
+
+def load_inputs(path: str) -> dict[str, dict]:
+    from bulk import iter_inputs  # same keys as the bulk runner's checkpoint
+
+    return {key: input_json for key, input_json, error in iter_inputs(path) if error is None}
+
+
+def rescore(
+    paths: list[str],
+    output: Optional[str] = None,
+    inputs: Optional[dict[str, dict]] = None,
+    consistency: bool = False,
+    consistency_backend: Optional[str] = None,
+    workers: Optional[int] = RESCORE_WORKERS,
+    chunk_size: int = RESCORE_CHUNK_SIZE,
+) -> dict:
+    inputs = inputs or {}
+    stats = {"records": 0, "passed": 0, "score_sum": 0.0, "newly_passed": 0, "newly_failed": 0}
+    out = open(output, "w", encoding="utf-8") if output else None
+    # Records are read and scored in blocks, so memory stays flat on archives of any size
+    block = chunk_size * (workers or 1) * 4
+    started = time.perf_counter()
+
+    def flush(batch: list, pool):
+        validations = QualityValidator.validate_batch(
+            [content for _, content, _, _ in batch],
+            [input_json for _, _, input_json, _ in batch],
+            consistency=consistency, consistency_backend=consistency_backend, chunk_size=chunk_size, executor=pool,
+        )
+        for (key, _, _, previous), validation in zip(batch, validations):
+            stats["records"] += 1
+            stats["passed"] += validation["passed"]
+            stats["score_sum"] += validation["score"]
+            was = (previous or {}).get("passed")
+            if was is not None and was != validation["passed"]:
+                stats["newly_passed" if validation["passed"] else "newly_failed"] += 1
+            if out is not None:
+                out.write(json.dumps({"key": key, "previous_passed": was, **validation}, ensure_ascii=False) + "\n")
+
+    pool = ProcessPoolExecutor(max_workers=workers) if (workers or os.cpu_count() or 1) > 1 else None
+    try:
+        batch = []
+        for key, content, input_json, previous in iter_records(paths):
+            batch.append((key, content, input_json or inputs.get(key, {}), previous))
+            if len(batch) >= block:
+                flush(batch, pool)
+                batch = []
+        if batch:
+            flush(batch, pool)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+        if out is not None:
+            out.close()
+
+    stats["elapsed"] = time.perf_counter() - started
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("paths", nargs="+", help="JSONL files of generated content")
+    parser.add_argument("--inputs", help="JSONL file or directory of the input listings (matched by key)")
+    parser.add_argument("--output", help="write one JSONL line per record here")
+    parser.add_argument("--consistency", action="store_true", help="also run the LLM consistency layer")
+    parser.add_argument(
+        "--consistency-backend", choices=sorted(BACKENDS), default=CONSISTENCY_BACKEND,
+        help="single: one call per record; inline: several records per call; openai-batch: Batch API file; local: offline stand-in",
+    )
+    parser.add_argument("--workers", type=int, default=RESCORE_WORKERS, help="processes (default: one per CPU)")
+    parser.add_argument("--chunk-size", type=int, default=RESCORE_CHUNK_SIZE)
+    args = parser.parse_args()
+
+    logger.remove(0)
+    logger.add(sys.stderr, level="WARNING")
+
+    stats = rescore(
+        args.paths,
+        output=args.output,
+        inputs=load_inputs(args.inputs) if args.inputs else None,
+        consistency=args.consistency,
+        consistency_backend=args.consistency_backend,
+        workers=args.workers,
+        chunk_size=args.chunk_size,
+    )
+    records = stats["records"]
+    print(
+        f"[rescore] {records} records in {stats['elapsed']:.1f}s ({records / max(stats['elapsed'], 1e-9):.0f}/s): "
+        f"pass rate {stats['passed'] / max(records, 1):.1%}, mean score {stats['score_sum'] / max(records, 1):.3f}, "
+        f"{stats['newly_passed']} newly passing, {stats['newly_failed']} newly failing"
+    )
+
+
+if __name__ == "__main__":
+    main()
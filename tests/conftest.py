@@ -0,0 +1,30 @@
+import json
+
+import pytest
+
+from benchmarks.fake_models import FakeModelConfig, fake_factory
+from registry import registry
+from utils.exemplar_index import exemplar_index
+from utils.rate_limiter import rate_limiter
+
+
+@pytest.fixture
+def fake_llm(monkeypatch, tmp_path):
+    """Pipeline runs against the offline fakes of benchmarks/fake_models.py, uncached, with a throwaway exemplar index"""
+    import main
+
+    monkeypatch.setattr(main, "CACHE_ENABLED", False)
+    limits, path = rate_limiter.limits, exemplar_index.path
+    registry.set_chat_model_factory(fake_factory(FakeModelConfig()))
+    rate_limiter.configure({})
+    exemplar_index.clear(path=str(tmp_path / "exemplars.npz"))
+    yield
+    exemplar_index.clear(path=path)
+    rate_limiter.configure(limits)
+    registry.set_chat_model_factory(None)
+
+
+@pytest.fixture
+def listing() -> dict:
+    with open("example/input_case1.json", encoding="utf-8") as f:
+        return json.load(f)
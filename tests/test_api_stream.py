@@ -0,0 +1,36 @@
+import json
+
+from fastapi.testclient import TestClient
+
+from api import app
+
+
+def _events(resp) -> list[tuple[str, dict]]:
+    """(event, data) pairs, parsed the way ui.iter_sse reads them"""
+    events, event, data = [], "message", []
+    for line in resp.iter_lines():
+        if not line:
+            if data:
+                events.append((event, json.loads("\n".join(data))))
+            event, data = "message", []
+        elif line.startswith("event:"):
+            event = line[6:].strip()
+        elif line.startswith("data:"):
+            data.append(line[5:].strip())
+    return events
+
+
+def test_stream_reports_progress_then_result(fake_llm, listing):
+    client = TestClient(app)
+    with client.stream("POST", "/generate/stream", json={"input_json": listing}) as resp:
+        assert resp.status_code == 200
+        assert resp.headers["content-type"].startswith("text/event-stream")
+        events = _events(resp)
+
+    names = [event for event, _ in events]
+    assert names[0] == "node_start" and names[-1] == "result"
+    assert {"node_end", "draft", "validation"} <= set(names)
+    attempts = [data["attempt"] for event, data in events if event == "node_start"]
+    assert attempts == sorted(attempts) and attempts[0] == 1
+    result = events[-1][1]
+    assert result["formatted_data"] and result["validation"]["score"] > 0
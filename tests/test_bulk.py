@@ -0,0 +1,48 @@
+import asyncio
+import glob
+import json
+
+from bulk import CHECKPOINT_FILE, Checkpoint, run_bulk
+
+
+def _inventory(tmp_path) -> str:
+    listings = [json.load(open(path, encoding="utf-8")) for path in sorted(glob.glob("example/input_case[0-9].json"))]
+    lines = [json.dumps({**listing, "id": f"listing-{i}"}) for i, listing in enumerate(listings)]
+    path = tmp_path / "inventory.jsonl"
+    path.write_text("\n".join(lines[:2] + ["{not json"] + lines[2:]) + "\n", encoding="utf-8")
+    return str(path)
+
+
+def _records(output_dir) -> list[dict]:
+    return [json.loads(line) for path in sorted(output_dir.glob("shard-*.jsonl")) for line in path.read_text().splitlines()]
+
+
+def test_interrupted_run_resumes_without_regenerating(fake_llm, tmp_path):
+    inventory, output = _inventory(tmp_path), tmp_path / "out"
+    total = len(glob.glob("example/input_case[0-9].json"))
+
+    # The first run stops after 2 listings, as if interrupted
+    first = asyncio.run(run_bulk(inventory, str(output), limit=2, shard_size=2))
+    assert (first["done"], first["failed"]) == (2, 0)
+    with open(output / CHECKPOINT_FILE, "a", encoding="utf-8") as f:
+        f.write('{"key": "listing-')  # torn last line of a crash
+
+    second = asyncio.run(run_bulk(inventory, str(output), shard_size=2))
+    assert (second["done"], second["failed"], second["skipped"]) == (total - 2, 1, 2)  # the broken line fails
+
+    third = asyncio.run(run_bulk(inventory, str(output), shard_size=2))
+    assert (third["done"], third["skipped"]) == (0, total + 1)  # failed lines are not run again either
+
+    records = _records(output)
+    assert sorted(r["key"] for r in records) == [f"listing-{i}" for i in range(total)]
+    assert all(r["structured_data"] and r["html"] for r in records)
+    checkpoint = Checkpoint(str(output / CHECKPOINT_FILE))
+    checkpoint.close()
+    assert len(checkpoint.done) == total and len(checkpoint.failed) == 1
+
+
+def test_failed_listings_run_again_on_request(fake_llm, tmp_path):
+    inventory, output = _inventory(tmp_path), tmp_path / "out"
+    asyncio.run(run_bulk(inventory, str(output)))
+    again = asyncio.run(run_bulk(inventory, str(output), retry_failed=True))
+    assert (again["done"], again["failed"]) == (0, 1)
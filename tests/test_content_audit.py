@@ -0,0 +1,37 @@
+import pytest
+
+from benchmarks.bench_rescore import build_archive
+from content_audit import BatchFileBackend, ConsistencyBackend, LocalBatchBackend, SingleBackend
+from utils.usage import summarize_usage, track_usage
+from validation_config.valid_config import VALID_MODEL
+
+
+def _pairs(count: int) -> list[tuple[dict, dict]]:
+    results, input_jsons = build_archive("example/input_case*.json", count, seed=1)
+    return [(result.model_dump(), input_json) for result, input_json in zip(results, input_jsons)]
+
+
+@pytest.mark.parametrize("backend", [ConsistencyBackend, BatchFileBackend])
+def test_incomplete_backends_fail_on_construction(backend):
+    with pytest.raises(TypeError):
+        backend()
+
+
+def test_local_batch_round_trip_matches_single_checks(fake_llm, tmp_path):
+    pairs = _pairs(7)
+    with track_usage() as batched:
+        checks = LocalBatchBackend(batch_size=3, workdir=str(tmp_path)).check(pairs)
+    assert [check.is_consistent for check in checks] == [check.is_consistent for check in SingleBackend().check(pairs)]
+    # One request per group of up to 3 listings, each answered in the output file
+    (requests,) = tmp_path.glob("*.requests.jsonl")
+    (output,) = tmp_path.glob("*.output.jsonl")
+    assert len(requests.read_text().splitlines()) == len(output.read_text().splitlines()) == 3
+    usage = summarize_usage(batched.usage)
+    assert usage["calls"] == 3 and set(usage["by_model"]) == {f"{VALID_MODEL}:batch"}
+
+
+def test_batch_usage_is_priced_at_the_batch_rate():
+    counts = {"calls": 1, "input_tokens": 10_000, "output_tokens": 1_000, "cached_tokens": 0}
+    usage = summarize_usage({VALID_MODEL: counts, f"{VALID_MODEL}:batch": counts})
+    by_model = usage["by_model"]
+    assert by_model[f"{VALID_MODEL}:batch"]["cost_usd"] == pytest.approx(by_model[VALID_MODEL]["cost_usd"] / 2)
@@ -0,0 +1,111 @@
+import pytest
+
+from content_facts import check_facts, fact_hints, split_facts
+from content_validation import LLMConsistencyValidator, QualityValidator
+from models import ConsistencyCheck
+
+LISTING = {
+    "title": "Apartment in Lisbon",
+    "location": {"city": "Lisbon", "neighborhood": "Campo de Ourique"},
+    "features": {
+        "bedrooms": 3,
+        "bathrooms": 2,
+        "area_sqm": 120,
+        "balcony": True,
+        "parking": False,
+        "elevator": True,
+        "floor": 2,
+        "year_built": 2005,
+    },
+    "price": 650000,
+    "listing_type": "sale",
+    "language": "en",
+}
+
+
+def _content(text: str) -> dict:
+    return {
+        "title": "Apartment for sale in Campo de Ourique",
+        "meta_description": "",
+        "headline": "",
+        "full_description": text,
+        "key_features": [],
+        "summary": "",
+        "action": "",
+    }
+
+
+@pytest.mark.parametrize("text", [
+    "Condominium fees are 80 euros per month.",
+    "Public parking garage nearby for visitors.",
+    "The apartment is close to the T2 metro line.",
+    "It has two bathrooms and a 10 m² balcony.",
+    "A bright 120 m² apartment with three bedrooms, one of them en suite.",
+    "There is no private garage, but the building has an elevator.",
+    "Living area of 120 m² on the second floor, built in 2005.",
+])
+def test_correct_text_passes(text):
+    assert check_facts(_content(text), LISTING) is None
+
+
+@pytest.mark.parametrize("text, category", [
+    ("A bright apartment with 4 bedrooms.", "incorrect_numbers"),
+    ("Three bathrooms and a large kitchen.", "incorrect_numbers"),
+    ("A spacious 95 m² apartment.", "incorrect_numbers"),
+    ("Living area of 150 m² with a 10 m² balcony.", "incorrect_numbers"),
+    ("Located on the 5th floor.", "incorrect_numbers"),
+    ("Built in 1990 and renovated since.", "incorrect_numbers"),
+    ("Comes with a private garage.", "fabricated_features"),
+    ("Includes an underground parking space.", "fabricated_features"),
+])
+def test_contradiction_is_flagged(text, category):
+    check = check_facts(_content(text), LISTING)
+    assert check is not None and not check.is_consistent
+    assert getattr(check, category)
+
+
+def test_wrong_listing_type_is_flagged():
+    content = {**_content("Spacious apartment available for rent."), "title": "Apartment in Campo de Ourique"}
+    check = check_facts(content, LISTING)
+    assert check is not None and check.wrong_listing_type
+
+
+def test_portuguese_typology():
+    listing = {**LISTING, "language": "pt"}
+    content = {**_content("Apartamento T4 com varanda, no 2º andar."), "title": "Apartamento T4 à venda"}
+    check = check_facts(content, listing)
+    assert check is not None and any("bedrooms=4" in n for n in check.incorrect_numbers)
+
+
+def test_hints_list_each_finding():
+    hints = fact_hints(_content("A bright apartment with 4 bedrooms and a private garage."), LISTING)
+    assert len(hints) == 2
+    assert fact_hints(_content("A bright apartment with three bedrooms."), LISTING) == []
+
+
+@pytest.mark.parametrize("text, certain", [
+    ("A bright apartment with 4 bedrooms.", True),
+    ("A spacious 95 m² apartment.", True),
+    ("Spacious apartment available for rent.", True),
+    ("Comes with a private garage.", False),
+    ("Located on the 5th floor.", False),
+])
+def test_only_certain_findings_are_decided_by_the_rules(text, certain):
+    content = {**_content(text), "title": "Apartment in Campo de Ourique"}
+    check, hints = split_facts(content, LISTING)
+    assert (check is not None) is certain
+    assert bool(hints) is not certain
+
+
+def test_verdict_mode_calls_the_llm_only_when_the_rules_cannot_decide(monkeypatch):
+    calls = []
+
+    def validate(self, result, input_json, hints=()):
+        calls.append(list(hints))
+        return ConsistencyCheck(is_consistent=True, summary="All consistent")
+
+    monkeypatch.setattr(LLMConsistencyValidator, "validate", validate)
+    _, issues, _ = QualityValidator.check_content_vs_json(_content("A bright apartment with 4 bedrooms."), LISTING)
+    assert issues and not calls
+    QualityValidator.check_content_vs_json(_content("A lift takes you up to the private garage."), LISTING)
+    assert calls == [["mentions parking but JSON has parking=false"]]
@@ -0,0 +1,54 @@
+import pytest
+
+from content_repair import _prepare, should_repair
+from content_validation import _failed_fields
+from models import SEODescription
+
+INPUT = {
+    "title": "Apartment in Lisbon",
+    "location": {"city": "Lisbon", "neighborhood": "Campo de Ourique"},
+    "features": {"bedrooms": 3, "bathrooms": 2, "area_sqm": 120, "balcony": True, "parking": False},
+    "listing_type": "sale",
+    "language": "en",
+}
+CLEAN = (1.0, [], [])
+
+
+def _state(last_feature: str, consistency=CLEAN) -> dict:
+    # Six key features: the repair trims the last one
+    candidate = SEODescription(
+        title="Apartment for sale in Campo de Ourique, Lisbon",
+        meta_description="Three-bedroom apartment for sale in Campo de Ourique, Lisbon.",
+        headline="Apartment for sale in Campo de Ourique",
+        full_description="This apartment for sale in Campo de Ourique has three bedrooms and two bathrooms. " * 7,
+        key_features=["Three bedrooms", "Two bathrooms", "120 m² apartment", "Central location", "Near transport", last_feature],
+        summary="A three-bedroom apartment in Lisbon.",
+        action="Contact us today to schedule a visit.",
+    )
+    layers = {"structural": (0.8, ["Key features amount 6"], []), "linguistic": CLEAN, "seo": CLEAN, "json_consistency": consistency}
+    return {"structured_data": candidate.model_dump(), "input_json": INPUT, "retry_count": 0, "validation_layers": layers}
+
+
+@pytest.mark.parametrize("last_feature, consistency, carried", [
+    ("Quiet street", CLEAN, True),
+    ("Private balcony", CLEAN, False),  # the only balcony mention is trimmed: a missing feature goes unchecked
+    ("Quiet street", (0.9, [], ["Missing important feature: parking"]), True),  # the trim has nothing to do with it
+    ("Rooftop garden", (0.9, [], ["Inconsistency: mentions a rooftop garden"]), False),  # the flagged text is gone
+])
+def test_consistency_verdict_carried_over_only_when_safe(last_feature, consistency, carried):
+    repaired, fixes, scheduler, _ = _prepare(_state(last_feature, consistency))
+    assert fixes == {"key_features": ["trim"]}
+    assert ("json_consistency" in scheduler.reuse) is carried
+
+
+@pytest.mark.parametrize("title, issues, route", [
+    # A 6th key feature is only a warning: trimming it cannot save the candidate from its critical issue
+    ("Apartment for sale in Campo de Ourique, Lisbon", ["Fabricated feature: mentions a garden"], "retry"),
+    ("Apartment for sale in Campo de Ourique, Lisbon, close to shops, parks and the tram", ["Title too long: 79/60 chars"], "repair"),
+])
+def test_repair_only_when_it_fixes_every_failed_field(title, issues, route):
+    state = _state("Quiet street")
+    state["structured_data"]["title"] = title
+    state["validation"] = {"passed": False, "score": 0.6, "issues": issues, "failed_fields": _failed_fields(issues)}
+    state["attempts"], state["usage"], state["budget"] = [], {}, None
+    assert should_repair(state) == route
@@ -0,0 +1,45 @@
+from content_retry import best_candidate, classify_issue, select_result, stop_reason
+
+
+def _validation(score: float, issues=(), consistency=0.5) -> dict:
+    return {
+        "passed": False,
+        "score": score,
+        "issues": list(issues),
+        "category_scores": {"structural": 1.0, "linguistic": 1.0, "seo": 1.0, "json_consistency": consistency},
+    }
+
+
+def test_unchecked_candidate_ranks_below_fully_validated():
+    state = {
+        "retry_count": 1,
+        "structured_data": {"title": "checked"},
+        "validation": _validation(0.6, ["Incorrect number: x"]),
+        "best_candidate": {
+            "attempt": 0,
+            "structured_data": {"title": "unchecked"},
+            "validation": _validation(0.9, ["Title too long: 70/60 chars"], consistency=None),
+        },
+    }
+    assert best_candidate(state)["attempt"] == 1
+
+
+def test_earlier_better_candidate_is_returned():
+    state = {
+        "retry_count": 2,
+        "structured_data": {"title": "last"},
+        "validation": _validation(0.6, ["Title too long: 70/60 chars"]),
+        "attempts": [
+            {"attempt": 0, "score": 0.8, "issue_kinds": ["incorrect_number"]},
+            {"attempt": 1, "score": 0.7, "issue_kinds": ["repetition"]},
+        ],
+        "best_candidate": {"attempt": 0, "structured_data": {"title": "first"}, "validation": _validation(0.8, ["Incorrect number: x"])},
+    }
+    assert stop_reason(state) == "plateau"
+    assert select_result(state)["structured_data"] == {"title": "first"}
+
+
+def test_unfixable_issues_stop_at_once():
+    state = {"retry_count": 0, "structured_data": None, "validation": _validation(0.0, ["Validation error: boom"])}
+    assert stop_reason(state) == "unfixable"
+    assert not classify_issue("Generation error: Error code: 400 - bad request").fixable
@@ -0,0 +1,52 @@
+import pytest
+
+from utils.exemplar_index import ExemplarIndex
+from utils.prompt_registry import prompt_registry
+
+PASSED = {"passed": True, "score": 0.95}
+
+
+def _listing(bedrooms: int, city: str = "Lisbon", language: str = "en") -> dict:
+    return {
+        "title": f"Apartment in {city}",
+        "location": {"city": city},
+        "features": {"bedrooms": bedrooms, "bathrooms": 1, "area_sqm": 40 + 30 * bedrooms},
+        "listing_type": "sale",
+        "language": language,
+    }
+
+
+@pytest.fixture
+def index(tmp_path):
+    index = ExemplarIndex(str(tmp_path / "exemplars.npz"), max_entries=10, save_interval=3600, enabled=True)
+    yield index
+    index.close()
+
+
+def test_nearest_same_language_exemplars_first(index):
+    for bedrooms in (1, 2, 4):
+        assert index.add(_listing(bedrooms), {"title": f"{bedrooms} bedrooms"}, PASSED)
+    index.add(_listing(2, language="pt"), {"title": "T2"}, PASSED)
+    assert not index.add(_listing(3), {"title": "failed"}, {"passed": False, "score": 0.99})
+
+    nearest = index.nearest(_listing(2), k=5, max_distance=100.0)
+    # The listing itself is never its own exemplar, and Portuguese ones do not help an English prompt
+    assert [e["output"]["title"] for e in nearest] == ["1 bedrooms", "4 bedrooms"]
+
+
+def test_saved_index_is_loaded_again(index, tmp_path):
+    index.add(_listing(1), {"title": "one"}, PASSED)
+    index.close()
+    reopened = ExemplarIndex(index.path, save_interval=3600, enabled=True)
+    try:
+        assert [e["output"]["title"] for e in reopened.nearest(_listing(2), max_distance=100.0)] == ["one"]
+    finally:
+        reopened.close()
+
+
+def test_prompts_are_not_memoized_per_neighbour_set(index):
+    variants = prompt_registry.stats()["prompts"].get("exemplars", {}).get("formatted_variants", 0)
+    for bedrooms in range(1, 6):
+        index.add(_listing(bedrooms), {"title": f"{bedrooms} bedrooms"}, PASSED)
+        assert "bedrooms" in index.prompt(_listing(bedrooms + 1))
+    assert prompt_registry.stats()["prompts"]["exemplars"]["formatted_variants"] == variants
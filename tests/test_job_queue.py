@@ -0,0 +1,20 @@
+from utils.job_queue import JobQueue
+
+INPUT = {"title": "Apartment in Lisbon", "language": "en"}
+
+
+def test_deduplicated_submission_keeps_its_webhook(tmp_path):
+    queue = JobQueue(str(tmp_path / "jobs.sqlite"))
+    job_id, created = queue.submit(INPUT, {}, "https://a.example/hook", "key")
+    assert created
+    assert queue.submit(INPUT, {}, "https://b.example/hook", "key") == (job_id, False)
+    assert queue.find_pending("key", {}, "https://c.example/hook") == job_id
+    queue.submit(INPUT, {}, "https://a.example/hook", "key")
+    queue.submit(INPUT, {}, None, "key")
+    assert queue.webhooks(job_id) == ["https://a.example/hook", "https://b.example/hook", "https://c.example/hook"]
+
+    # Once the job is done, an identical submission starts a new one with its own webhook
+    queue.finish(job_id, {"final_description": "text"})
+    new_id, created = queue.submit(INPUT, {}, "https://d.example/hook", "key")
+    assert created and queue.webhooks(new_id) == ["https://d.example/hook"]
+    queue.close()
@@ -0,0 +1,7 @@
+from utils.metrics import Counter
+
+
+def test_label_values_are_escaped():
+    counter = Counter("test_total", "Test counter", ["language"])
+    counter.inc(language='x"y\\z\nw')
+    assert counter.render()[-1] == 'test_total{language="x\\"y\\\\z\\nw"} 1.0'
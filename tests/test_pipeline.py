@@ -0,0 +1,36 @@
+import asyncio
+import threading
+
+import main
+from utils.exemplar_index import exemplar_index
+
+
+def _record_threads(monkeypatch) -> list[str]:
+    threads = []
+    add = exemplar_index.add
+
+    def recording_add(*args):
+        threads.append(threading.current_thread().name)
+        return add(*args)
+
+    monkeypatch.setattr(exemplar_index, "add", recording_add)
+    return threads
+
+
+def test_async_paths_keep_exemplars_off_the_event_loop(fake_llm, listing, monkeypatch):
+    threads = _record_threads(monkeypatch)
+
+    async def run():
+        result = await main.run_pipeline_async(listing)
+        events = [event async for event, _ in main.stream_pipeline(listing)]
+        return result, events
+
+    result, events = asyncio.run(run())
+    assert result["struct_data"] and events[-1] == "result"
+    assert len(threads) == 2 and threading.main_thread().name not in threads
+
+
+def test_sync_path_keeps_exemplars(fake_llm, listing, monkeypatch):
+    threads = _record_threads(monkeypatch)
+    assert main.run_pipeline(listing)["struct_data"]
+    assert threads == [threading.main_thread().name]
@@ -0,0 +1,51 @@
+import asyncio
+
+import httpx
+import pytest
+from openai import APIConnectionError, BadRequestError
+
+from utils.rate_limiter import RateLimiter
+
+MODEL = "test-model"
+REQUEST = httpx.Request("POST", "https://api.openai.com/v1/chat/completions")
+
+
+class FailingRunnable:
+    def __init__(self, error: Exception):
+        self.error = error
+        self.calls = 0
+
+    def invoke(self, messages, config=None):
+        self.calls += 1
+        raise self.error
+
+    async def ainvoke(self, messages, config=None):
+        return self.invoke(messages, config)
+
+
+def _limiter(monkeypatch) -> RateLimiter:
+    monkeypatch.setattr("utils.rate_limiter._backoff", lambda error, attempt: 0.0)
+    return RateLimiter({MODEL: {"rpm": 6000, "tpm": 600000}})
+
+
+def _level(limiter: RateLimiter) -> float:
+    return limiter.get(MODEL).tokens._level
+
+
+@pytest.mark.parametrize("is_async", [False, True])
+@pytest.mark.parametrize("error", [
+    APIConnectionError(request=REQUEST),
+    BadRequestError("bad request", response=httpx.Response(400, request=REQUEST), body=None),
+])
+def test_failed_attempts_refund_their_reservation(monkeypatch, error, is_async):
+    limiter = _limiter(monkeypatch)
+    full = _level(limiter)
+    runnable = FailingRunnable(error)
+    with pytest.raises(type(error)):
+        if is_async:
+            asyncio.run(limiter.ainvoke(runnable, [("user", "x" * 4000)], MODEL, "generator"))
+        else:
+            limiter.invoke(runnable, [("user", "x" * 4000)], MODEL, "generator")
+    # Only refill rounding is left, however many attempts were made
+    assert _level(limiter) == pytest.approx(full, abs=1.0)
+    assert runnable.calls >= 1
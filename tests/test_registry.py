@@ -0,0 +1,41 @@
+import asyncio
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+import pytest
+
+from registry import LoopLocalAsyncClient
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, so pooled connections outlive a request
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"ok")
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def url():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}/"
+    server.shutdown()
+    server.server_close()
+
+
+def test_shared_client_survives_successive_event_loops(url):
+    client = LoopLocalAsyncClient(httpx.Limits(max_keepalive_connections=5))
+
+    async def get():
+        return (await client.get(url)).text
+
+    # One asyncio.run per concurrency level, as in benchmarks/bench_pipeline.py
+    assert [asyncio.run(get()) for _ in range(3)] == ["ok"] * 3
+    assert client.clients() == []  # pools of finished loops are not reported
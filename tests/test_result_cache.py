@@ -0,0 +1,30 @@
+import asyncio
+
+import pytest
+
+from utils.result_cache import ResultCache
+
+RESULT = {"final_description": "text", "validation": {"score": 0.9, "issues": []}, "struct_data": {"key_features": ["a"]}}
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ResultCache(max_size=1, ttl=60, disk_path=str(tmp_path / "cache.sqlite"))
+
+
+def test_mutating_a_hit_does_not_change_later_hits(cache):
+    cache.set("k", RESULT)
+    hit = cache.get("k")
+    hit["validation"]["issues"].append("changed")
+    hit["struct_data"]["key_features"].clear()
+    assert cache.get("k") == RESULT
+
+
+def test_async_access_reaches_the_disk_tier(cache):
+    async def roundtrip():
+        await cache.aset("a", RESULT)
+        await cache.aset("b", {"final_description": "other"})  # evicts "a" from memory
+        return await cache.aget("a"), await cache.aget("missing")
+
+    assert asyncio.run(roundtrip()) == (RESULT, None)
+    assert cache.stats()["disk_hits"] == 1
@@ -0,0 +1,89 @@
+import sqlite3
+import time
+
+import pytest
+
+from utils.result_store import ResultStore
+
+INPUT = {"title": "Apartment in Lisbon", "language": "en"}
+
+
+class FlakyIndex:
+    """Delegates to the real index connection; the first `executemany` fails"""
+
+    def __init__(self, db: sqlite3.Connection):
+        self.db = db
+        self.failures = 1
+
+    def executemany(self, *args):
+        if self.failures:
+            self.failures -= 1
+            raise sqlite3.OperationalError("database is locked")
+        return self.db.executemany(*args)
+
+    def __getattr__(self, name):
+        return getattr(self.db, name)
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.setattr("utils.result_store.RESULT_RETRY_DELAY", 0.2)
+    store = ResultStore(str(tmp_path / "results"), str(tmp_path / "results" / "index.sqlite"), flush_interval=0.01)
+    yield store
+    store.close()
+
+
+def _wait_flushed(store: ResultStore, timeout: float = 5.0):
+    deadline = time.monotonic() + timeout
+    while store.stats()["pending"] and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+def test_failed_file_write_is_retried_after_a_backoff(store, monkeypatch):
+    write_file, calls = store._write_file, []
+
+    def flaky_write(path, html):
+        calls.append(time.monotonic())
+        if len(calls) <= 2:
+            raise OSError("No space left on device")
+        write_file(path, html)
+
+    monkeypatch.setattr(store, "_write_file", flaky_write)
+    entry = store.save("<p>x</p>", INPUT)
+    _wait_flushed(store)
+    assert store.get(entry["id"])["flushed"]
+    assert len(calls) == 3
+    assert calls[1] - calls[0] >= 0.2 and calls[2] - calls[1] >= 0.4  # no tight loop: the delay doubles
+    assert store.stats()["failed"] == 2
+
+
+def test_failed_index_write_is_retried(store):
+    first = store.save("<p>a</p>", INPUT)
+    _wait_flushed(store)
+    with store._lock:
+        store._db = FlakyIndex(store._db)
+    second = store.save("<p>b</p>", INPUT)
+    _wait_flushed(store)
+    assert store.get(first["id"])["flushed"] and store.get(second["id"])["html"] == "<p>b</p>"
+    assert store.get(second["id"])["flushed"]
+    assert store.stats()["failed"] == 1
+
+
+def test_close_retries_failed_writes_without_waiting_for_the_backoff(store, monkeypatch):
+    monkeypatch.setattr("utils.result_store.RESULT_RETRY_DELAY", 60.0)
+    write_file, calls = store._write_file, []
+
+    def flaky_write(path, html):
+        calls.append(path)
+        if len(calls) == 1:
+            raise OSError("Resource temporarily unavailable")
+        write_file(path, html)
+
+    monkeypatch.setattr(store, "_write_file", flaky_write)
+    entry = store.save("<p>x</p>", INPUT)
+    deadline = time.monotonic() + 5.0
+    while not store.stats()["failed"] and time.monotonic() < deadline:
+        time.sleep(0.01)
+    store.close()
+    assert store.stats()["pending"] == 0
+    assert store.get(entry["id"])["html"] == "<p>x</p>"
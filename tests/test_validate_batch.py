@@ -0,0 +1,37 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from benchmarks.bench_rescore import build_archive, per_object
+from content_validation import QualityValidator, _combine_layers
+
+
+@pytest.fixture(scope="module")
+def archive():
+    # Includes defective and mechanically broken candidates, so issues and warnings are exercised
+    return build_archive("example/input_case*.json", 60, seed=3)
+
+
+@pytest.fixture(scope="module")
+def expected(archive):
+    return [_combine_layers(layers) for layers in per_object(*archive)]
+
+
+def test_serial_batch_matches_per_object_validation(archive, expected):
+    results, input_jsons = archive
+    assert QualityValidator.validate_batch(results, input_jsons, workers=1) == expected
+
+
+def test_chunked_batch_matches_per_object_validation(archive, expected):
+    results, input_jsons = archive
+    rows = [result.model_dump() for result in results]
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        validations = QualityValidator.validate_batch(rows, input_jsons, chunk_size=7, executor=executor)
+    assert validations == expected
+    assert any(validation["issues"] for validation in validations)
+
+
+def test_mismatched_lengths_are_rejected(archive):
+    results, input_jsons = archive
+    with pytest.raises(ValueError):
+        QualityValidator.validate_batch(results, input_jsons[:-1])
@@ -0,0 +1,87 @@
+import asyncio
+import threading
+
+import pytest
+
+from content_validation import QualityValidator, ValidationScheduler
+from llm_config.llm_config import MODEL
+from models import SEODescription
+
+INPUT = {"title": "Apartment in Lisbon", "location": {"city": "Lisbon"}, "features": {"bedrooms": 2}, "listing_type": "sale", "language": "en"}
+# Title over the limit: a critical issue from the structural layer alone
+RESULT = SEODescription(
+    title="A very long title for an apartment in Lisbon that goes well past the limit",
+    meta_description="Apartment for sale in Lisbon with two bedrooms, close to shops and transport links.",
+    headline="Apartment for sale in Lisbon",
+    full_description="This apartment for sale in Lisbon has two bedrooms. " * 12,
+    key_features=["Two bedrooms", "Central location", "Near transport"],
+    summary="A two-bedroom apartment in Lisbon.",
+    action="Contact us today to schedule a visit.",
+)
+CONSISTENT = (1.0, [], [])
+
+
+@pytest.fixture
+def consistency_calls(monkeypatch):
+    calls = []
+
+    def check(result, input_json):
+        calls.append(result)
+        return CONSISTENT
+
+    async def acheck(result, input_json):
+        return check(result, input_json)
+
+    monkeypatch.setattr(QualityValidator, "check_content_vs_json", staticmethod(check))
+    monkeypatch.setattr(QualityValidator, "acheck_content_vs_json", staticmethod(acheck))
+    return calls
+
+
+def _state(**overrides) -> dict:
+    return {"retry_count": 0, "usage": {}, "budget": None, "attempts": [], **overrides}
+
+
+def _run(scheduler: ValidationScheduler, is_async: bool) -> dict:
+    return asyncio.run(scheduler.arun()) if is_async else scheduler.run()
+
+
+@pytest.mark.parametrize("is_async", [False, True])
+def test_consistency_skipped_when_retry_is_certain(consistency_calls, is_async):
+    layers = _run(ValidationScheduler(RESULT, INPUT, "en", state=_state()), is_async)
+    assert layers["json_consistency"] is None
+    assert not consistency_calls
+
+
+@pytest.mark.parametrize("is_async", [False, True])
+@pytest.mark.parametrize("state", [
+    _state(usage={MODEL: {"calls": 1, "input_tokens": 5000, "output_tokens": 1000, "cached_tokens": 0}}, budget={"max_tokens": 8000}),
+    _state(retry_count=2, attempts=[
+        {"attempt": 0, "score": 0.9, "issue_kinds": ["title_length"]},
+        {"attempt": 1, "score": 0.9, "issue_kinds": ["title_length"]},
+    ]),
+])
+def test_last_attempt_is_fully_validated(consistency_calls, state, is_async):
+    # Budget stop and retry-policy stop end the run before RETRY_COUNT; the candidate must still be fact-checked
+    layers = _run(ValidationScheduler(RESULT, INPUT, "en", state=state), is_async)
+    assert layers["json_consistency"] == CONSISTENT
+    assert len(consistency_calls) == 1
+
+
+def test_running_consistency_call_is_kept_when_retry_becomes_certain(monkeypatch):
+    started, calls = threading.Event(), []
+
+    def check(result, input_json):
+        calls.append(result)
+        started.set()
+        return CONSISTENT
+
+    def failing_local_layers(self):
+        started.wait(5)  # the consistency call is in flight before the local layers report
+        return {"linguistic": (0.5, ["Very high repetition detected"], []), "seo": CONSISTENT}
+
+    monkeypatch.setattr(QualityValidator, "check_content_vs_json", staticmethod(check))
+    monkeypatch.setattr(ValidationScheduler, "_linguistic_and_seo", failing_local_layers)
+    valid = RESULT.model_copy(update={"title": "Apartment for sale in Lisbon"})
+    layers = ValidationScheduler(valid, INPUT, "en", state=_state()).run()
+    assert layers["json_consistency"] == CONSISTENT
+    assert len(calls) == 1
@@ -4,6 +4,50 @@ import requests
 import streamlit as st
 
 API_URL = os.getenv("API_URL", "http://localhost:8001/generate")
+STREAM_URL = os.getenv("STREAM_URL", API_URL.rstrip("/") + "/stream")
+
+
+def wrap_html(html: str) -> str:
+    return f"""
+    <!DOCTYPE html>
+    <html>
+      <head>
+        <meta charset="utf-8" />
+        <style>
+          body {{
+            margin: 0;
+            padding: 16px;
+            background-color: white;
+            color: #111;
+            font-family: system-ui, -apple-system, BlinkMacSystemFont, "Segoe UI", sans-serif;
+          }}
+        </style>
+      </head>
+      <body>
+        {html}
+      </body>
+    </html>
+    """
+
+
+def iter_sse(resp):
+    """Yields (event, data) pairs from a server-sent events response"""
+    event, data = "message", []
+    for line in resp.iter_lines(decode_unicode=True):
+        if not line:
+            if data:
+                yield event, json.loads("\n".join(data))
+            event, data = "message", []
+        elif line.startswith("event:"):
+            event = line[6:].strip()
+        elif line.startswith("data:"):
+            data.append(line[5:].strip())
+
+
+def stop_stream():
+    # The click reruns the script, interrupting the running one; leaving its `with` block closes
+    # the SSE connection, and the API cancels the pipeline once it sees the disconnect
+    st.session_state["stream_stopped"] = True
 
 
 st.set_page_config(page_title="InteractiveAI Property Generator", layout="wide")
@@ -27,52 +71,70 @@ with col1:
             height=300,
         )
 
+    stream_progress = st.checkbox("Stream progress", value=True)
     generate_clicked = st.button("Generate HTML")
 
 
 with col2:
     st.header("Output & Validation")
 
+    if st.session_state.pop("stream_stopped", False):
+        st.warning("Generation stopped")
+
     if generate_clicked:
         try:
             data = json.loads(input_text)
         except Exception as e:
             st.error(f"Invalid JSON: {e}")
         else:
-            with st.spinner("Calling API..."):
-                resp = requests.post(API_URL, json={"input_json": data})
-
-            if resp.status_code != 200:
-                st.error(f"API error {resp.status_code}: {resp.text}")
+            if stream_progress:
+                status = st.empty()
+                stop_box = st.empty()
+                partial_box = st.empty()
+                st.subheader("Preview")
+                preview = st.empty()
+                st.subheader("Validation")
+                validation_box = st.empty()
+
+                with requests.post(STREAM_URL, json={"input_json": data}, stream=True) as resp:
+                    stop_box.button("Stop", on_click=stop_stream)
+                    if resp.status_code != 200:
+                        st.error(f"API error {resp.status_code}: {resp.text}")
+                    else:
+                        for event, payload in iter_sse(resp):
+                            if event == "node_start":
+                                status.info(f"Attempt {payload['attempt']}: running {payload['node']}...")
+                            elif event == "partial":
+                                partial_box.json(payload["fields"], expanded=False)
+                            elif event == "draft" and payload.get("html"):
+                                partial_box.empty()
+                                with preview.container():
+                                    st.caption(f"Draft from attempt {payload['attempt']}")
+                                    st.components.v1.html(wrap_html(payload["html"]), height=700, scrolling=True)
+                            elif event == "validation":
+                                validation_box.json(payload)
+                            elif event == "result":
+                                status.success(f"Done after {payload.get('retry_count', 0)} retries")
+                                if payload.get("formatted_data"):
+                                    with preview.container():
+                                        st.components.v1.html(wrap_html(payload["formatted_data"]), height=700, scrolling=True)
+                                validation_box.json(payload.get("validation", {}))
+                            elif event == "error":
+                                status.error(payload.get("detail"))
+                    stop_box.empty()
             else:
-                payload = resp.json()
-                html = payload["html"]
-                validation = payload.get("validation", {})
+                with st.spinner("Calling API..."):
+                    resp = requests.post(API_URL, json={"input_json": data})
 
-                st.subheader("Preview")
+                if resp.status_code != 200:
+                    st.error(f"API error {resp.status_code}: {resp.text}")
+                else:
+                    payload = resp.json()
+                    html = payload["html"]
+                    validation = payload.get("validation", {})
 
-                wrapped_html = f"""
-                <!DOCTYPE html>
-                <html>
-                  <head>
-                    <meta charset="utf-8" />
-                    <style>
-                      body {{
-                        margin: 0;
-                        padding: 16px;
-                        background-color: white;
-                        color: #111;
-                        font-family: system-ui, -apple-system, BlinkMacSystemFont, "Segoe UI", sans-serif;
-                      }}
-                    </style>
-                  </head>
-                  <body>
-                    {html}
-                  </body>
-                </html>
-                """
-
-                st.components.v1.html(wrapped_html, height=700, scrolling=True)
+                    st.subheader("Preview")
+                    st.components.v1.html(wrap_html(html), height=700, scrolling=True)
 
-                st.subheader("Validation")
-                st.json(validation)
+                    st.subheader("Validation")
+                    st.json(validation)
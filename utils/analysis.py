@@ -91,7 +91,7 @@ def log_validation_report(result):
 
     lines.append("\nCategory Scores:")
     for category, score in validation.get('category_scores', {}).items():
-        lines.append(f"  {category}: {score:.2f}")
+        lines.append(f"  {category}: {score:.2f}" if score is not None else f"  {category}: skipped")
 
     if validation.get('issues'):
         lines.append(f"\n❌ Critical Issues ({len(validation['issues'])}):")
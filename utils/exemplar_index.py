@@ -0,0 +1,331 @@
+import os
+import json
+import math
+import time
+import atexit
+import threading
+
+import numpy as np
+
+from typing import Optional
+from loguru import logger
+
+from utils.metrics import metrics
+from utils.prompt_registry import prompt_registry
+from utils.result_store import input_hash
+from llm_config.llm_config import EXEMPLARS_ENABLED, EXEMPLAR_COUNT, EXEMPLAR_MIN_SCORE, EXEMPLAR_MAX_DISTANCE
+from pipeline_config.pipeline_config import EXEMPLAR_INDEX_PATH, EXEMPLAR_MAX_ENTRIES, EXEMPLAR_SAVE_INTERVAL
+from validation_config.valid_lang_phrases import PROPERTY_TYPES
+
+EXEMPLAR_LOOKUPS = metrics.counter("seo_exemplar_lookups_total", "Exemplar index lookups for generation prompts", ["outcome"])
+EXEMPLARS_ADDED = metrics.counter("seo_exemplars_added_total", "Accepted results added to the exemplar index", ["outcome"])
+
+# Bump when feature_vector changes: saved vectors of another version are recomputed on load
+FEATURE_VERSION = 1
+# Extra distance for a neighbour of another property type / city than the query
+TYPE_PENALTY = 2.0
+CITY_PENALTY = 1.0
+# Words of PROPERTY_TYPES that say nothing about the kind of property
+GENERIC_TYPES = {"property", "residence", "home", "dwelling", "propriedade", "residência", "habitação", "imóvel",
+                 "propiedad", "residencia", "vivienda", "inmueble", "propriété", "résidence", "habitation", "logement",
+                 "immeuble", "immobilie", "residenz", "eigenheim", "proprietà", "residenza", "abitazione", "immobile"}
+PROPERTY_TYPE_WORDS = {
+    language: {t for t in types if t not in GENERIC_TYPES and not (t[0] == "t" and t[1:].isdigit())}
+    for language, types in PROPERTY_TYPES.items()
+}
+
+
+def _number(value, default: float) -> float:
+    return float(value) if isinstance(value, (int, float)) and not isinstance(value, bool) else default
+
+
+def _flag(value) -> float:
+    return 1.0 if value is True else 0.0 if value is False else 0.5
+
+
+def _is_rent(input_json: dict) -> bool:
+    listing_type = str(input_json.get("listing_type") or "").lower()
+    return any(word in listing_type for word in ("rent", "let", "lease"))
+
+
+def feature_vector(input_json: dict) -> np.ndarray:
+    """Scaled so that one unit is roughly one noticeable difference (a bedroom and a half, ~60% more area, ...)"""
+    features = input_json.get("features") or {}
+    rent = _is_rent(input_json)
+    price = _number(input_json.get("price"), 1500.0 if rent else 300000.0)
+    return np.array([
+        _number(features.get("bedrooms"), 2.0) / 1.5,
+        _number(features.get("bathrooms"), 1.0) / 1.5,
+        math.log1p(max(_number(features.get("area_sqm"), 80.0), 0.0)) / 0.5,
+        min(_number(features.get("floor"), 1.0), 30.0) / 5.0,
+        (_number(features.get("year_built"), 1990.0) - 1950.0) / 40.0,
+        _flag(features.get("balcony")),
+        _flag(features.get("parking")),
+        _flag(features.get("elevator")),
+        math.log1p(max(price, 0.0)) / 1.5,
+        3.0 if rent else 0.0,
+    ], dtype=np.float32)
+
+
+def property_type(input_json: dict) -> str:
+    """`property_type` of the listing, or the first specific property word of its title"""
+    if input_json.get("property_type"):
+        return str(input_json["property_type"]).lower()
+    words = PROPERTY_TYPE_WORDS.get(input_json.get("language", "en"), set())
+    for word in str(input_json.get("title") or "").lower().split():
+        if word in words:
+            return word
+    return ""
+
+
+def _city(input_json: dict) -> str:
+    return str((input_json.get("location") or {}).get("city") or "").lower()
+
+
+class _Bucket:
+    """Exemplars of one language: feature rows and payloads, in insertion order"""
+
+    def __init__(self, dims: int):
+        self.vectors = np.empty((0, dims), dtype=np.float32)
+        self.entries: list[dict] = []
+        self._types: Optional[np.ndarray] = None
+        self._cities: Optional[np.ndarray] = None
+
+    def extend(self, vectors: np.ndarray, entries: list[dict]):
+        self.vectors = np.vstack([self.vectors, vectors])
+        self.entries += entries
+        self._types = self._cities = None
+
+    def replace(self, i: int, entry: dict):
+        self.entries[i] = entry
+        self._types = self._cities = None
+
+    def pop(self, i: int) -> dict:
+        self.vectors = np.delete(self.vectors, i, axis=0)
+        self._types = self._cities = None
+        return self.entries.pop(i)
+
+    def columns(self) -> tuple[np.ndarray, np.ndarray]:
+        if self._types is None:
+            self._types = np.array([e["property_type"] for e in self.entries], dtype=object)
+            self._cities = np.array([e["city"] for e in self.entries], dtype=object)
+        return self._types, self._cities
+
+
+class ExemplarIndex:
+    """Nearest accepted outputs for a listing, to show the generator what passes.
+
+    Exemplars are bucketed by language (an example in another language does not help)
+    and ranked by the distance between feature vectors of their input listings, plus a
+    penalty for another property type or city. One exemplar is kept per input listing,
+    and the listing itself is never its own exemplar.
+
+    The index lives in memory. A background thread saves it every `save_interval`
+    seconds while it has changed. The file is one `.npz`: the feature matrix and the
+    JSON-encoded payloads, replaced atomically. `close` saves what is left.
+    """
+
+    def __init__(
+        self,
+        path: str = EXEMPLAR_INDEX_PATH,
+        max_entries: int = EXEMPLAR_MAX_ENTRIES,
+        save_interval: float = EXEMPLAR_SAVE_INTERVAL,
+        enabled: bool = EXEMPLARS_ENABLED,
+    ):
+        self.path = path
+        self.max_entries = max_entries
+        self.save_interval = save_interval
+        self.enabled = enabled
+        self._lock = threading.RLock()
+        self._buckets: Optional[dict[str, _Bucket]] = None
+        self._by_hash: dict[str, str] = {}  # input hash -> language bucket
+        self._dirty = False
+        self._stop = threading.Event()
+        self._saver: Optional[threading.Thread] = None
+        self._stats = {"added": 0, "replaced": 0, "evicted": 0, "saves": 0}
+
+    def _open(self):
+        """Loads the saved index and starts the saver on first use; call with `_lock` held"""
+        if self._buckets is not None:
+            return
+        self._buckets = {}
+        if os.path.exists(self.path):
+            try:
+                self._load()
+            except (OSError, ValueError, KeyError) as e:
+                logger.error(f"Exemplar index '{self.path}' unreadable, starting empty: {e}")
+                self._buckets, self._by_hash = {}, {}
+        self._stop.clear()
+        self._saver = threading.Thread(target=self._run, name="exemplar-index-saver", daemon=True)
+        self._saver.start()
+
+    def open(self):
+        """Load the saved index now rather than on the first lookup"""
+        with self._lock:
+            self._open()
+
+    def _load(self):
+        with np.load(self.path, allow_pickle=False) as data:
+            entries = json.loads(data["entries"].tobytes().decode("utf-8"))
+            vectors = data["vectors"]
+            version = int(data["version"])
+        if version != FEATURE_VERSION or len(vectors) != len(entries):
+            logger.info(f"Exemplar features changed (v{version} -> v{FEATURE_VERSION}), recomputing")
+            vectors = np.array([feature_vector(entry["input_json"]) for entry in entries], dtype=np.float32)
+
+        rows: dict[str, list[int]] = {}
+        for i, entry in enumerate(entries):
+            rows.setdefault(entry["language"], []).append(i)
+            self._by_hash[entry["input_hash"]] = entry["language"]
+        for language, idx in rows.items():
+            self._buckets[language] = _Bucket(vectors.shape[1])
+            self._buckets[language].extend(vectors[idx], [entries[i] for i in idx])
+        logger.info(f"Loaded {len(entries)} exemplars from '{self.path}'")
+
+    def _insert(self, vector: np.ndarray, entry: dict):
+        bucket = self._buckets.setdefault(entry["language"], _Bucket(len(vector)))
+        bucket.extend(vector[None, :], [entry])
+        self._by_hash[entry["input_hash"]] = entry["language"]
+
+    def _evict_oldest(self):
+        oldest = min((b for b in self._buckets.values() if b.entries), key=lambda b: b.entries[0]["created_at"])
+        entry = oldest.pop(0)
+        self._by_hash.pop(entry["input_hash"], None)
+        self._stats["evicted"] += 1
+
+    def add(self, input_json: dict, structured_data: Optional[dict], validation: Optional[dict]) -> bool:
+        """Keep an accepted result as an exemplar; returns whether the index changed"""
+        validation = validation or {}
+        if not (self.enabled and input_json and structured_data and validation.get("passed")):
+            return False
+        if validation.get("score", 0) < EXEMPLAR_MIN_SCORE:
+            EXEMPLARS_ADDED.inc(outcome="low_score")
+            return False
+
+        entry = {
+            "input_hash": input_hash(input_json),
+            "language": input_json.get("language", "en"),
+            "property_type": property_type(input_json),
+            "city": _city(input_json),
+            "score": validation["score"],
+            "created_at": time.time(),
+            "input_json": input_json,
+            "output": structured_data,
+        }
+        with self._lock:
+            self._open()
+            language = self._by_hash.get(entry["input_hash"])
+            if language is not None:
+                bucket = self._buckets[language]
+                i = next(i for i, e in enumerate(bucket.entries) if e["input_hash"] == entry["input_hash"])
+                if bucket.entries[i]["score"] >= entry["score"]:
+                    EXEMPLARS_ADDED.inc(outcome="duplicate")
+                    return False
+                bucket.replace(i, entry)
+                self._stats["replaced"] += 1
+            else:
+                self._insert(feature_vector(input_json), entry)
+                self._stats["added"] += 1
+                while len(self._by_hash) > self.max_entries:
+                    self._evict_oldest()
+            self._dirty = True
+        EXEMPLARS_ADDED.inc(outcome="added")
+        return True
+
+    def nearest(self, input_json: dict, k: int = EXEMPLAR_COUNT, max_distance: float = EXEMPLAR_MAX_DISTANCE) -> list[dict]:
+        """Up to `k` exemplars for `input_json`, closest first"""
+        if not (self.enabled and input_json and k > 0):
+            return []
+        with self._lock:
+            self._open()
+            bucket = self._buckets.get(input_json.get("language", "en"))
+            if bucket is None or not bucket.entries:
+                return []
+            types, cities = bucket.columns()
+            distance = np.sqrt(((bucket.vectors - feature_vector(input_json)) ** 2).sum(axis=1))
+            distance += TYPE_PENALTY * (types != property_type(input_json)) + CITY_PENALTY * (cities != _city(input_json))
+            own = input_hash(input_json)
+            if own in self._by_hash:
+                distance[[i for i, e in enumerate(bucket.entries) if e["input_hash"] == own]] = np.inf
+
+            order = np.argsort(distance, kind="stable")[:k]
+            return [{**bucket.entries[i], "distance": float(distance[i])} for i in order if distance[i] <= max_distance]
+
+    def prompt(self, input_json: dict, k: int = EXEMPLAR_COUNT) -> Optional[str]:
+        """Reference-examples message for the generation prompt, or None if there are no close exemplars"""
+        exemplars = self.nearest(input_json, k)
+        EXEMPLAR_LOOKUPS.inc(outcome="hit" if exemplars else "miss")
+        if not exemplars:
+            return None
+        examples = "\n\n".join(
+            f"### EXAMPLE {n}\n"
+            f"PROPERTY JSON:\n{json.dumps(e['input_json'], ensure_ascii=False)}\n"
+            f"ACCEPTED OUTPUT:\n{json.dumps(e['output'], ensure_ascii=False)}"
+            for n, e in enumerate(exemplars, 1)
+        )
+        # Not `render`: its memo would keep every distinct neighbour set until the file changes
+        return prompt_registry.get("exemplars").format(examples=examples)
+
+    def save(self):
+        """Write the index if it changed since the last save"""
+        with self._lock:
+            if not self._dirty or self._buckets is None:
+                return
+            buckets = [b for b in self._buckets.values() if b.entries]
+            entries = [e for b in buckets for e in b.entries]
+            vectors = np.vstack([b.vectors for b in buckets]) if buckets else np.empty((0, len(feature_vector({}))), dtype=np.float32)
+            self._dirty = False
+
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp = f"{self.path}.tmp.npz"
+        try:
+            payload = np.frombuffer(json.dumps(entries, ensure_ascii=False).encode("utf-8"), dtype=np.uint8)
+            np.savez_compressed(tmp, vectors=vectors, entries=payload, version=np.array(FEATURE_VERSION))
+            os.replace(tmp, self.path)
+        except OSError as e:
+            logger.error(f"Saving exemplar index to '{self.path}' failed: {e}")
+            with self._lock:
+                self._dirty = True
+            return
+        with self._lock:
+            self._stats["saves"] += 1
+        logger.debug(f"Saved {len(entries)} exemplars to '{self.path}'")
+
+    def _run(self):
+        while not self._stop.wait(self.save_interval):
+            try:
+                self.save()
+            except Exception:
+                logger.exception("Exemplar index save failed")
+
+    def close(self):
+        """Stop the saver and save what changed"""
+        saver = self._saver
+        if saver is not None and saver.is_alive():
+            self._stop.set()
+            saver.join()
+        self._saver = None
+        self.save()
+
+    def clear(self, path: Optional[str] = None):
+        """Save pending changes, then drop every exemplar from memory (and optionally switch to another file)"""
+        self.close()
+        with self._lock:
+            if path is not None:
+                self.path = path
+            self._buckets, self._by_hash, self._dirty = None, {}, False
+
+    def stats(self) -> dict:
+        with self._lock:
+            buckets = self._buckets or {}
+            return {
+                **self._stats,
+                "enabled": self.enabled,
+                "exemplars": len(self._by_hash),
+                "languages": {language: len(b.entries) for language, b in buckets.items() if b.entries},
+                "path": self.path,
+            }
+
+
+exemplar_index = ExemplarIndex()
+atexit.register(exemplar_index.close)
@@ -1,10 +1,23 @@
 import os
 
-def get_system_prompt(path: str="llm_config/llm_prompt.txt"):
+SYSTEM_PROMPT_PATH = "llm_config/llm_prompt.txt"
+VALID_PROMPT_PATH = "validation_config/llm_valid_prompt.txt"
+VALID_BATCH_PROMPT_PATH = "validation_config/llm_valid_batch_prompt.txt"
+EXEMPLAR_PROMPT_PATH = "llm_config/llm_exemplar_prompt.txt"
+
+def get_system_prompt(path: str=SYSTEM_PROMPT_PATH):
+    with open(path, "r") as file:
+        return file.read()
+
+def get_valid_prompt(path: str=VALID_PROMPT_PATH):
+    with open(path, "r") as file:
+        return file.read()
+
+def get_valid_batch_prompt(path: str=VALID_BATCH_PROMPT_PATH):
     with open(path, "r") as file:
         return file.read()
 
-def get_valid_prompt(path: str="validation_config/llm_valid_prompt.txt"):
+def get_exemplar_prompt(path: str=EXEMPLAR_PROMPT_PATH):
     with open(path, "r") as file:
         return file.read()
 
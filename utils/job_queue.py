@@ -0,0 +1,179 @@
+import os
+import json
+import time
+import uuid
+import sqlite3
+import threading
+
+from typing import Optional
+from loguru import logger
+
+from pipeline_config.pipeline_config import JOB_DB_PATH
+
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+
+
+class JobQueue:
+    """Durable FIFO of pipeline jobs in SQLite.
+
+    Jobs are claimed atomically, so any number of workers can share one queue.
+    Jobs found `running` when the queue is opened were interrupted by a restart and are queued again.
+    """
+
+    def __init__(self, path: str = JOB_DB_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                status TEXT NOT NULL,
+                input_key TEXT,
+                input_json TEXT NOT NULL,
+                options TEXT NOT NULL,
+                webhook_url TEXT,
+                result TEXT,
+                error TEXT,
+                created_at REAL NOT NULL,
+                started_at REAL,
+                finished_at REAL
+            )
+        """)
+        self._db.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_at)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS jobs_input_key ON jobs (input_key, status)")
+        # Webhooks of later identical submissions, served by the job they were folded into
+        self._db.execute("CREATE TABLE IF NOT EXISTS job_webhooks (job_id TEXT NOT NULL, url TEXT NOT NULL, PRIMARY KEY (job_id, url))")
+        recovered = self._db.execute(
+            "UPDATE jobs SET status = ?, started_at = NULL WHERE status = ?", (QUEUED, RUNNING)
+        ).rowcount
+        self._db.commit()
+        if recovered:
+            logger.warning(f"Re-queued {recovered} jobs interrupted by a restart")
+        logger.info(f"Job queue at '{path}'")
+
+    def submit(
+        self, 
+        input_json: dict, 
+        options: Optional[dict] = None, 
+        webhook_url: Optional[str] = None,
+        input_key: Optional[str] = None,
+    ) -> tuple[str, bool]:
+        """Queue a job. Returns `(job_id, created)`.
+
+        If an identical job (same `input_key` and options) is still queued or running,
+        its id is returned instead, so a client resubmitting after a timeout does not pay twice;
+        `webhook_url` is then attached to that job and notified when it finishes.
+        """
+        options_json = json.dumps(options or {}, sort_keys=True)
+        with self._lock:
+            pending = self._join_pending(input_key, options_json, webhook_url)
+            if pending is not None:
+                return pending, False
+
+            job_id = uuid.uuid4().hex
+            self._db.execute(
+                "INSERT INTO jobs (id, status, input_key, input_json, options, webhook_url, created_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (job_id, QUEUED, input_key, json.dumps(input_json, ensure_ascii=False), options_json, webhook_url, time.time()),
+            )
+            self._db.commit()
+            return job_id, True
+
+    def _find_pending(self, input_key: Optional[str], options_json: str) -> Optional[str]:
+        if input_key is None:
+            return None
+        row = self._db.execute(
+            "SELECT id FROM jobs WHERE input_key = ? AND options = ? AND status IN (?, ?) ORDER BY created_at LIMIT 1",
+            (input_key, options_json, QUEUED, RUNNING),
+        ).fetchone()
+        return row["id"] if row is not None else None
+
+    def _join_pending(self, input_key: Optional[str], options_json: str, webhook_url: Optional[str]) -> Optional[str]:
+        pending = self._find_pending(input_key, options_json)
+        if pending is not None and webhook_url:
+            # Same lock as `finish`: a job still pending here reads its webhooks only after this commit
+            self._db.execute("INSERT OR IGNORE INTO job_webhooks (job_id, url) VALUES (?, ?)", (pending, webhook_url))
+            self._db.commit()
+        return pending
+
+    def find_pending(self, input_key: str, options: Optional[dict] = None, webhook_url: Optional[str] = None) -> Optional[str]:
+        """Id of a queued or running job with the same input key and options; `webhook_url` is attached to it"""
+        with self._lock:
+            return self._join_pending(input_key, json.dumps(options or {}, sort_keys=True), webhook_url)
+
+    def webhooks(self, job_id: str) -> list[str]:
+        """Every webhook to notify for a job: its own and those of identical submissions folded into it"""
+        with self._lock:
+            row = self._db.execute("SELECT webhook_url FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            extra = self._db.execute("SELECT url FROM job_webhooks WHERE job_id = ? ORDER BY rowid", (job_id,)).fetchall()
+        urls = [row["webhook_url"]] if row is not None and row["webhook_url"] else []
+        return urls + [r["url"] for r in extra if r["url"] not in urls]
+
+    def claim(self) -> Optional[dict]:
+        """Take the oldest queued job and mark it running"""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT * FROM jobs WHERE status = ? ORDER BY created_at LIMIT 1", (QUEUED,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._db.execute("UPDATE jobs SET status = ?, started_at = ? WHERE id = ?", (RUNNING, time.time(), row["id"]))
+            self._db.commit()
+            return self._to_dict(row, status=RUNNING)
+
+    def finish(self, job_id: str, result: Optional[dict] = None, error: Optional[str] = None):
+        with self._lock:
+            self._db.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, finished_at = ? WHERE id = ?",
+                (
+                    FAILED if error is not None else DONE,
+                    json.dumps(result, ensure_ascii=False) if result is not None else None,
+                    error,
+                    time.time(),
+                    job_id,
+                ),
+            )
+            self._db.commit()
+
+    def get(self, job_id: str) -> Optional[dict]:
+        with self._lock:
+            row = self._db.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._to_dict(row) if row is not None else None
+
+    def position(self, job_id: str, created_at: float) -> int:
+        """Number of queued jobs ahead of this one"""
+        with self._lock:
+            return self._db.execute(
+                "SELECT COUNT(*) FROM jobs WHERE status = ? AND created_at < ?", (QUEUED, created_at)
+            ).fetchone()[0]
+
+    def counts(self) -> dict[str, int]:
+        with self._lock:
+            rows = self._db.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        return {QUEUED: 0, RUNNING: 0, DONE: 0, FAILED: 0, **{status: count for status, count in rows}}
+
+    def mean_duration(self, last: int = 50) -> Optional[float]:
+        """Mean run time of the most recent finished jobs, for Retry-After estimates"""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT AVG(finished_at - started_at) FROM "
+                "(SELECT finished_at, started_at FROM jobs WHERE finished_at IS NOT NULL AND started_at IS NOT NULL "
+                "ORDER BY finished_at DESC LIMIT ?)",
+                (last,),
+            ).fetchone()
+        return row[0]
+
+    @staticmethod
+    def _to_dict(row: sqlite3.Row, **overrides) -> dict:
+        job = dict(row)
+        job["input_json"] = json.loads(job["input_json"])
+        job["options"] = json.loads(job["options"])
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        job.update(overrides)
+        return job
+
+    def close(self):
+        with self._lock:
+            self._db.close()
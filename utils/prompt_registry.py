@@ -0,0 +1,99 @@
+import os
+import time
+import hashlib
+import threading
+
+from dataclasses import dataclass, field
+from typing import Callable
+from loguru import logger
+
+from utils.file_system import (
+    SYSTEM_PROMPT_PATH,
+    VALID_PROMPT_PATH,
+    VALID_BATCH_PROMPT_PATH,
+    EXEMPLAR_PROMPT_PATH,
+    get_system_prompt,
+    get_valid_prompt,
+    get_valid_batch_prompt,
+    get_exemplar_prompt,
+)
+from pipeline_config.pipeline_config import PROMPT_RELOAD_INTERVAL
+
+
+@dataclass
+class _PromptEntry:
+    path: str
+    loader: Callable[[str], str]
+    text: str = ""
+    content_hash: str = ""
+    mtime: float = -1.0
+    checked_at: float = 0.0
+    formatted: dict = field(default_factory=dict)
+
+
+class PromptRegistry:
+    """In-memory prompt templates with content hashes and mtime-based hot reload.
+
+    Prompt files are read once and re-read only when their mtime changes, which is
+    checked at most every `reload_interval` seconds. Formatted prompts are cached per
+    set of format arguments (e.g. per tone), so the hot path does no file I/O.
+    """
+
+    def __init__(self, prompts: dict[str, tuple[str, Callable[[str], str]]], reload_interval: float = PROMPT_RELOAD_INTERVAL):
+        self.reload_interval = reload_interval
+        self._lock = threading.Lock()
+        self._entries = {name: _PromptEntry(path=path, loader=loader) for name, (path, loader) in prompts.items()}
+        self._reloads = 0
+
+    def _fresh(self, name: str) -> _PromptEntry:
+        entry = self._entries[name]
+        now = time.monotonic()
+        if entry.mtime >= 0 and now - entry.checked_at < self.reload_interval:
+            return entry
+
+        with self._lock:
+            entry.checked_at = now
+            mtime = os.stat(entry.path).st_mtime
+            if mtime != entry.mtime:
+                entry.text = entry.loader(entry.path)
+                entry.content_hash = hashlib.sha256(entry.text.encode("utf-8")).hexdigest()
+                entry.formatted = {}
+                if entry.mtime >= 0:
+                    logger.info(f"Prompt '{name}' changed on disk, reloaded (hash={entry.content_hash[:12]})")
+                entry.mtime = mtime
+                self._reloads += 1
+        return entry
+
+    def get(self, name: str) -> str:
+        """Raw prompt template"""
+        return self._fresh(name).text
+
+    def render(self, name: str, **kwargs) -> str:
+        """Prompt formatted with `kwargs`, cached until the file changes"""
+        entry = self._fresh(name)
+        key = tuple(sorted(kwargs.items()))
+        formatted = entry.formatted.get(key)
+        if formatted is None:
+            formatted = entry.text.format(**kwargs)
+            entry.formatted[key] = formatted
+        return formatted
+
+    def content_hash(self, name: str) -> str:
+        return self._fresh(name).content_hash
+
+    def stats(self) -> dict:
+        return {
+            "reloads": self._reloads,
+            "prompts": {
+                name: {"path": entry.path, "hash": entry.content_hash, "formatted_variants": len(entry.formatted)}
+                for name, entry in self._entries.items()
+            },
+        }
+
+
+prompt_registry = PromptRegistry({
+    "system": (SYSTEM_PROMPT_PATH, get_system_prompt),
+    "valid": (VALID_PROMPT_PATH, get_valid_prompt),
+    "valid_batch": (VALID_BATCH_PROMPT_PATH, get_valid_batch_prompt),
+    "exemplars": (EXEMPLAR_PROMPT_PATH, get_exemplar_prompt),
+})
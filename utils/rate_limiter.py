@@ -0,0 +1,215 @@
+import time
+import random
+import asyncio
+import threading
+
+from typing import Any, Optional
+from loguru import logger
+from openai import RateLimitError, APIConnectionError, APITimeoutError, InternalServerError
+
+from utils.metrics import metrics, LLM_LATENCY
+from llm_config.llm_config import (
+    MODEL_RATE_LIMITS,
+    RATE_LIMIT_BURST_SECONDS,
+    RATE_LIMIT_MAX_ATTEMPTS,
+    RATE_LIMIT_BACKOFF_BASE,
+    RATE_LIMIT_BACKOFF_MAX,
+    EXPECTED_OUTPUT_TOKENS,
+)
+
+RETRYABLE_ERRORS = (RateLimitError, APIConnectionError, APITimeoutError, InternalServerError)
+
+LIMITER_WAIT = metrics.histogram(
+    "seo_rate_limiter_wait_seconds", "Time calls waited for the client-side rate limiter", ["model"],
+    buckets=(0.0, 0.01, 0.05, 0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0))
+LLM_RETRIES = metrics.counter(
+    "seo_llm_retries_total", "LLM call attempts retried after a 429 or transient error", ["model", "error"])
+
+
+class TokenBucket:
+    """Reservation-based token bucket: a reservation always succeeds and returns how long to wait.
+
+    The level may go negative, which queues later callers behind earlier ones without a loop.
+    """
+
+    def __init__(self, per_minute: float, burst_seconds: float = RATE_LIMIT_BURST_SECONDS):
+        self.rate = per_minute / 60.0
+        self.capacity = max(self.rate * burst_seconds, 1.0)
+        self._level = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self._level = min(self.capacity, self._level + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self, amount: float) -> float:
+        with self._lock:
+            self._refill(time.monotonic())
+            self._level -= amount
+            return max(0.0, -self._level / self.rate)
+
+    def adjust(self, amount: float):
+        """Give back (positive) or take (negative) tokens once the real cost of a call is known"""
+        with self._lock:
+            self._refill(time.monotonic())
+            self._level = min(self.capacity, self._level + amount)
+
+    def drain(self):
+        with self._lock:
+            self._refill(time.monotonic())
+            self._level = min(self._level, 0.0)
+
+
+class ModelLimiter:
+    def __init__(self, model: str, rpm: float, tpm: float):
+        self.model = model
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def reserve(self, tokens: int) -> float:
+        """Seconds to wait before a call estimated at `tokens` may start"""
+        with self._lock:
+            paused = max(0.0, self._paused_until - time.monotonic())
+        return max(paused, self.requests.reserve(1), self.tokens.reserve(tokens))
+
+    def pause(self, seconds: float):
+        """After a 429 every caller of this model holds off, instead of each discovering the limit on its own"""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+        self.tokens.drain()
+
+
+def estimate_tokens(messages) -> int:
+    """Rough prompt size (~4 chars per token plus per-message overhead), good enough for budgeting"""
+    total = 0
+    for message in messages:
+        content = message[1] if isinstance(message, tuple) else getattr(message, "content", "")
+        total += len(str(content)) // 4 + 4
+    return total
+
+
+def _used_tokens(response: Any) -> Optional[int]:
+    raw = response.get("raw") if isinstance(response, dict) else response
+    metadata = getattr(raw, "usage_metadata", None)
+    if not metadata:
+        return None
+    return metadata.get("input_tokens", 0) + metadata.get("output_tokens", 0)
+
+
+def _backoff(error: Exception, attempt: int) -> float:
+    """Server-provided Retry-After when present, else jittered exponential backoff"""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    try:
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000
+        if headers.get("retry-after"):
+            return float(headers["retry-after"])
+    except ValueError:
+        pass
+    delay = min(RATE_LIMIT_BACKOFF_MAX, RATE_LIMIT_BACKOFF_BASE * 2 ** (attempt - 1))
+    return delay * random.uniform(0.5, 1.5)
+
+
+class RateLimiter:
+    """Process-wide limiter for every OpenAI call, keyed by model.
+
+    Each call reserves one request and its estimated tokens (prompt + expected output)
+    before it starts, then settles the token estimate against the reported usage.
+    Calls failing with 429 or a transient error are retried with backoff, and a 429
+    pauses the whole model briefly so concurrent calls don't pile into the same limit.
+    """
+
+    def __init__(self, limits: dict[str, dict] = MODEL_RATE_LIMITS):
+        self.limits = limits
+        self._models: dict[str, ModelLimiter] = {}
+        self._lock = threading.Lock()
+
+    def configure(self, limits: dict[str, dict]):
+        """Replace the per-model limits (e.g. `{}` to disable limiting); buckets start full again"""
+        with self._lock:
+            self.limits = limits
+            self._models.clear()
+
+    def get(self, model: str) -> Optional[ModelLimiter]:
+        with self._lock:
+            limiter = self._models.get(model)
+            if limiter is None and model in self.limits:
+                limit = self.limits[model]
+                limiter = self._models[model] = ModelLimiter(model, limit["rpm"], limit["tpm"])
+            return limiter
+
+    def _reserve(self, model: str, estimate: int) -> float:
+        limiter = self.get(model)
+        wait = limiter.reserve(estimate) if limiter is not None else 0.0
+        LIMITER_WAIT.observe(wait, model=model)
+        if wait > 1:
+            logger.info(f"Rate limiter: waiting {wait:.1f}s for {model}")
+        return wait
+
+    def _settle(self, model: str, estimate: int, response: Any):
+        limiter = self.get(model)
+        used = _used_tokens(response)
+        if limiter is not None and used is not None:
+            limiter.tokens.adjust(estimate - used)
+
+    def _refund(self, model: str, estimate: int):
+        """A failed attempt gives its token reservation back, so retries don't debit the bucket again and again"""
+        limiter = self.get(model)
+        if limiter is not None:
+            limiter.tokens.adjust(estimate)
+
+    def _retry_delay(self, model: str, error: Exception, attempt: int) -> float:
+        delay = _backoff(error, attempt)
+        LLM_RETRIES.inc(model=model, error=type(error).__name__)
+        logger.warning(f"{type(error).__name__} from {model} (attempt {attempt}/{RATE_LIMIT_MAX_ATTEMPTS}), retrying in {delay:.1f}s")
+        limiter = self.get(model)
+        if isinstance(error, RateLimitError) and limiter is not None:
+            limiter.pause(delay)
+        return delay
+
+    def invoke(self, runnable, messages, model: str, role: str, config=None):
+        estimate = estimate_tokens(messages) + EXPECTED_OUTPUT_TOKENS.get(role, 0)
+        for attempt in range(1, RATE_LIMIT_MAX_ATTEMPTS + 1):
+            time.sleep(self._reserve(model, estimate))
+            try:
+                with LLM_LATENCY.time(role=role, model=model):
+                    response = runnable.invoke(messages, config=config)
+            except RETRYABLE_ERRORS as e:
+                self._refund(model, estimate)
+                if attempt == RATE_LIMIT_MAX_ATTEMPTS:
+                    raise
+                time.sleep(self._retry_delay(model, e, attempt))
+                continue
+            except BaseException:
+                # Non-retryable errors and cancellation alike
+                self._refund(model, estimate)
+                raise
+            self._settle(model, estimate, response)
+            return response
+
+    async def ainvoke(self, runnable, messages, model: str, role: str, config=None):
+        estimate = estimate_tokens(messages) + EXPECTED_OUTPUT_TOKENS.get(role, 0)
+        for attempt in range(1, RATE_LIMIT_MAX_ATTEMPTS + 1):
+            await asyncio.sleep(self._reserve(model, estimate))
+            try:
+                with LLM_LATENCY.time(role=role, model=model):
+                    response = await runnable.ainvoke(messages, config=config)
+            except RETRYABLE_ERRORS as e:
+                self._refund(model, estimate)
+                if attempt == RATE_LIMIT_MAX_ATTEMPTS:
+                    raise
+                await asyncio.sleep(self._retry_delay(model, e, attempt))
+                continue
+            except BaseException:
+                # Non-retryable errors and cancellation alike
+                self._refund(model, estimate)
+                raise
+            self._settle(model, estimate, response)
+            return response
+
+
+rate_limiter = RateLimiter()
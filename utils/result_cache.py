@@ -0,0 +1,175 @@
+import os
+import json
+import asyncio
+import time
+import hashlib
+import sqlite3
+import threading
+
+from collections import OrderedDict
+from typing import Optional
+from loguru import logger
+
+from utils.prompt_registry import prompt_registry
+from utils.metrics import metrics
+from llm_config.llm_config import MODEL, MODEL_TONE
+from validation_config.valid_config import VALID_MODEL
+from pipeline_config.pipeline_config import (
+    CACHE_MAX_SIZE,
+    CACHE_TTL,
+    CACHE_DISK_PATH,
+)
+
+
+def canonical_json(data: dict) -> str:
+    return json.dumps(data, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+
+
+def cache_key(input_json: dict) -> str:
+    """Hash of everything that determines a pipeline result: input, models, tone and prompts"""
+    digest = hashlib.sha256()
+    for part in (
+        canonical_json(input_json),
+        MODEL,
+        MODEL_TONE,
+        VALID_MODEL,
+        prompt_registry.content_hash("system"),
+        prompt_registry.content_hash("valid"),
+    ):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """Two-tier result cache: in-memory LRU with TTL, plus an optional SQLite tier.
+
+    Entries are kept as JSON text and every hit is decoded afresh, so a caller mutating
+    its result (nested `validation` / `struct_data` included) never changes later hits.
+    `aget` / `aset` run the disk tier in a worker thread, off the event loop.
+    """
+
+    def __init__(self, max_size: int = CACHE_MAX_SIZE, ttl: float = CACHE_TTL, disk_path: Optional[str] = CACHE_DISK_PATH):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._memory: OrderedDict[str, tuple[float, str]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "memory_hits": 0, "disk_hits": 0, "misses": 0, "sets": 0, "evictions": 0}
+        self._db = None
+
+        if disk_path:
+            os.makedirs(os.path.dirname(disk_path) or ".", exist_ok=True)
+            self._db = sqlite3.connect(disk_path, check_same_thread=False)
+            self._db.execute("CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at REAL NOT NULL)")
+            self._db.commit()
+            logger.info(f"Result cache disk tier enabled at '{disk_path}'")
+
+    def _expired(self, created_at: float) -> bool:
+        return time.time() - created_at > self.ttl
+
+    def _remember(self, key: str, created_at: float, value: str):
+        self._memory[key] = (created_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_size:
+            self._memory.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    def _get_memory(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None:
+                return None
+            created_at, value = entry
+            if self._expired(created_at):
+                del self._memory[key]
+                return None
+            self._memory.move_to_end(key)
+            self._stats["memory_hits"] += 1
+            return value
+
+    def _get_disk(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._db.execute("SELECT value, created_at FROM results WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            value, created_at = row
+            if self._expired(created_at):
+                self._db.execute("DELETE FROM results WHERE key = ?", (key,))
+                self._db.commit()
+                return None
+            self._remember(key, created_at, value)
+            self._stats["disk_hits"] += 1
+            return value
+
+    def _put_disk(self, key: str, value: str, created_at: float):
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO results (key, value, created_at) VALUES (?, ?, ?)",
+                (key, value, created_at),
+            )
+            self._db.commit()
+
+    def _decode(self, value: Optional[str]) -> Optional[dict]:
+        with self._lock:
+            self._stats["hits" if value is not None else "misses"] += 1
+        return json.loads(value) if value is not None else None
+
+    def _store(self, key: str, value: dict) -> tuple[str, float]:
+        text, created_at = json.dumps(value, ensure_ascii=False), time.time()
+        with self._lock:
+            self._remember(key, created_at, text)
+            self._stats["sets"] += 1
+        return text, created_at
+
+    def get(self, key: str) -> Optional[dict]:
+        value = self._get_memory(key)
+        if value is None and self._db is not None:
+            value = self._get_disk(key)
+        return self._decode(value)
+
+    async def aget(self, key: str) -> Optional[dict]:
+        value = self._get_memory(key)
+        if value is None and self._db is not None:
+            value = await asyncio.to_thread(self._get_disk, key)
+        return self._decode(value)
+
+    def set(self, key: str, value: dict):
+        text, created_at = self._store(key, value)
+        if self._db is not None:
+            self._put_disk(key, text, created_at)
+
+    async def aset(self, key: str, value: dict):
+        text, created_at = self._store(key, value)
+        if self._db is not None:
+            await asyncio.to_thread(self._put_disk, key, text, created_at)
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM results")
+                self._db.commit()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["misses"]
+            return {
+                **self._stats,
+                "hit_rate": self._stats["hits"] / lookups if lookups else 0.0,
+                "memory_size": len(self._memory),
+                "max_size": self.max_size,
+                "ttl": self.ttl,
+                "disk_enabled": self._db is not None,
+            }
+
+
+result_cache = ResultCache()
+
+metrics.callback(
+    "seo_cache_lookups_total", "Result cache lookups by outcome", "counter", ["result"],
+    lambda: {(k,): v for k, v in result_cache.stats().items() if k in ("memory_hits", "disk_hits", "misses")},
+)
+metrics.callback(
+    "seo_cache_hit_ratio", "Result cache hit ratio since start", "gauge", [],
+    lambda: {(): result_cache.stats()["hit_rate"]},
+)
@@ -0,0 +1,274 @@
+import os
+import time
+import uuid
+import queue
+import atexit
+import hashlib
+import sqlite3
+import threading
+
+from typing import Optional
+from loguru import logger
+
+from utils.metrics import metrics
+from utils.result_cache import canonical_json
+from pipeline_config.pipeline_config import (
+    RESULTS_DIR,
+    RESULT_INDEX_PATH,
+    RESULT_FLUSH_INTERVAL,
+    RESULT_FLUSH_BATCH,
+    RESULT_RETRY_DELAY,
+    RESULT_RETRY_MAX_DELAY,
+)
+
+RESULTS_STORED = metrics.counter("seo_results_stored_total", "Results flushed to the result store", ["outcome"])
+
+
+def input_hash(input_json: dict) -> str:
+    return hashlib.sha256(canonical_json(input_json).encode("utf-8")).hexdigest()
+
+
+class ResultStore:
+    """Write-behind store for generated HTML: UUID files in sharded directories plus a SQLite index.
+
+    `save` only queues the result and returns its id; a background thread writes the files
+    (atomically, via rename) and the index rows in batches. Until then the result is served
+    from memory, so `get` works right after `save`. Failed writes stay pending and are retried
+    with exponential backoff. `close` flushes everything still pending.
+    """
+
+    def __init__(
+        self, 
+        root: str = RESULTS_DIR, 
+        index_path: str = RESULT_INDEX_PATH, 
+        flush_interval: float = RESULT_FLUSH_INTERVAL, 
+        flush_batch: int = RESULT_FLUSH_BATCH,
+    ):
+        self.root = root
+        self.index_path = index_path
+        self.flush_interval = flush_interval
+        self.flush_batch = flush_batch
+        self._queue: queue.Queue = queue.Queue()
+        self._pending: dict[str, dict] = {}
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        self._writer: Optional[threading.Thread] = None
+        self._retry_ids: list[str] = []
+        self._retry_at = 0.0
+        self._failures = 0  # consecutive failed flushes, for the backoff
+        self._stats = {"saved": 0, "flushed": 0, "failed": 0}
+
+    def _open(self):
+        """Opens the index and starts the writer on first use; call with `_lock` held"""
+        if self._db is None:
+            os.makedirs(os.path.dirname(self.index_path) or ".", exist_ok=True)
+            self._db = sqlite3.connect(self.index_path, check_same_thread=False)
+            self._db.row_factory = sqlite3.Row
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("""
+                CREATE TABLE IF NOT EXISTS results (
+                    id TEXT PRIMARY KEY,
+                    input_hash TEXT NOT NULL,
+                    language TEXT,
+                    score REAL,
+                    passed INTEGER,
+                    created_at REAL NOT NULL,
+                    path TEXT NOT NULL
+                )
+            """)
+            self._db.execute("CREATE INDEX IF NOT EXISTS results_input_hash ON results (input_hash, created_at)")
+            self._db.commit()
+            logger.info(f"Result index at '{self.index_path}'")
+        if self._writer is None or not self._writer.is_alive():
+            self._writer = threading.Thread(target=self._run, name="result-store-writer", daemon=True)
+            self._writer.start()
+
+    def _path(self, result_id: str) -> str:
+        return os.path.join(self.root, result_id[:2], result_id[2:4], f"{result_id}.html")
+
+    def save(self, html: str, input_json: dict, validation: Optional[dict] = None) -> dict:
+        """Queue a result for writing; returns its index entry (`id`, `path`, ...) without touching the disk"""
+        result_id = uuid.uuid4().hex
+        validation = validation or {}
+        entry = {
+            "id": result_id,
+            "input_hash": input_hash(input_json),
+            "language": input_json.get("language"),
+            "score": validation.get("score"),
+            "passed": validation.get("passed"),
+            "created_at": time.time(),
+            "path": self._path(result_id),
+        }
+        with self._lock:
+            self._open()
+            self._pending[result_id] = {**entry, "html": html}
+            self._stats["saved"] += 1
+        self._queue.put(result_id)
+        return entry
+
+    def get(self, result_id: str) -> Optional[dict]:
+        """Index entry plus HTML for `result_id`, whether or not it has been flushed yet"""
+        with self._lock:
+            pending = self._pending.get(result_id)
+            if pending is not None:
+                return {**pending, "flushed": False}
+            if self._db is None:
+                if not os.path.exists(self.index_path):
+                    return None
+                self._open()
+            row = self._db.execute("SELECT * FROM results WHERE id = ?", (result_id,)).fetchone()
+        if row is None:
+            return None
+
+        entry = dict(row)
+        entry["passed"] = bool(entry["passed"]) if entry["passed"] is not None else None
+        try:
+            with open(entry["path"], "r", encoding="utf-8") as f:
+                entry["html"] = f.read()
+        except FileNotFoundError:
+            logger.error(f"Result {result_id} is indexed but '{entry['path']}' is missing")
+            return None
+        return {**entry, "flushed": True}
+
+    def _write_file(self, path: str, html: str):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(html)
+        os.replace(tmp, path)
+
+    def _retry_later(self, ids: list[str], error: Exception):
+        """Keeps `ids` pending (still served from memory) and retries them after a backoff"""
+        RESULTS_STORED.inc(len(ids), outcome="error")
+        with self._lock:
+            self._stats["failed"] += len(ids)
+            self._failures += 1
+            delay = min(RESULT_RETRY_MAX_DELAY, RESULT_RETRY_DELAY * 2 ** (self._failures - 1))
+            self._retry_at = time.monotonic() + delay
+            self._retry_ids.extend(i for i in ids if i not in self._retry_ids)
+        logger.error(f"Writing {len(ids)} results failed, retrying in {delay:.1f}s: {error}")
+
+    def _due_retries(self) -> list[str]:
+        with self._lock:
+            if not self._retry_ids or time.monotonic() < self._retry_at:
+                return []
+            ids, self._retry_ids = self._retry_ids, []
+            return ids
+
+    def _retry_wait(self) -> Optional[float]:
+        """How long the writer may block on the queue before retries are due; None when there are none"""
+        with self._lock:
+            return max(0.0, self._retry_at - time.monotonic()) if self._retry_ids else None
+
+    def _flush(self, ids: list[str]):
+        with self._lock:
+            items = [self._pending[i] for i in ids if i in self._pending]
+
+        rows, failed, error = [], [], None
+        for item in items:
+            try:
+                self._write_file(item["path"], item["html"])
+                rows.append(tuple(item[k] for k in ("id", "input_hash", "language", "score", "passed", "created_at", "path")))
+            except OSError as e:
+                failed.append(item["id"])
+                error = e
+        if failed:
+            self._retry_later(failed, error)
+
+        if not rows:
+            return
+        try:
+            with self._lock:
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO results (id, input_hash, language, score, passed, created_at, path) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    rows,
+                )
+                self._db.commit()
+        except sqlite3.Error as e:
+            with self._lock:
+                self._db.rollback()
+            # The files are in place; rewriting them on the retry is harmless
+            self._retry_later([row[0] for row in rows], e)
+            return
+
+        with self._lock:
+            for row in rows:
+                self._pending.pop(row[0], None)
+            self._stats["flushed"] += len(rows)
+            if not failed:
+                self._failures = 0
+        RESULTS_STORED.inc(len(rows), outcome="ok")
+        logger.debug(f"Flushed {len(rows)} results to '{self.root}'")
+
+    def _drain(self):
+        """Last attempt on shutdown: retries regardless of their backoff, plus anything still queued"""
+        with self._lock:
+            ids, self._retry_ids = self._retry_ids, []
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not None and item not in ids:
+                ids.append(item)
+        if not ids:
+            return
+        try:
+            self._flush(ids)
+        except Exception:
+            logger.exception("Result store flush failed")
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            try:
+                batch = [self._queue.get(timeout=self._retry_wait())]
+            except queue.Empty:
+                batch = []  # nothing new, but retries are due
+            if batch == [None]:
+                break
+            batch = self._due_retries() + batch
+            deadline = time.monotonic() + self.flush_interval
+            while batch and len(batch) < self.flush_batch:
+                try:
+                    item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+            if not batch:
+                continue
+            try:
+                self._flush(batch)
+            except Exception:
+                logger.exception("Result store flush failed")
+        self._drain()
+
+    def close(self):
+        """Flush pending results (failed ones get a last try) and stop the writer"""
+        writer = self._writer
+        if writer is not None and writer.is_alive():
+            self._queue.put(None)
+            writer.join()
+        with self._lock:
+            if self._pending:
+                logger.error(f"{len(self._pending)} results could not be written to '{self.root}'")
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+            self._writer = None
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {**self._stats, "pending": len(self._pending), "root": self.root, "index": self.index_path}
+
+
+result_store = ResultStore()
+atexit.register(result_store.close)
+
+metrics.callback(
+    "seo_result_store_pending", "Results saved but not yet flushed to disk", "gauge", [],
+    lambda: {(): result_store.stats()["pending"]},
+)
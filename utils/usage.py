@@ -0,0 +1,134 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+from loguru import logger
+
+from llm_config.llm_config import MODEL_PRICING, BATCH_PRICE_FACTOR
+from utils.metrics import metrics
+
+TOKEN_KINDS = ("input_tokens", "output_tokens", "cached_tokens")
+BATCH_SUFFIX = ":batch"  # usage of Batch API requests is kept under "<model>:batch", priced at BATCH_PRICE_FACTOR
+
+LLM_TOKENS = metrics.counter("seo_llm_tokens_total", "Tokens reported by the provider", ["model", "kind"])
+LLM_COST = metrics.counter("seo_llm_cost_usd_total", "Estimated LLM spend in USD", ["model"])
+
+_tracker: ContextVar[Optional["UsageTracker"]] = ContextVar("usage_tracker", default=None)
+
+
+def merge_usage(left: Optional[dict], right: Optional[dict]) -> dict:
+    """State reducer: sums per-model usage dicts ({model: {calls, input_tokens, ...}})"""
+    merged = {model: dict(counts) for model, counts in (left or {}).items()}
+    for model, counts in (right or {}).items():
+        target = merged.setdefault(model, {"calls": 0, **{k: 0 for k in TOKEN_KINDS}})
+        for key, value in counts.items():
+            target[key] = target.get(key, 0) + value
+    return merged
+
+
+def batch_model(model: str) -> str:
+    """Usage key for Batch API requests to `model`"""
+    return model + BATCH_SUFFIX
+
+
+def call_cost(model: str, counts: dict) -> float:
+    factor = BATCH_PRICE_FACTOR if model.endswith(BATCH_SUFFIX) else 1.0
+    pricing = MODEL_PRICING.get(model.removesuffix(BATCH_SUFFIX))
+    if not pricing:
+        return 0.0
+    cached = counts.get("cached_tokens", 0)
+    uncached = max(counts.get("input_tokens", 0) - cached, 0)
+    return factor * (
+        uncached * pricing["input"]
+        + cached * pricing["cached_input"]
+        + counts.get("output_tokens", 0) * pricing["output"]
+    ) / 1_000_000
+
+
+def summarize_usage(usage: Optional[dict]) -> dict:
+    """Per-model breakdown with cost, plus totals, as returned to API clients"""
+    by_model = {}
+    for model, counts in (usage or {}).items():
+        by_model[model] = {**counts, "cost_usd": round(call_cost(model, counts), 6)}
+
+    totals = {k: sum(c.get(k, 0) for c in by_model.values()) for k in ("calls", *TOKEN_KINDS)}
+    return {
+        "by_model": by_model,
+        **totals,
+        "total_tokens": totals["input_tokens"] + totals["output_tokens"],
+        "cost_usd": round(sum(c["cost_usd"] for c in by_model.values()), 6),
+    }
+
+
+class UsageTracker:
+    def __init__(self):
+        self.usage: dict = {}
+
+    def add(self, model: str, counts: dict):
+        self.usage = merge_usage(self.usage, {model: {"calls": 1, **counts}})
+
+
+@contextmanager
+def track_usage():
+    """Collects usage of every LLM call made in this context (threads/tasks need a copied context)"""
+    tracker = UsageTracker()
+    token = _tracker.set(tracker)
+    try:
+        yield tracker
+    finally:
+        _tracker.reset(token)
+
+
+def record_usage(model: str, message) -> dict:
+    metadata = getattr(message, "usage_metadata", None) or {}
+    counts = {
+        "input_tokens": metadata.get("input_tokens", 0),
+        "output_tokens": metadata.get("output_tokens", 0),
+        "cached_tokens": (metadata.get("input_token_details") or {}).get("cache_read", 0) or 0,
+    }
+    for kind in TOKEN_KINDS:
+        if counts[kind]:
+            LLM_TOKENS.inc(counts[kind], model=model, kind=kind)
+    LLM_COST.inc(call_cost(model, counts), model=model)
+
+    tracker = _tracker.get()
+    if tracker is not None:
+        tracker.add(model, counts)
+    return counts
+
+
+def parse_structured_response(response: dict, model: str):
+    """Unwraps a `with_structured_output(..., include_raw=True)` response, recording its usage"""
+    record_usage(model, response.get("raw"))
+    if response.get("parsing_error") is not None:
+        raise response["parsing_error"]
+    if response.get("parsed") is None:
+        raise ValueError("Model returned no structured output")
+    return response["parsed"]
+
+
+def budget_exhausted(usage: Optional[dict], budget: Optional[dict], rounds: int) -> Optional[str]:
+    """Reason to stop retrying, or None.
+
+    A retry is refused when spend so far plus one more average round would exceed
+    the budget, so the limit is not overshot by a whole generation + validation round.
+    """
+    if not budget:
+        return None
+
+    summary = summarize_usage(usage)
+    rounds = max(rounds, 1)
+
+    max_tokens = budget.get("max_tokens")
+    if max_tokens is not None:
+        projected = summary["total_tokens"] * (rounds + 1) / rounds
+        if projected > max_tokens:
+            return f"token budget: {summary['total_tokens']} used, next round would reach ~{projected:.0f}/{max_tokens}"
+
+    max_cost = budget.get("max_cost")
+    if max_cost is not None:
+        projected = summary["cost_usd"] * (rounds + 1) / rounds
+        if projected > max_cost:
+            return f"cost budget: ${summary['cost_usd']:.4f} used, next round would reach ~${projected:.4f}/${max_cost}"
+
+    logger.debug(f"Budget ok: {summary['total_tokens']} tokens, ${summary['cost_usd']:.4f}")
+    return None
@@ -0,0 +1,53 @@
+import re
+
+from typing import Optional
+from validation_config.valid_lang_phrases import LLM_PHRASES, CTA_PATTERNS, PROPERTY_TYPES
+
+
+class PhraseCounter:
+    """Counts how many phrases of a list occur in a text.
+
+    Same result as `sum(1 for phrase in phrases if phrase in text)`: plain substring
+    semantics, no word boundaries. For literal phrases, CPython's C-level substring search
+    over a prebuilt tuple beats both a single alternation regex and a pure-Python
+    Aho-Corasick automaton (see benchmarks/bench_matchers.py), so that is what runs here.
+    """
+
+    def __init__(self, phrases: list[str]):
+        self._phrases = tuple(phrases)
+
+    def count(self, text: str) -> int:
+        return sum(map(text.__contains__, self._phrases))
+
+
+def _any_pattern(patterns: list[str]) -> re.Pattern:
+    # Same result as `any(re.search(p, text) for p in patterns)`
+    return re.compile("|".join(f"(?:{p})" for p in patterns))
+
+
+def _any_word(patterns: list[str]) -> re.Pattern:
+    # Same result as `any(re.search(rf'\b{p}\b', text) for p in patterns)`
+    return re.compile(r"\b(?:" + "|".join(f"(?:{p})" for p in patterns) + r")\b")
+
+
+LLM_PHRASE_MATCHERS: dict[str, PhraseCounter] = {lang: PhraseCounter(phrases) for lang, phrases in LLM_PHRASES.items() if phrases}
+CTA_MATCHERS: dict[str, re.Pattern] = {lang: _any_pattern(patterns) for lang, patterns in CTA_PATTERNS.items() if patterns}
+PROPERTY_TYPE_MATCHERS: dict[str, re.Pattern] = {lang: _any_word(patterns) for lang, patterns in PROPERTY_TYPES.items() if patterns}
+
+
+def count_llm_phrases(text: str, language: str) -> Optional[int]:
+    """None if there is no phrase list for the language"""
+    matcher = LLM_PHRASE_MATCHERS.get(language)
+    return matcher.count(text) if matcher else None
+
+
+def has_cta(text: str, language: str) -> Optional[bool]:
+    """None if there are no CTA patterns for the language"""
+    matcher = CTA_MATCHERS.get(language)
+    return matcher.search(text) is not None if matcher else None
+
+
+def has_property_type(text: str, language: str) -> Optional[bool]:
+    """None if there are no property types for the language"""
+    matcher = PROPERTY_TYPE_MATCHERS.get(language)
+    return matcher.search(text) is not None if matcher else None
@@ -1,5 +1,13 @@
 VALID_MODEL = "gpt-4o"
 VALID_TEMPERATURE = 0
+VALID_MAX_WORKERS = 16  # threads running the LLM consistency check alongside local checks (sync pipeline)
+
+# Structural limits, shared by the validator and the local repair pass (content_repair.py)
+TITLE_MAX_LEN = 60
+META_DESCRIPTION_MAX_LEN = 155
+FULL_DESCRIPTION_MIN_LEN = 500
+FULL_DESCRIPTION_MAX_LEN = 700
+KEY_FEATURES_MAX = 5
 
 VALID_CONSISTENT = "True if text matches JSON data, False if there are discrepancies"
 VALID_FEATURES = "Features mentioned in text but marked as false/absent in JSON. Example: 'mentions balcony but JSON has balcony=false'"
@@ -8,4 +16,30 @@ VALID_INCORRECT_NUMBERS = "Numbers in text that don't match JSON. Example: 'text
 VALID_WRONG_LISTING_TYPE = "True if text mentions sale when JSON says rent, or vice versa"
 VALID_WRONG_LANGUAGE = "True if text language doesn't match JSON language field"
 VALID_OTHER_INCONSISTENCIES = "Any other discrepancies between text and JSON"
-VALID_SUMMARY = "Brief summary of all issues found, or 'All consistent' if no issues"
\ No newline at end of file
+VALID_SUMMARY = "Brief summary of all issues found, or 'All consistent' if no issues"
+VALID_BATCH_INDEX = "Number of the LISTING this report is about"
+VALID_BATCH_CHECKS = "One consistency report per listing, in listing order"
+# Rule-based fact check before the LLM consistency call (content_facts.py)
+FACT_CHECK_ENABLED = True
+FACT_CHECK_MODE = "verdict"  # "verdict": certain findings fail the candidate without an LLM call, the rest go to it as hints; "hint": every finding goes to the LLM check to confirm
+FACT_VERDICT_FIELDS = ("bedrooms", "bathrooms", "area_sqm")  # wrong numbers the rules decide alone in "verdict" mode (plus a wrong listing type)
+FACT_AREA_TOLERANCE = 1.0  # m² of rounding accepted between text and JSON
+FACT_HINTS_PROMPT = """
+KEYWORD PRE-CHECK:
+A keyword-based pre-check flagged the points below. It can be wrong (e.g. a public garage nearby,
+monthly condominium fees or a balcony's own area). Confirm each one only if the text really
+contradicts the JSON, and still check everything else as instructed above.
+{hints}
+"""
+
+# Batch re-scoring of archived outputs (QualityValidator.validate_batch, rescore.py)
+RESCORE_WORKERS = None  # processes; None = one per CPU
+RESCORE_CHUNK_SIZE = 2000  # rows scored column-wise per task
+
+# Batched consistency checks for audits (content_audit.py)
+CONSISTENCY_BACKEND = "inline"  # single, inline, openai-batch, local
+CONSISTENCY_BATCH_SIZE = 8  # listings packed into one consistency request
+CONSISTENCY_BATCH_CONCURRENCY = 4  # batched requests in flight (inline backend)
+CONSISTENCY_BATCH_DIR = "audits"  # request / output files of the file-based backends
+CONSISTENCY_BATCH_POLL_INTERVAL = 30.0  # seconds between OpenAI Batch API status checks
+CONSISTENCY_BATCH_WINDOW = "24h"  # OpenAI Batch API completion window
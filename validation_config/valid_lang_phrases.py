@@ -139,4 +139,173 @@ PROPERTY_TYPES = {
         r'attico', r'duplex', r'loft', r'proprietà',
         r'residenza', r'abitazione', r'immobile'
     ]
-}
\ No newline at end of file
+}
+
+# Rule-based fact check (content_facts.py). Patterns are matched against lowercased text.
+# Number words from 2 up: the words for "one" double as articles in most languages.
+NUMBER_WORDS = {
+    'en': {'two': 2, 'three': 3, 'four': 4, 'five': 5, 'six': 6, 'seven': 7, 'eight': 8, 'nine': 9, 'ten': 10},
+    'pt': {'dois': 2, 'duas': 2, 'três': 3, 'tres': 3, 'quatro': 4, 'cinco': 5, 'seis': 6, 'sete': 7, 'oito': 8, 'nove': 9, 'dez': 10},
+    'es': {'dos': 2, 'tres': 3, 'cuatro': 4, 'cinco': 5, 'seis': 6, 'siete': 7, 'ocho': 8, 'nueve': 9, 'diez': 10},
+    'fr': {'deux': 2, 'trois': 3, 'quatre': 4, 'cinq': 5, 'six': 6, 'sept': 7, 'huit': 8, 'neuf': 9, 'dix': 10},
+    'de': {'zwei': 2, 'drei': 3, 'vier': 4, 'fünf': 5, 'sechs': 6, 'sieben': 7, 'acht': 8, 'neun': 9, 'zehn': 10},
+    'it': {'due': 2, 'tre': 3, 'quattro': 4, 'cinque': 5, 'sei': 6, 'sette': 7, 'otto': 8, 'nove': 9, 'dieci': 10},
+}
+
+# Rooms counted after a number ("3 bedrooms", "três quartos") or before one ("bedrooms: 3")
+ROOM_TERMS = {
+    'en': {
+        'bedrooms': [r'bedrooms?'],
+        'bathrooms': [r'bathrooms?', r'baths'],
+    },
+    'pt': {
+        'bedrooms': [r'quartos?', r'dormitórios?'],
+        'bathrooms': [r'casas? de banho', r'banheiros?', r'wcs?'],
+    },
+    'es': {
+        'bedrooms': [r'dormitorios?', r'habitaciones', r'habitación'],
+        'bathrooms': [r'baños?', r'aseos?'],
+    },
+    'fr': {
+        'bedrooms': [r'chambres?'],
+        'bathrooms': [r'salles? de bains?', r"salles? d'eau"],
+    },
+    'de': {
+        'bedrooms': [r'schlafzimmern?'],
+        'bathrooms': [r'badezimmern?', r'bäder', r'bädern'],
+    },
+    'it': {
+        'bedrooms': [r'camere da letto', r'camere', r'camera da letto', r'stanze da letto'],
+        'bathrooms': [r'bagni', r'bagno'],
+    },
+}
+
+# Portuguese typology: T3 = three bedrooms (elsewhere "T2" is as likely a metro or tram line)
+BEDROOM_TYPOLOGY = {
+    'pt': r't(\d)',
+}
+
+# An area is the property's own only next to one of these ("120 m² apartment", "living area of 120 m²");
+# balconies, terraces, gardens and plots have areas too. Property type words are added per language.
+AREA_CONTEXT = {
+    'en': [r'living (?:space|area)', r'(?:total|floor|gross|usable|internal) area', r'floor space'],
+    'pt': [r'área (?:útil|bruta|total|habitável|privativa)'],
+    'es': [r'superficie (?:útil|construida|total)', r'metros útiles'],
+    'fr': [r'surface (?:habitable|totale)', r'superficie (?:habitable|totale)'],
+    'de': [r'wohnfläche', r'nutzfläche', r'gesamtfläche'],
+    'it': [r'superficie (?:commerciale|calpestabile|totale)'],
+}
+
+AREA_UNITS = [
+    r'm²', r'm2', r'sqm', r'sq\.? ?m', r'square met(?:er|re)s', r'metros quadrados',
+    r'metros cuadrados', r'mètres carrés', r'quadratmetern?', r'qm', r'metri quadrati', r'mq',
+]
+
+# Where the unit is: "on the 7th floor", "no 3º andar", "au 5e étage", "im 3. Stock"
+FLOOR_PATTERNS = {
+    'en': [r'on the (\d+)(?:st|nd|rd|th) floor', r'on the ({ordinal}) floor', r'on (?:the )?(ground) floor'],
+    'pt': [r'n[oa] (\d+)[º°oª] (?:andar|piso)', r'n[oa] ({ordinal}) (?:andar|piso)', r'no (rés-do-chão|r/c)'],
+    'es': [r'en (?:el|la) (\d+)[º°oª] (?:piso|planta)', r'en (?:el|la) ({ordinal}) (?:piso|planta)', r'en (?:la )?(planta baja)'],
+    'fr': [r'au (\d+)(?:e|ème|er) étage', r'au ({ordinal}) étage', r'au (rez-de-chaussée)'],
+    'de': [r'im (\d+)\. (?:stock|stockwerk|obergeschoss|og)', r'im ({ordinal}) (?:stock|stockwerk|obergeschoss)', r'im (erdgeschoss|eg)\b'],
+    'it': [r'al (\d+)[º°o] piano', r'al ({ordinal}) piano', r'al (piano terra|pianterreno)'],
+}
+
+FLOOR_ORDINALS = {
+    'en': {'ground': 0, 'first': 1, 'second': 2, 'third': 3, 'fourth': 4, 'fifth': 5,
+           'sixth': 6, 'seventh': 7, 'eighth': 8, 'ninth': 9, 'tenth': 10},
+    'pt': {'rés-do-chão': 0, 'r/c': 0, 'primeiro': 1, 'segundo': 2, 'terceiro': 3, 'quarto': 4, 'quinto': 5,
+           'sexto': 6, 'sétimo': 7, 'oitavo': 8, 'nono': 9, 'décimo': 10},
+    'es': {'planta baja': 0, 'primer': 1, 'primera': 1, 'segundo': 2, 'segunda': 2, 'tercer': 3, 'tercera': 3,
+           'cuarto': 4, 'cuarta': 4, 'quinto': 5, 'quinta': 5, 'sexto': 6, 'sexta': 6, 'séptimo': 7, 'séptima': 7,
+           'octavo': 8, 'octava': 8, 'noveno': 9, 'novena': 9, 'décimo': 10, 'décima': 10},
+    'fr': {'rez-de-chaussée': 0, 'premier': 1, 'deuxième': 2, 'second': 2, 'troisième': 3, 'quatrième': 4,
+           'cinquième': 5, 'sixième': 6, 'septième': 7, 'huitième': 8, 'neuvième': 9, 'dixième': 10},
+    'de': {'erdgeschoss': 0, 'eg': 0, 'ersten': 1, 'zweiten': 2, 'dritten': 3, 'vierten': 4, 'fünften': 5,
+           'sechsten': 6, 'siebten': 7, 'achten': 8, 'neunten': 9, 'zehnten': 10},
+    'it': {'piano terra': 0, 'pianterreno': 0, 'primo': 1, 'secondo': 2, 'terzo': 3, 'quarto': 4, 'quinto': 5,
+           'sesto': 6, 'settimo': 7, 'ottavo': 8, 'nono': 9, 'decimo': 10},
+}
+
+BUILT_PATTERNS = {
+    'en': [r'(?:built|constructed|completed) in (\d{4})', r'year built:? (\d{4})'],
+    'pt': [r'constru[íi]d[oa] em (\d{4})', r'ano de construção:? (\d{4})'],
+    'es': [r'construid[oa] en (\d{4})', r'año de construcción:? (\d{4})'],
+    'fr': [r'construite? en (\d{4})', r'datant de (\d{4})', r'année de construction:? (\d{4})'],
+    'de': [r'baujahr:? (\d{4})', r'(?:erbaut|gebaut) (?:im jahr )?(\d{4})'],
+    'it': [r'costruit[oa] nel (\d{4})', r'anno di costruzione:? (\d{4})'],
+}
+
+# Boolean features of input_json["features"]; private parking only: street parking and a bare "garage"
+# ("public parking garage nearby") say nothing about the unit
+FEATURE_TERMS = {
+    'en': {
+        'balcony': [r'balcon(?:y|ies)'],
+        'parking': [r'(?:private|own|covered|underground) garage', r'parking (?:space|spot|place)s?', r'(?:private|covered|underground) parking'],
+        'elevator': [r'elevators?', r'lifts?'],
+    },
+    'pt': {
+        'balcony': [r'varandas?', r'sacadas?'],
+        'parking': [r'garagem (?:própria|privativa|fechada|box)', r'lugar(?:es)? de (?:garagem|estacionamento)', r'estacionamento privativo'],
+        'elevator': [r'elevador(?:es)?', r'ascensor(?:es)?'],
+    },
+    'es': {
+        'balcony': [r'balcón', r'balcones'],
+        'parking': [r'garaje (?:propio|privado)', r'plazas? de (?:garaje|aparcamiento|parking)', r'aparcamiento privado'],
+        'elevator': [r'ascensor(?:es)?'],
+    },
+    'fr': {
+        'balcony': [r'balcons?'],
+        'parking': [r'garage (?:privé|fermé|individuel)', r'places? de parking', r'parking privé'],
+        'elevator': [r'ascenseurs?'],
+    },
+    'de': {
+        'balcony': [r'balkons?', r'balkone'],
+        'parking': [r'eigene garage', r'tiefgaragenstellplatz', r'stellpl(?:atz|ätze)'],
+        'elevator': [r'aufzug', r'aufzüge', r'fahrstuhl', r'lift'],
+    },
+    'it': {
+        'balcony': [r'balcon[ei]', r'balconcino'],
+        'parking': [r'garage (?:privato|di proprietà)', r'box auto', r'posti? auto'],
+        'elevator': [r'ascensore', r'ascensori'],
+    },
+}
+
+# Words just before a feature that turn a claim into its negation ("no elevator", "sem garagem")
+NEGATION_WORDS = {
+    'en': ['no', 'not', 'without', 'lacks', 'lacking'],
+    'pt': ['sem', 'não', 'nao'],
+    'es': ['sin', 'no'],
+    'fr': ['sans', 'pas', 'aucun', 'aucune'],
+    'de': ['ohne', 'kein', 'keine', 'keinen', 'nicht'],
+    'it': ['senza', 'non', 'nessun', 'nessuno'],
+}
+
+# Phrases that only fit one listing type ("rental potential" in a sale listing is fine, "for rent" is not).
+# No "per month" / "loyer": condominium fees and rental yields are quoted monthly in sale listings too
+LISTING_TYPE_TERMS = {
+    'en': {
+        'sale': [r'for sale', r'on sale'],
+        'rent': [r'for rent', r'to let', r'for lease'],
+    },
+    'pt': {
+        'sale': [r'à venda', r'para venda', r'vende-se'],
+        'rent': [r'arrenda-se', r'aluga-se', r'para alugar', r'disponível para arrendamento'],
+    },
+    'es': {
+        'sale': [r'en venta', r'a la venta', r'se vende'],
+        'rent': [r'en alquiler', r'se alquila'],
+    },
+    'fr': {
+        'sale': [r'à vendre', r'en vente'],
+        'rent': [r'à louer'],
+    },
+    'de': {
+        'sale': [r'zu verkaufen', r'zum kauf', r'kaufpreis'],
+        'rent': [r'zu vermieten', r'zur miete'],
+    },
+    'it': {
+        'sale': [r'in vendita', r'vendesi'],
+        'rent': [r'in affitto', r'affittasi'],
+    },
+}